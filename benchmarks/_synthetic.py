@@ -0,0 +1,116 @@
+"""
+Helpers shared by the benchmark scripts to build synthetic pyramidal TIFF slides.
+
+Requires `tifffile` (and `imagecodecs` for JPEG compression):
+    pip install tifffile imagecodecs
+"""
+
+import os
+import numpy as np
+import cv2
+
+
+def make_pyramidal_tiff(
+    path: str,
+    width: int = 16384,
+    height: int = 12288,
+    tile_size: int = 256,
+    mpp: float = 0.25,
+    downsamples=(4, 16),
+    compression: str = 'jpeg',
+    seed: int = 0,
+) -> str:
+    """
+    Write a tiled, multi-resolution RGB TIFF readable by OpenSlide (generic-tiff vendor).
+
+    Args:
+        path (str): output file path.
+        width (int): level 0 width in pixels.
+        height (int): level 0 height in pixels.
+        tile_size (int): native tile edge in pixels.
+        mpp (float): level 0 microns per pixel.
+        downsamples (tuple): downsample factors of the reduced-resolution levels.
+        compression (str): TIFF compression passed to tifffile. Defaults to 'jpeg'.
+        seed (int): random seed of the synthetic texture.
+
+    Returns:
+        str: path to the written slide.
+    """
+    import tifffile
+
+    if os.path.exists(path):
+        return path
+
+    rng = np.random.default_rng(seed)
+    texture = rng.integers(0, 256, (max(1, height // 64), max(1, width // 64), 3), dtype=np.uint8)
+    image = cv2.resize(texture, (width, height), interpolation=cv2.INTER_CUBIC)
+
+    with tifffile.TiffWriter(path, bigtiff=True) as tw:
+        tw.write(
+            image, tile=(tile_size, tile_size), compression=compression, photometric='rgb',
+            resolution=(1e4 / mpp, 1e4 / mpp), resolutionunit='CENTIMETER',
+        )
+        for ds in downsamples:
+            level = cv2.resize(image, (width // ds, height // ds), interpolation=cv2.INTER_AREA)
+            tw.write(level, tile=(tile_size, tile_size), compression=compression, photometric='rgb', subfiletype=1)
+    return path
+
+
+class SyntheticSlide:
+    """ Stand-in for a slide exposing only its geometry, enough to build a `WSIPatcher` without reading pixels. """
+
+    def __init__(self, width: int = 100000, height: int = 80000, mpp: float = 0.25, downsamples=(1, 4, 16)):
+        self.width, self.height = width, height
+        self.mpp = mpp
+        self.mag = round(10 / mpp)
+        self.level_downsamples = list(downsamples)
+
+    def get_dimensions(self):
+        return self.width, self.height
+
+    def get_best_level_and_custom_downsample(self, downsample: float, tolerance: float = 0.01):
+        level = max((i for i, ds in enumerate(self.level_downsamples) if ds <= downsample * (1 + tolerance)), default=0)
+        return level, downsample / self.level_downsamples[level]
+
+
+def make_tissue_contours(
+    width: int,
+    height: int,
+    n_contours: int,
+    tissue_fraction: float = 0.3,
+    vertices: int = 200,
+    seed: int = 0,
+):
+    """
+    Random irregular tissue contours (with a hole every other contour), like a fragmented biopsy.
+
+    Args:
+        width (int): level 0 width of the slide.
+        height (int): level 0 height of the slide.
+        n_contours (int): number of tissue contours.
+        tissue_fraction (float): approximate fraction of the slide covered by tissue.
+        vertices (int): number of vertices of each contour.
+        seed (int): random seed.
+
+    Returns:
+        gpd.GeoDataFrame: one Polygon per contour, in level 0 coordinates.
+    """
+    import geopandas as gpd
+    from shapely import Polygon
+
+    rng = np.random.default_rng(seed)
+    mean_radius = np.sqrt(tissue_fraction * width * height / (np.pi * n_contours))
+    angles = np.linspace(0, 2 * np.pi, vertices, endpoint=False)
+    polygons = []
+    for i in range(n_contours):
+        radius = mean_radius * rng.uniform(0.6, 1.2)
+        cx, cy = rng.uniform(radius, width - radius), rng.uniform(radius, height - radius)
+        # Smooth radial noise: a few random harmonics
+        noise = sum(rng.uniform(0, 0.15) * np.cos(k * angles + rng.uniform(0, 2 * np.pi)) for k in range(2, 7))
+        shell = np.stack([cx + radius * (1 + noise) * np.cos(angles), cy + radius * (1 + noise) * np.sin(angles)], axis=1)
+        holes = []
+        if i % 2 == 1:
+            hole_angles = angles[::10]
+            holes.append(np.stack([cx + 0.3 * radius * np.cos(hole_angles), cy + 0.3 * radius * np.sin(hole_angles)], axis=1))
+        polygons.append(Polygon(shell, holes).buffer(0))
+    return gpd.GeoDataFrame(geometry=polygons)
@@ -0,0 +1,88 @@
+"""
+Benchmark encoder preprocessing per tile on PIL images (in the loading workers) against `BatchedTransform`
+on batches of uint8 tiles (in the consumer), and the bytes each sends through the DataLoader IPC.
+
+With `--read_size`, tiles are read larger than the patches (e.g., 512px at 40x for 256px patches at 20x):
+the per-tile path rescales them to the patch size then applies the encoder's resize, the batched path
+resamples them once, from the read size straight to the encoder input size.
+
+Example usage:
+
+```
+python benchmarks/benchmark_batch_transforms.py --tile_size 256 --target_size 224 --batch_size 64
+python benchmarks/benchmark_batch_transforms.py --tile_size 512 --target_size 224 --device cuda
+python benchmarks/benchmark_batch_transforms.py --tile_size 256 --read_size 512 --target_size 224
+```
+"""
+
+import argparse
+import os
+import sys
+import time
+import cv2
+import numpy as np
+import torch
+from PIL import Image
+from torchvision import transforms as T
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from trident.patch_encoder_models.utils.transform_utils import BatchedTransform
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmark batched encoder transforms')
+    parser.add_argument('--tile_size', type=int, default=256, help='Size of the tiles read by the patcher.')
+    parser.add_argument('--read_size', type=int, default=None, help='Size of the tiles read from the slide. Defaults to tile_size.')
+    parser.add_argument('--target_size', type=int, default=224, help='Encoder input size.')
+    parser.add_argument('--batch_size', type=int, default=64, help='Number of tiles per batch.')
+    parser.add_argument('--batches', type=int, default=10, help='Number of batches to time.')
+    parser.add_argument('--device', type=str, default='cpu', help='Device of the batched transforms.')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    transform = T.Compose([
+        T.Resize(args.target_size, interpolation=T.InterpolationMode.BICUBIC),
+        T.CenterCrop(args.target_size),
+        T.ToTensor(),
+        T.Normalize((0.485, 0.456, 0.406), (0.229, 0.224, 0.225)),
+    ])
+    read_size = args.read_size or args.tile_size
+    batch_transform = BatchedTransform(transform, input_size=(args.tile_size, args.tile_size))
+    rng = np.random.default_rng(0)
+    # Smooth tissue-like texture, rather than noise that no two resampling kernels agree on
+    tiles = np.stack([
+        cv2.resize(rng.integers(0, 256, (16, 16, 3), dtype=np.uint8), (read_size, read_size), interpolation=cv2.INTER_CUBIC)
+        for _ in range(args.batch_size)
+    ])
+
+    start = time.perf_counter()
+    for _ in range(args.batches):
+        # As WSIPatcher(pil=True) then the encoder transforms
+        images = [Image.fromarray(tile) for tile in tiles]
+        if read_size != args.tile_size:
+            images = [image.resize((args.tile_size, args.tile_size)) for image in images]
+        per_tile = torch.stack([transform(image) for image in images])
+    per_tile_time = (time.perf_counter() - start) / args.batches
+
+    batch = torch.from_numpy(tiles)
+    batch_transform(batch.to(args.device))  # warm-up
+    start = time.perf_counter()
+    for _ in range(args.batches):
+        batched = batch_transform(batch.to(args.device))
+    if args.device.startswith('cuda'):
+        torch.cuda.synchronize()
+    batched_time = (time.perf_counter() - start) / args.batches
+
+    print(f'{args.batch_size} tiles of {args.tile_size}px (read at {read_size}px) to {args.target_size}px')
+    print(f"{'per tile (PIL)':>22}: {per_tile_time * 1000:8.1f} ms/batch, {per_tile.numel() * per_tile.element_size() / 2**20:6.1f} MiB/batch through IPC")
+    print(
+        f"{f'batched ({args.device})':>22}: {batched_time * 1000:8.1f} ms/batch, {batch.numel() / 2**20:6.1f} MiB/batch through IPC "
+        f"({per_tile_time / batched_time:.1f}x faster)"
+    )
+    print(f"{'max difference':>22}: {(batched.cpu() - per_tile).abs().max():.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark the tissue masking engines of `WSIPatcher`: exact polygon geometry vs rasterized mask.
+
+Patches a synthetic slide (geometry only, no pixels are read) covered by random tissue contours,
+and reports the patching time of each engine and how many patch decisions of the raster engine
+agree with the exact geometry. It also times the selection of the patches near the tissue: the
+STRtree query of the geometry engine against a loop over the bounding box of every contour.
+
+Example usage:
+
+```
+python benchmarks/benchmark_patch_masking.py --mag 20 --patch_size 256 --threshold 0.5
+python benchmarks/benchmark_patch_masking.py --contours 1 50 500 --raster_oversample 4 8
+```
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import shapely
+from shapely import STRtree
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from trident.wsi_objects.WSIPatcher import WSIPatcher
+from _synthetic import SyntheticSlide, make_tissue_contours
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmark the tissue masking engines of WSIPatcher')
+    parser.add_argument('--width', type=int, default=100000, help='Level 0 width of the synthetic slide.')
+    parser.add_argument('--height', type=int, default=80000, help='Level 0 height of the synthetic slide.')
+    parser.add_argument('--mpp', type=float, default=0.25, help='Level 0 microns per pixel of the synthetic slide.')
+    parser.add_argument('--mag', type=int, default=20, help='Target magnification of the patches.')
+    parser.add_argument('--patch_size', type=int, default=256, help='Patch size at the target magnification.')
+    parser.add_argument('--overlap', type=int, default=0, help='Overlap between patches in pixels.')
+    parser.add_argument('--threshold', type=float, default=0., help='Minimum proportion of the patch under tissue.')
+    parser.add_argument('--contours', type=int, nargs='+', default=[1, 50, 500], help='Numbers of tissue contours to benchmark.')
+    parser.add_argument('--raster_oversample', type=int, nargs='+', default=[4], help='Raster cells along a patch side.')
+    return parser.parse_args()
+
+
+def time_patching(slide, contours, args, **kwargs):
+    start = time.perf_counter()
+    patcher = WSIPatcher(
+        slide, args.patch_size, src_mag=slide.mag, dst_mag=args.mag, overlap=args.overlap,
+        mask=contours, coords_only=True, threshold=args.threshold, **kwargs
+    )
+    return time.perf_counter() - start, patcher.valid_mask
+
+
+def time_prefilters(slide, contours, args, repeats=5):
+    """ Time the selection of the grid patches near the tissue: per-contour bounding boxes vs STRtree (best of `repeats`). """
+    grid = WSIPatcher(slide, args.patch_size, src_mag=slide.mag, dst_mag=args.mag, overlap=args.overlap, coords_only=True)
+    coords, size = grid.valid_coords, grid.patch_size_src
+    # The patch squares are built once for both the STRtree query and the exact intersection test
+    squares = shapely.box(coords[:, 0], coords[:, 1], coords[:, 0] + size, coords[:, 1] + size)
+
+    loop_time, tree_time = np.inf, np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        bbox_masks = []
+        for _, bbox in contours.geometry.bounds.iterrows():
+            bbox_masks.append(
+                (coords[:, 0] >= bbox['minx'] - size) & (coords[:, 0] <= bbox['maxx'] + size) &
+                (coords[:, 1] >= bbox['miny'] - size) & (coords[:, 1] <= bbox['maxy'] + size)
+            )
+        np.vstack(bbox_masks).any(axis=0)
+        loop_time = min(loop_time, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        STRtree(contours.geometry.to_numpy()).query(squares)
+        tree_time = min(tree_time, time.perf_counter() - start)
+    return loop_time, tree_time
+
+
+def main():
+    args = parse_arguments()
+    slide = SyntheticSlide(args.width, args.height, args.mpp)
+    for n_contours in args.contours:
+        contours = make_tissue_contours(slide.width, slide.height, n_contours)
+        reference_time, reference = time_patching(slide, contours, args, mask_mode='geometry')
+        print(f'{n_contours} contours, {len(reference)} grid patches, {reference.sum()} kept by geometry')
+        print(f"{'geometry':>14}: {reference_time * 1000:9.1f} ms")
+        loop_time, tree_time = time_prefilters(slide, contours, args)
+        print(f"{'  prefilter':>14}: {tree_time * 1000:9.1f} ms with STRtree, {loop_time * 1000:.1f} ms with a loop over bounding boxes")
+        for oversample in args.raster_oversample:
+            elapsed, valid = time_patching(slide, contours, args, mask_mode='raster', raster_oversample=oversample)
+            agreement = np.mean(valid == reference)
+            print(
+                f"{f'raster x{oversample}':>14}: {elapsed * 1000:9.1f} ms ({reference_time / elapsed:.1f}x), "
+                f"agreement {agreement:.2%}, +{np.sum(valid & ~reference)} / -{np.sum(~valid & reference)} patches"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark the read throughput of patches in column, row and Hilbert order (`WSIPatcher(order=...)`).
+
+Reads the patches of a slide in batches, as the feature extraction DataLoader does, with a bounded
+OpenSlide tile cache. Column-major batches stride down the slide, so tiles shared with the next
+column are evicted before they are read again. Reports the patches read per second and the native
+tiles decoded per patch by an LRU tile cache of the same size.
+
+Example usage:
+
+```
+python benchmarks/benchmark_patch_order.py --mag 20 --patch_size 224 --cache_mb 32
+python benchmarks/benchmark_patch_order.py --slide path/to/slide.svs --mag 20 --patch_size 256 --overlap 64
+```
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+import numpy as np
+import openslide
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from trident import OpenSlideWSI
+from _synthetic import make_pyramidal_tiff
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmark the read throughput of patch orders')
+    parser.add_argument('--slide', type=str, default=None, help='Slide to benchmark. Defaults to a synthetic pyramidal TIFF.')
+    parser.add_argument('--mag', type=int, default=20, help='Target magnification of the patches.')
+    parser.add_argument('--patch_size', type=int, default=224, help='Patch size at the target magnification.')
+    parser.add_argument('--overlap', type=int, default=0, help='Overlap between patches in pixels.')
+    parser.add_argument('--batch_size', type=int, default=64, help='Number of patches per read_regions call.')
+    parser.add_argument('--cache_mb', type=int, default=32, help='Size of the OpenSlide tile cache in MiB (OpenSlide default: 32).')
+    parser.add_argument('--orders', type=str, nargs='+', default=['column', 'row', 'hilbert'], help='Patch orders to benchmark.')
+    return parser.parse_args()
+
+
+def lru_decoded_tiles(coords, downsample, size, tile_size, capacity):
+    """ Number of native tiles decoded to read the patches in order, with an LRU cache of `capacity` tiles """
+    cache, decoded = OrderedDict(), 0
+    for x, y in np.round(np.asarray(coords) / downsample).astype(int):
+        for ty in range(y // tile_size[1], (y + size - 1) // tile_size[1] + 1):
+            for tx in range(x // tile_size[0], (x + size - 1) // tile_size[0] + 1):
+                if (tx, ty) in cache:
+                    cache.move_to_end((tx, ty))
+                    continue
+                decoded += 1
+                cache[(tx, ty)] = None
+                if len(cache) > capacity:
+                    cache.popitem(last=False)
+    return decoded
+
+
+def time_reads(slide_path, coords, level, size, batch_size, cache_mb):
+    # A fresh slide (and tile cache) per order
+    wsi = OpenSlideWSI(slide_path=slide_path, lazy_init=False)
+    wsi.img.set_cache(openslide.OpenSlideCache(cache_mb * 2**20))
+    start = time.perf_counter()
+    for i in range(0, len(coords), batch_size):
+        wsi.read_regions(coords[i:i + batch_size], level, (size, size))
+    return time.perf_counter() - start
+
+
+def main():
+    args = parse_arguments()
+    slide_path = args.slide or make_pyramidal_tiff(os.path.join(tempfile.gettempdir(), 'trident_benchmark_slide.tif'))
+    wsi = OpenSlideWSI(slide_path=slide_path, lazy_init=False)
+    tile_size = wsi.get_tile_size(0) or (256, 256)
+
+    print(f'{slide_path}: {wsi.width}x{wsi.height}, OpenSlide tile cache of {args.cache_mb} MiB')
+    baseline = None
+    for order in args.orders:
+        patcher = wsi.create_patcher(patch_size=args.patch_size, src_mag=wsi.mag, dst_mag=args.mag, overlap=args.overlap, order=order)
+        coords, level, size = np.asarray(patcher.valid_coords), patcher.level, patcher.patch_size_level
+        tile_size = wsi.get_tile_size(level) or tile_size
+        capacity = args.cache_mb * 2**20 // (tile_size[0] * tile_size[1] * 4)  # OpenSlide caches ARGB tiles
+        decoded = lru_decoded_tiles(coords, wsi.level_downsamples[level], size, tile_size, capacity)
+        elapsed = time_reads(slide_path, coords, level, size, args.batch_size, args.cache_mb)
+        throughput = len(coords) / elapsed
+        baseline = baseline or throughput
+        print(
+            f'{order:>8}: {len(coords)} patches of {size}px at level {level}, '
+            f'{decoded / len(coords):5.2f} tiles decoded/patch, {throughput:8.1f} patches/s ({throughput / baseline:.2f}x)'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark reading the patches of many small slides (e.g., biopsies) with a DataLoader per slide, which starts,
+forks and tears down its workers for every slide, against a single `SlideReaderPool` streaming all the slides.
+
+With `--ballast_gb`, the parent process holds that much memory (e.g., a resident patch encoder) to show the cost of
+forking a large process once per slide.
+
+Example usage:
+
+```
+python benchmarks/benchmark_reader_pool.py --n_slides 50 --num_workers 4
+python benchmarks/benchmark_reader_pool.py --n_slides 50 --num_workers 8 --ballast_gb 4
+```
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import torch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from trident import OpenSlideWSI, SlideReaderPool
+from trident.wsi_objects.WSIPatcherDataset import WSIPatcherDataset
+from trident.wsi_objects.PrefetchLoader import make_patch_dataloader
+from _synthetic import make_pyramidal_tiff
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmark the reader pool shared across slides')
+    parser.add_argument('--n_slides', type=int, default=50, help='Number of slides (the same synthetic biopsy, reopened).')
+    parser.add_argument('--slide_size', type=int, default=3072, help='Edge of the synthetic slides at level 0.')
+    parser.add_argument('--patch_size', type=int, default=256, help='Patch size.')
+    parser.add_argument('--batch_size', type=int, default=64, help='Number of patches per batch.')
+    parser.add_argument('--num_workers', type=int, default=4, help='Number of worker processes.')
+    parser.add_argument('--ballast_gb', type=float, default=0, help='Memory held by the parent process, in GB.')
+    return parser.parse_args()
+
+
+def datasets(slide_path, args):
+    for _ in range(args.n_slides):
+        wsi = OpenSlideWSI(slide_path=slide_path, lazy_init=False)
+        yield WSIPatcherDataset(wsi.create_patcher(patch_size=args.patch_size, src_mag=wsi.mag, dst_mag=wsi.mag, pil=False), transform=None)
+
+
+def main():
+    args = parse_arguments()
+    slide_path = make_pyramidal_tiff(
+        os.path.join(tempfile.gettempdir(), f'trident_benchmark_biopsy_{args.slide_size}.tif'), width=args.slide_size, height=args.slide_size
+    )
+    ballast = torch.ones(int(args.ballast_gb * 2**30), dtype=torch.uint8) if args.ballast_gb else None
+    print(f'{args.n_slides} slides of {args.slide_size}x{args.slide_size}, {args.patch_size}px patches, {args.num_workers} workers, {args.ballast_gb} GB parent')
+
+    start = time.perf_counter()
+    n_patches = 0
+    for dataset in datasets(slide_path, args):
+        for imgs, _ in make_patch_dataloader(dataset, batch_size=args.batch_size, num_workers=args.num_workers):
+            n_patches += len(imgs)
+    per_slide = time.perf_counter() - start
+    print(f"{'DataLoader per slide':>22}: {per_slide:7.2f} s, {n_patches / per_slide:8.1f} patches/s")
+
+    start = time.perf_counter()
+    n_patches = 0
+    with SlideReaderPool(num_workers=args.num_workers) as pool:
+        for _, batch in pool.stream((i, dataset, args.batch_size, None) for i, dataset in enumerate(datasets(slide_path, args))):
+            if batch is not None:
+                n_patches += len(batch[0])
+    pooled = time.perf_counter() - start
+    print(f"{'SlideReaderPool':>22}: {pooled:7.2f} s, {n_patches / pooled:8.1f} patches/s ({per_slide / pooled:.1f}x faster)")
+    del ballast
+
+
+if __name__ == '__main__':
+    main()
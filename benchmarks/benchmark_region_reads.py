@@ -0,0 +1,81 @@
+"""
+Benchmark the region mode of `WSIPatcherDataset`: one `read_region` call per region of `region_size`
+pixels cut into its patches, against patch batches read with `read_regions`.
+
+Reports the patches read per second and the number of regions requested from OpenSlide. The per-patch
+batches already benefit from the tile-aligned coalescing of `OpenSlideWSI.read_regions`.
+
+Example usage:
+
+```
+python benchmarks/benchmark_region_reads.py --mag 20 --patch_size 256 --region_size 2048 4096
+python benchmarks/benchmark_region_reads.py --slide path/to/slide.svs --mag 20 --patch_size 224 --overlap 32
+```
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from trident import OpenSlideWSI
+from trident.wsi_objects.WSIPatcherDataset import WSIPatcherDataset, collate_regions
+from trident.wsi_objects.PrefetchLoader import ThreadedPrefetchLoader
+from _synthetic import make_pyramidal_tiff
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmark region reads of WSIPatcherDataset')
+    parser.add_argument('--slide', type=str, default=None, help='Slide to benchmark. Defaults to a synthetic pyramidal TIFF.')
+    parser.add_argument('--mag', type=int, default=20, help='Target magnification of the patches.')
+    parser.add_argument('--patch_size', type=int, default=256, help='Patch size at the target magnification.')
+    parser.add_argument('--overlap', type=int, default=0, help='Overlap between patches in pixels.')
+    parser.add_argument('--batch_size', type=int, default=64, help='Number of patches per batch (per-patch mode).')
+    parser.add_argument('--region_size', type=int, nargs='+', default=[2048, 4096], help='Region sizes at the read level to benchmark.')
+    return parser.parse_args()
+
+
+def count_reader_calls(wsi):
+    """ Count the regions requested from OpenSlide (after the read coalescing of `read_regions`) """
+    counter = {'calls': 0}
+    read_argb = wsi._read_argb
+    def counted(*args, **kwargs):
+        counter['calls'] += 1
+        return read_argb(*args, **kwargs)
+    wsi._read_argb = counted
+    return counter
+
+
+def time_loader(wsi, args, region_size):
+    patcher = wsi.create_patcher(patch_size=args.patch_size, src_mag=wsi.mag, dst_mag=args.mag, overlap=args.overlap, region_size=region_size)
+    dataset = WSIPatcherDataset(patcher, transform=None)
+    if region_size is None:
+        loader = ThreadedPrefetchLoader(dataset, batch_size=args.batch_size)
+    else:
+        loader = ThreadedPrefetchLoader(dataset, batch_size=1, collate_fn=collate_regions)
+    counter = count_reader_calls(wsi)
+    start = time.perf_counter()
+    n_patches = sum(len(imgs) for imgs, _ in loader)
+    elapsed = time.perf_counter() - start
+    del wsi._read_argb
+    return n_patches, elapsed, counter['calls']
+
+
+def main():
+    args = parse_arguments()
+    slide_path = args.slide or make_pyramidal_tiff(os.path.join(tempfile.gettempdir(), 'trident_benchmark_slide.tif'))
+    wsi = OpenSlideWSI(slide_path=slide_path, lazy_init=False)
+    print(f'{slide_path}: {wsi.width}x{wsi.height}, {args.patch_size}px patches at {args.mag}x, overlap={args.overlap}')
+    baseline = None
+    for region_size in [None] + args.region_size:
+        n_patches, elapsed, calls = time_loader(wsi, args, region_size)
+        throughput = n_patches / elapsed
+        baseline = baseline or throughput
+        name = 'patches' if region_size is None else f'region {region_size}'
+        print(f'{name:>12}: {n_patches} patches, {calls:5d} read calls, {throughput:8.1f} patches/s ({throughput / baseline:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark the tifffile backend (thread-pool tile decoding) against OpenSlide.
+
+Both readers read the same patches with `read_regions` in a single process. OpenSlide decodes
+the tiles of a batch sequentially; `TiffFileWSI` decodes them with `--threads` threads.
+
+Example usage:
+
+```
+python benchmarks/benchmark_tifffile_reader.py --mag 20 --patch_size 256 --threads 1 4 8
+python benchmarks/benchmark_tifffile_reader.py --slide path/to/slide.svs --mag 20 --patch_size 224
+```
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from trident import OpenSlideWSI, TiffFileWSI
+from _synthetic import make_pyramidal_tiff
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmark the tifffile reader against OpenSlide')
+    parser.add_argument('--slide', type=str, default=None, help='Slide to benchmark. Defaults to a synthetic pyramidal TIFF.')
+    parser.add_argument('--mag', type=int, default=20, help='Target magnification of the patches.')
+    parser.add_argument('--patch_size', type=int, default=256, help='Patch size at the target magnification.')
+    parser.add_argument('--batch_size', type=int, default=64, help='Number of patches per read_regions call.')
+    parser.add_argument('--max_patches', type=int, default=2048, help='Maximum number of patches to read.')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, os.cpu_count()], help='Decode thread counts of the tifffile reader.')
+    return parser.parse_args()
+
+
+def time_reads(wsi, coords, level, size, batch_size):
+    wsi.read_regions(coords[:batch_size], level, size)  # warm up (file cache, thread pool)
+    start = time.perf_counter()
+    for i in range(0, len(coords), batch_size):
+        wsi.read_regions(coords[i:i + batch_size], level, size)
+    return time.perf_counter() - start
+
+
+def main():
+    args = parse_arguments()
+    slide_path = args.slide or make_pyramidal_tiff(os.path.join(tempfile.gettempdir(), 'trident_benchmark_slide.tif'))
+    reference = OpenSlideWSI(slide_path=slide_path, lazy_init=False)
+    patcher = reference.create_patcher(patch_size=args.patch_size, src_mag=reference.mag, dst_mag=args.mag)
+    coords = np.asarray(patcher.valid_coords)[:args.max_patches]
+    size = (patcher.patch_size_level, patcher.patch_size_level)
+
+    print(f'{len(coords)} patches of {size[0]}px at level {patcher.level}, batches of {args.batch_size}')
+    baseline = len(coords) / time_reads(reference, coords, patcher.level, size, args.batch_size)
+    print(f"{'openslide':>14}: {baseline:9.1f} patches/s")
+    for threads in sorted(set(args.threads)):
+        wsi = TiffFileWSI(slide_path=slide_path, lazy_init=False, num_decode_threads=threads)
+        speed = len(coords) / time_reads(wsi, coords, patcher.level, size, args.batch_size)
+        print(f"{f'tifffile x{threads}':>14}: {speed:9.1f} patches/s ({speed / baseline:.2f}x)")
+        wsi.close()
+
+
+if __name__ == '__main__':
+    main()
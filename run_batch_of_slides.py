@@ -25,24 +25,30 @@ def parse_arguments():
                         help='Task to run: cache, seg (segmentation), coords (save tissue coordinates), img (save tissue images), feat (extract features)')
     parser.add_argument('--job_dir', type=str, required=True, help='Directory to store outputs')
     parser.add_argument('--wsi_cache', type=str, default=None, 
-                        help='Directory to copy slides to for local processing')
+                        help='Directory to copy slides to for local processing (for an http(s) --wsi_dir: cache of the fetched blocks)')
     parser.add_argument('--clear_cache', action='store_true', default=False, 
                         help='Delete slides from cache after processing')
     parser.add_argument('--skip_errors', action='store_true', default=False, 
                         help='Skip errored slides and continue processing')
     parser.add_argument('--max_workers', type=int, default=None, help='Maximum number of workers. Set to 0 to use main process.')
+    parser.add_argument('--tile_cache_gb', type=float, default=None, 
+                        help='RAM budget (in GB) of a decoded-tile cache shared across slides and data loading workers. Defaults to None (no cache).')
+    parser.add_argument('--persist_thumbnails', action='store_true', default=False,
+                        help='Save thumbnails and low-resolution levels in the job directory, to reuse them across runs.')
+    parser.add_argument('--persistent_readers', action='store_true', default=False,
+                        help='Read patches with a single pool of workers shared by all slides, instead of a DataLoader per slide.')
 
     # Slide-related arguments
     parser.add_argument('--wsi_dir', type=str, required=True, 
-                        help='Directory containing WSI files (no nesting allowed)')
+                        help='Directory containing WSI files (no nesting allowed), or http(s) URL prefix of the slides listed in --custom_list_of_wsis')
     parser.add_argument('--wsi_ext', type=str, nargs='+', default=None, 
                         help='List of allowed file extensions for WSI files')
     parser.add_argument('--custom_mpp_keys', type=str, nargs='+', default=None,
                     help='Custom keys used to store the resolution as MPP (micron per pixel) in your list of whole-slide image.')
     parser.add_argument('--custom_list_of_wsis', type=str, default=None,
                     help='Custom list of WSIs specified in a csv file.')
-    parser.add_argument('--reader_type', type=str, choices=['openslide', 'image', 'cucim'], default=None,
-                    help='Force the use of a specific WSI image reader. Options are ["openslide", "image", "cucim"]. Defaults to None (auto-determine which reader to use).')
+    parser.add_argument('--reader_type', type=str, choices=['openslide', 'image', 'cucim', 'tifffile'], default=None,
+                    help='Force the use of a specific WSI image reader. Options are ["openslide", "image", "cucim", "tifffile"]. Defaults to None (auto-determine which reader to use).')
     
     # Segmentation arguments 
     parser.add_argument('--segmenter', type=str, default='hest', 
@@ -65,6 +71,12 @@ def parse_arguments():
                         help='Absolute overlap for patching in pixels. Defaults to 0. ')
     parser.add_argument('--min_tissue_proportion', type=float, default=0., 
                         help='Minimum proportion of the patch under tissue to be kept. Between 0. and 1.0. Defaults to 0. ')
+    parser.add_argument('--mask_mode', type=str, choices=['geometry', 'raster'], default='geometry', 
+                        help='How patches are intersected with the tissue contours: exact polygon geometry, or a rasterized '
+                             'mask (faster on large slides). Defaults to geometry.')
+    parser.add_argument('--patch_order', type=str, choices=['column', 'row', 'hilbert'], default='column', 
+                        help='Order of the saved patch coordinates. Row by row or along a Hilbert curve, consecutive patches '
+                             'are close on the slide and feature extraction reads faster. Defaults to column.')
     parser.add_argument('--coords_dir', type=str, default=None, 
                         help='Directory to save/restore tissue coordinates')
     # Feature extraction arguments 
@@ -94,6 +106,12 @@ def parse_arguments():
                         help='Slide encoder to use')
     parser.add_argument('--batch_size', type=int, default=32, 
                         help='Batch size for feature extraction. Defaults to 32.')
+    parser.add_argument('--region_size', type=int, default=None, 
+                        help='Read slides by regions of this size (e.g., 2048 or 4096 pixels at the read level) during patch '
+                             'feature extraction, each cut into all its patches, instead of patch by patch. Defaults to None.')
+    parser.add_argument('--batch_transforms', action='store_true', default=False, 
+                        help='Load patches as uint8 tiles and resize/normalize them once per batch on the GPU, instead of '
+                             'tile by tile in the data loading workers.')
     return parser.parse_args()
 
 def initialize_processor(args):
@@ -110,7 +128,10 @@ def initialize_processor(args):
         custom_mpp_keys=args.custom_mpp_keys,
         custom_list_of_wsis=args.custom_list_of_wsis,
         max_workers=args.max_workers,
-        reader_type=args.reader_type
+        reader_type=args.reader_type,
+        tile_cache_budget=int(args.tile_cache_gb * 1024**3) if args.tile_cache_gb else None,
+        persist_thumbnails=args.persist_thumbnails,
+        persistent_readers=args.persistent_readers,
     )
 
 def run_task(processor, args):
@@ -153,7 +174,9 @@ def run_task(processor, args):
             patch_size=args.patch_size,
             overlap=args.overlap,
             saveto=args.coords_dir,
-            min_tissue_proportion=args.min_tissue_proportion
+            min_tissue_proportion=args.min_tissue_proportion,
+            mask_mode=args.mask_mode,
+            patch_order=args.patch_order,
         )
     elif args.task == 'feat':
         if args.slide_encoder is None: # Run patch encoder:
@@ -167,6 +190,8 @@ def run_task(processor, args):
                 device=f'cuda:{args.gpu}',
                 saveas='h5',
                 batch_limit=args.batch_size,
+                region_size=args.region_size,
+                batch_transforms=args.batch_transforms,
             )
         else:
             # Minimal example for feature extraction:
@@ -200,5 +225,7 @@ def main():
     else:
         run_task(processor, args)
 
+    processor.close()
+
 if __name__ == "__main__":
     main()
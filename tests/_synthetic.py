@@ -0,0 +1,60 @@
+"""
+Synthetic slides shared by the test modules.
+"""
+
+import os
+import numpy as np
+from PIL import Image
+
+
+def make_synthetic_slides(tmp_dir, shape, tiff=False, downsamples=(), png=True, name='slide', compression=None):
+    """
+    Write a random RGB image as a PNG slide and, optionally, as a tiled TIFF slide at 0.5 mpp.
+
+    Args:
+        tmp_dir (str): directory of the slides.
+        shape (tuple): (height, width) of the image.
+        tiff (bool): also write a tiled TIFF (256px tiles), if tifffile is installed.
+        downsamples (tuple): downsample factors of the reduced-resolution levels of the TIFF.
+        png (bool): write the PNG slide.
+        name (str): file name of the slides, without extension.
+        compression (str): TIFF compression passed to tifffile. Defaults to None.
+
+    Returns:
+        tuple: the (height, width, 3) uint8 image, the PNG path and the TIFF path (None if not written).
+    """
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (*shape, 3), dtype=np.uint8)
+
+    png_path = None
+    if png:
+        png_path = os.path.join(tmp_dir, f'{name}.png')
+        Image.fromarray(image).save(png_path)
+
+    tiff_path = None
+    if tiff:
+        try:
+            import tifffile
+        except ImportError:
+            return image, png_path, None
+        tiff_path = os.path.join(tmp_dir, f'{name}.tif')
+        with tifffile.TiffWriter(tiff_path) as tw:
+            tw.write(image, tile=(256, 256), compression=compression, photometric='rgb', resolution=(1e4 / 0.5, 1e4 / 0.5), resolutionunit='CENTIMETER')
+            for downsample in downsamples:
+                tw.write(image[::downsample, ::downsample], tile=(256, 256), compression=compression, photometric='rgb', subfiletype=1)
+    return image, png_path, tiff_path
+
+
+class FakeWSI:
+    """ Minimal slide exposing what WSIPatcher needs to build its grid. """
+
+    def __init__(self, width, height):
+        self.width, self.height = width, height
+        self.level_downsamples = [1, 4, 16]
+
+    def get_dimensions(self):
+        return self.width, self.height
+
+    def get_best_level_and_custom_downsample(self, downsample, tolerance=0.01):
+        level = max((i for i, ds in enumerate(self.level_downsamples) if ds <= downsample * (1 + tolerance)), default=0)
+        return level, downsample / self.level_downsamples[level]
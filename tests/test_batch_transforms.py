@@ -0,0 +1,189 @@
+import os
+import shutil
+import tempfile
+import unittest
+import h5py
+import cv2
+import numpy as np
+import torch
+import geopandas as gpd
+from PIL import Image
+from shapely import Point
+from torchvision import transforms as T
+from torch.utils.data import DataLoader
+
+import sys; sys.path.append('../')
+from trident import load_wsi, WSIPatcherDataset, BatchedTransform
+import trident.patch_encoder_models as patch_encoder_models
+from trident.patch_encoder_models.utils.transform_utils import get_eval_transforms, compile_eval_transforms
+
+"""
+Test that encoder transforms applied once per batch of uint8 tiles (`BatchedTransform`) match the
+per-tile PIL path, for the transform specs of all the patch encoders, and feature extraction with
+uint8 patch transport.
+"""
+
+MEAN, STD = (0.485, 0.456, 0.406), (0.229, 0.224, 0.225)
+
+
+def smooth_tiles(n, size, seed=0):
+    """ Tiles with tissue-like smooth texture, where resampling kernels differ by a gray level or two """
+    rng = np.random.default_rng(seed)
+    return np.stack([cv2.resize(rng.integers(0, 256, (16, 16, 3), dtype=np.uint8), (size, size), interpolation=cv2.INTER_CUBIC) for _ in range(n)])
+
+
+class TestBatchedTransform(unittest.TestCase):
+
+    def test_matches_pil_transforms(self):
+        tiles = smooth_tiles(6, 256)
+        cases = [
+            T.Compose([T.Resize(224), T.CenterCrop(224), T.ToTensor(), T.Normalize(MEAN, STD)]),
+            T.Compose([T.Resize(224, interpolation=T.InterpolationMode.BICUBIC), T.ToTensor(), T.Normalize(MEAN, STD)]),
+            T.Compose([T.Resize(256, interpolation=T.InterpolationMode.BICUBIC), T.CenterCrop(224), T.ToTensor(), T.Normalize(MEAN, STD)]),
+            T.Compose([T.Resize(448, interpolation=T.InterpolationMode.BILINEAR, antialias=True), T.ToTensor()]),
+            T.Compose([T.Compose([T.ToTensor()]), T.Normalize(MEAN, STD)]),
+        ]
+        for transform in cases:
+            with self.subTest(transform=transform):
+                expected = torch.stack([transform(Image.fromarray(tile)) for tile in tiles])
+                batched = BatchedTransform(transform)(torch.from_numpy(tiles))
+                self.assertEqual(batched.shape, expected.shape)
+                self.assertEqual(batched.dtype, torch.float32)
+                # uint8 resampling rounds differently from PIL's, by at most two gray levels
+                torch.testing.assert_close(batched, expected, atol=2.01 / 255 / min(STD), rtol=0)
+
+    def test_encoder_specs_match_pil_transforms(self):
+        encoders = [getattr(patch_encoder_models, name) for name in patch_encoder_models.__all__ if name.endswith('InferenceEncoder')]
+        # Transforms of CONCH v1 (open_clip) and Lunit (timm data config) come with the model
+        library_transforms = {'CustomInferenceEncoder', 'Conchv1InferenceEncoder', 'LunitS8InferenceEncoder'}
+        self.assertEqual({enc.__name__ for enc in encoders if enc.EVAL_TRANSFORMS_SPEC is None}, library_transforms)
+
+        for enc in encoders:
+            if enc.EVAL_TRANSFORMS_SPEC is None:
+                continue
+            transform = get_eval_transforms(**enc.EVAL_TRANSFORMS_SPEC)
+            compiled = compile_eval_transforms(**enc.EVAL_TRANSFORMS_SPEC)
+            for size in [224, 256, 512]:
+                with self.subTest(encoder=enc.__name__, size=size):
+                    tiles = smooth_tiles(2, size)
+                    expected = torch.stack([transform(Image.fromarray(tile)) for tile in tiles])
+                    batched = compiled(torch.from_numpy(tiles))
+                    self.assertEqual(batched.shape, expected.shape)
+                    torch.testing.assert_close(batched, expected, atol=2.01 / 255 / min(enc.EVAL_TRANSFORMS_SPEC['std']), rtol=0)
+
+    def test_noop_steps(self):
+        compiled = compile_eval_transforms(MEAN, STD, target_img_size=224, center_crop=True)
+        self.assertEqual(compiled.plan((224, 224)), [])
+        self.assertEqual([type(step).__name__ for step in compiled.plan((256, 256))], ['_Resize'])
+        self.assertEqual([type(step).__name__ for step in compiled.plan((224, 300))], ['_CenterCrop'])
+        self.assertEqual(compiled.output_size((300, 400)), (224, 224))
+
+        # Without resampling, the fused conversion matches PIL up to float rounding
+        tiles = smooth_tiles(3, 224)
+        expected = torch.stack([compiled.transform(Image.fromarray(tile)) for tile in tiles])
+        torch.testing.assert_close(compiled(torch.from_numpy(tiles)), expected, atol=1e-5, rtol=0)
+
+        # Resize to 256 then crop to 224: the crop is kept
+        compiled = compile_eval_transforms(MEAN, STD, target_img_size=256, center_crop=True, crop_img_size=224)
+        self.assertEqual([type(step).__name__ for step in compiled.plan((224, 224))], ['_Resize', '_CenterCrop'])
+        self.assertEqual([type(step).__name__ for step in compiled.plan((256, 256))], ['_CenterCrop'])
+
+    def test_folded_rescale(self):
+        tiles = smooth_tiles(3, 256)
+        transform = T.Compose([T.Resize(96, interpolation=T.InterpolationMode.BICUBIC), T.CenterCrop(96), T.ToTensor(), T.Normalize(MEAN, STD)])
+        # 128px patches read as 256px tiles: a single resize from 256 to the encoder input size
+        compiled = BatchedTransform(transform, input_size=(128, 128))
+        self.assertEqual([repr(step) for step in compiled.plan((256, 256))], ['Resize(size=[96, 96], interpolation=bicubic, antialias=True)'])
+        expected = torch.stack([transform(Image.fromarray(tile)) for tile in tiles])
+        torch.testing.assert_close(compiled(torch.from_numpy(tiles)), expected, atol=2.01 / 255 / min(STD), rtol=0)
+
+        # Read size already the encoder input size: no resampling at all
+        self.assertEqual(compiled.plan((96, 96)), [])
+        self.assertEqual([repr(step) for step in compiled.plan((128, 128))], ['Resize(size=[96, 96], interpolation=bicubic, antialias=True)'])
+
+        # Without a resize in the transform, tiles are rescaled to input_size
+        compiled = BatchedTransform(T.Compose([T.ToTensor()]), input_size=(128, 128))
+        self.assertEqual(compiled(torch.from_numpy(tiles)).shape, (3, 3, 128, 128))
+
+    def test_unsupported_transforms(self):
+        for transform in [
+            T.Compose([T.Resize(224), T.Normalize(MEAN, STD)]),  # no ToTensor
+            T.Compose([lambda image: image.convert('RGB'), T.ToTensor()]),
+            T.Compose([T.Normalize(MEAN, STD), T.ToTensor()]),
+            T.Compose([T.ToTensor(), T.Resize(224)]),  # resize of float tensors
+        ]:
+            with self.subTest(transform=transform):
+                self.assertFalse(BatchedTransform.supports(transform))
+                with self.assertRaises(ValueError):
+                    BatchedTransform(transform)
+
+    def test_uint8_batches(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            png_path = os.path.join(tmp_dir, 'slide.png')
+            Image.fromarray(smooth_tiles(1, 1024)[0]).save(png_path)
+            wsi = load_wsi(png_path, mpp=0.5, lazy_init=False, max_workers=0)
+            patcher = wsi.create_patcher(patch_size=128, src_mag=20, dst_mag=10)
+            tiles, _ = next(iter(DataLoader(WSIPatcherDataset(patcher, transform=None), batch_size=4)))
+            self.assertEqual(tiles.dtype, torch.uint8)
+            self.assertEqual(tiles.shape, (4, 128, 128, 3))
+            # Tiles as read (160px at 20x for 128px patches at 16x), left for the consumer to rescale
+            patcher = wsi.create_patcher(patch_size=128, src_mag=20, dst_mag=16, rescale=False)
+            self.assertEqual(patcher.tile_size, 160)
+            tiles, _ = next(iter(DataLoader(WSIPatcherDataset(patcher, transform=None), batch_size=4)))
+            self.assertEqual(tiles.shape, (4, 160, 160, 3))
+
+            class MeanColor(torch.nn.Module):
+                eval_transforms = T.Compose([T.Resize(96), T.ToTensor(), T.Normalize(MEAN, STD)])
+                def forward(self, imgs):
+                    return imgs.mean(dim=(2, 3))
+
+            wsi.gdf_contours = gpd.GeoDataFrame(geometry=[Point(500, 500).buffer(400)])
+            coords_path = wsi.extract_tissue_coords(target_mag=16, patch_size=64, save_coords=tmp_dir)  # 80px tiles at 20x
+            features = []
+            for batch_transforms in [False, True]:
+                path = wsi.extract_patch_features(
+                    patch_encoder=MeanColor(), coords_path=coords_path, save_features=os.path.join(tmp_dir, f'features_{batch_transforms}'),
+                    device='cpu', batch_limit=32, batch_transforms=batch_transforms,
+                )
+                with h5py.File(path, 'r') as f:
+                    features.append(f['features'][:])
+            np.testing.assert_allclose(features[1], features[0], atol=1.01 / 255 / min(STD))
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_unsupported_transforms_fall_back(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            png_path = os.path.join(tmp_dir, 'slide.png')
+            Image.fromarray(smooth_tiles(1, 512)[0]).save(png_path)
+            wsi = load_wsi(png_path, mpp=0.5, lazy_init=False, max_workers=0)
+
+            class Grayscale(torch.nn.Module):
+                eval_transforms = T.Compose([T.Lambda(lambda img: img.convert('L').convert('RGB')), T.ToTensor()])
+                def forward(self, imgs):
+                    return imgs.mean(dim=(2, 3))
+
+            self.assertFalse(BatchedTransform.supports(Grayscale.eval_transforms))
+            wsi.gdf_contours = gpd.GeoDataFrame(geometry=[Point(250, 250).buffer(200)])
+            coords_path = wsi.extract_tissue_coords(target_mag=10, patch_size=64, save_coords=tmp_dir)
+            features = []
+            for batch_transforms in [False, True]:
+                kwargs = dict(
+                    patch_encoder=Grayscale(), coords_path=coords_path, save_features=os.path.join(tmp_dir, f'features_{batch_transforms}'),
+                    device='cpu', batch_limit=32, batch_transforms=batch_transforms,
+                )
+                if batch_transforms:
+                    with self.assertWarnsRegex(UserWarning, 'per-tile transforms'):
+                        path = wsi.extract_patch_features(**kwargs)
+                else:
+                    path = wsi.extract_patch_features(**kwargs)
+                with h5py.File(path, 'r') as f:
+                    features.append(f['features'][:])
+            np.testing.assert_array_equal(features[1], features[0])
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+import unittest
+import cv2
+import numpy as np
+from PIL import Image
+
+import sys; sys.path.append('../')
+from _synthetic import make_synthetic_slides
+from trident import load_wsi
+from trident.wsi_objects.TiledImageStore import TiledImageStore
+
+"""
+Test the tile-chunked (optionally memory-mapped) backing store of ImageWSI.
+"""
+
+class TestImageWSIStore(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.image, cls.png_path, _ = make_synthetic_slides(cls.tmp_dir, (1100, 1030))
+        cls.cache_dir = os.path.join(cls.tmp_dir, 'cache')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def test_regions_match_pil_crops(self):
+        pil_img = Image.fromarray(self.image)
+        for use_memmap in (True, False):
+            wsi = load_wsi(self.png_path, mpp=0.5, lazy_init=False, use_memmap=use_memmap, cache_dir=self.cache_dir)
+            for location, size in [((0, 0), (256, 256)), ((1000, 1050), (128, 64)), ((-10, 20), (50, 50)), ((255, 257), (300, 10))]:
+                with self.subTest(use_memmap=use_memmap, location=location):
+                    expected = np.asarray(pil_img.crop((*location, location[0] + size[0], location[1] + size[1])))
+                    np.testing.assert_array_equal(wsi.read_region(location, 0, size, read_as='numpy'), expected)
+
+    def test_memmap_is_reused(self):
+        wsi = load_wsi(self.png_path, mpp=0.5, lazy_init=False, cache_dir=self.cache_dir)
+        cache_path = TiledImageStore.cache_path_of(self.png_path, self.cache_dir)
+        self.assertIsInstance(wsi.img.chunks, np.memmap)
+        mtime = os.stat(cache_path).st_mtime_ns
+
+        wsi = load_wsi(self.png_path, mpp=0.5, lazy_init=False, cache_dir=self.cache_dir)
+        self.assertEqual(os.stat(cache_path).st_mtime_ns, mtime)
+        self.assertEqual(wsi.get_dimensions(), (1030, 1100))
+
+    def test_thumbnail(self):
+        wsi = load_wsi(self.png_path, mpp=0.5, lazy_init=False, cache_dir=self.cache_dir)
+        thumb = wsi.get_thumbnail((200, 200))
+        expected = Image.fromarray(self.image)
+        expected.thumbnail((200, 200))
+        self.assertEqual(thumb.size, expected.size)
+        level1 = cv2.resize(self.image, (515, 550), interpolation=cv2.INTER_AREA)  # thumbnail resampled from level 1
+        np.testing.assert_array_equal(np.asarray(thumb), cv2.resize(level1, thumb.size, interpolation=cv2.INTER_AREA))
+
+    def test_synthetic_pyramid(self):
+        for use_memmap in (True, False):
+            with self.subTest(use_memmap=use_memmap):
+                wsi = load_wsi(self.png_path, mpp=0.5, lazy_init=False, use_memmap=use_memmap, cache_dir=self.cache_dir)
+                self.assertEqual(wsi.level_downsamples, [1, 2])
+                self.assertEqual(wsi.level_dimensions, [(1030, 1100), (515, 550)])
+                self.assertEqual(wsi.get_best_level_and_custom_downsample(2.5)[0], 1)
+
+                level1 = cv2.resize(self.image, (515, 550), interpolation=cv2.INTER_AREA)
+                region = wsi.read_region((200, 600), 1, (300, 100), read_as='numpy')
+                np.testing.assert_array_equal(region, level1[300:400, 100:400])
+
+                patcher = wsi.create_patcher(patch_size=128, src_mag=20, dst_mag=10)
+                self.assertEqual(patcher.level, 1)
+                self.assertEqual(patcher.patch_size_level, 128)
+
+    def test_interrupted_build_leaves_no_partial_file(self):
+        cache_dir = os.path.join(self.tmp_dir, 'interrupted')
+        os.makedirs(cache_dir)
+
+        def read_rows(y0, y1):
+            if y0 > 0:
+                raise KeyboardInterrupt
+            return self.image[y0:y1]
+
+        with self.assertRaises(KeyboardInterrupt):
+            TiledImageStore._build(1030, 1100, 256, os.path.join(cache_dir, 'slide.npy'), read_rows)
+        self.assertEqual(os.listdir(cache_dir), [])
+
+    def test_image_cache_dir(self):
+        cache_dir = os.path.join(self.tmp_dir, 'image_cache')
+        wsi = load_wsi(self.png_path, mpp=0.5, lazy_init=False, image_cache_dir=cache_dir)
+        self.assertEqual(os.path.dirname(wsi.img.cache_path), cache_dir)
+        self.assertTrue(os.path.exists(TiledImageStore.cache_path_of(self.png_path, cache_dir)))
+
+
+if __name__ == '__main__':
+    unittest.main()
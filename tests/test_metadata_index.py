@@ -0,0 +1,63 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+
+import sys; sys.path.append('../')
+from _synthetic import make_synthetic_slides
+from trident import load_wsi, SlideMetadataIndex
+from trident.wsi_objects.OpenSlideWSI import OpenSlideWSI
+
+"""
+Test the persistent slide metadata index: indexed slides are initialized without being opened.
+"""
+
+class TestSlideMetadataIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.image, cls.png_path, cls.tiff_path = make_synthetic_slides(cls.tmp_dir, (600, 700), tiff=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def test_restore_without_opening(self):
+        if self.tiff_path is None:
+            self.skipTest('tifffile is required to write a tiled test slide.')
+        index = SlideMetadataIndex(os.path.join(self.tmp_dir, 'job', '_metadata_index.sqlite'))
+        reference = load_wsi(self.tiff_path, lazy_init=False, metadata_index=index)
+        self.assertEqual(len(index), 1)
+
+        with mock.patch.object(OpenSlideWSI, '_open_handle', side_effect=AssertionError('slide opened')):
+            wsi = load_wsi(self.tiff_path, lazy_init=False, metadata_index=SlideMetadataIndex(index.db_path))
+            for attr in ('dimensions', 'level_count', 'level_dimensions', 'mpp', 'mag'):
+                self.assertEqual(getattr(wsi, attr), getattr(reference, attr))
+            self.assertEqual(list(wsi.level_downsamples), list(reference.level_downsamples))
+            self.assertEqual(wsi.properties, dict(reference.properties))
+            patcher = wsi.create_patcher(patch_size=256, src_mag=20, dst_mag=20, coords_only=True)
+            self.assertEqual(len(patcher), 9)
+
+        # Pixels are read by opening the slide on demand
+        np.testing.assert_array_equal(wsi.read_region((10, 20), 0, (32, 32), read_as='numpy'), self.image[20:52, 10:42])
+
+    def test_invalidated_by_modification_and_options(self):
+        index = SlideMetadataIndex(os.path.join(self.tmp_dir, 'index.sqlite'))
+        load_wsi(self.png_path, mpp=0.5, lazy_init=False, metadata_index=index)
+        self.assertIsNotNone(index.get(self.png_path, 'ImageWSI', {'mpp': 0.5, 'custom_mpp_keys': None}))
+        self.assertIsNone(index.get(self.png_path, 'ImageWSI', {'mpp': 0.25, 'custom_mpp_keys': None}))
+
+        wsi = load_wsi(self.png_path, mpp=0.25, lazy_init=False, metadata_index=index)
+        self.assertEqual(wsi.mag, 40)
+        self.assertEqual(len(index), 2)
+
+        stat = os.stat(self.png_path)
+        os.utime(self.png_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertIsNone(index.get(self.png_path, 'ImageWSI', {'mpp': 0.5, 'custom_mpp_keys': None}))
+
+
+if __name__ == '__main__':
+    unittest.main()
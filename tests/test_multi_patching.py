@@ -0,0 +1,91 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import h5py
+import numpy as np
+import geopandas as gpd
+from PIL import Image
+from shapely import Point, box
+
+import sys; sys.path.append('../')
+from trident import Processor
+from trident.wsi_objects.WSIPatcher import WSIPatcher, PreparedTissueMask
+from _synthetic import FakeWSI
+
+"""
+Test that patching at several settings with a shared, prepared tissue mask gives the same coordinates
+as patching at each setting separately.
+"""
+
+
+CONFIGS = [(20, 256, 0, 0.), (10, 256, 0, 0.5), (20, 128, 32, 0.25), (10, 256, 0, 0.)]
+
+
+class TestPreparedTissueMask(unittest.TestCase):
+
+    def test_shared_mask_matches_separate_masks(self):
+        wsi = FakeWSI(20000, 15000)
+        mask = gpd.GeoDataFrame(geometry=[Point(6000, 5000).buffer(4000), box(12000, 2000, 19000, 14000), box(15000, 6000, 19500, 8000)])
+        prepared = PreparedTissueMask(mask)
+        for mask_mode in ['geometry', 'raster']:
+            for mag, patch_size, overlap, threshold in CONFIGS:
+                with self.subTest(mask_mode=mask_mode, mag=mag, patch_size=patch_size, threshold=threshold):
+                    kwargs = dict(src_mag=40, dst_mag=mag, overlap=overlap, threshold=threshold, mask_mode=mask_mode, coords_only=True)
+                    shared = WSIPatcher(wsi, patch_size, mask=prepared, **kwargs)
+                    separate = WSIPatcher(wsi, patch_size, mask=mask, **kwargs)
+                    np.testing.assert_array_equal(shared.valid_coords, separate.valid_coords)
+                    self.assertIs(shared.mask, mask)
+
+
+class TestMultiPatchingJob(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.wsi_dir = os.path.join(self.tmp_dir, 'wsis')
+        self.job_dir = os.path.join(self.tmp_dir, 'job')
+        os.makedirs(self.wsi_dir)
+        os.makedirs(os.path.join(self.job_dir, 'contours_geojson'))
+        for name, contours in [('a', [Point(600, 500).buffer(400)]), ('b', [box(100, 100, 1400, 600)])]:
+            Image.fromarray(np.zeros((1200, 1500, 3), dtype=np.uint8)).save(os.path.join(self.wsi_dir, f'{name}.png'))
+            gdf = gpd.GeoDataFrame(geometry=contours).set_crs("EPSG:3857")
+            gdf.to_file(os.path.join(self.job_dir, 'contours_geojson', f'{name}.geojson'), driver="GeoJSON")
+        self.wsi_list = os.path.join(self.tmp_dir, 'wsis.csv')
+        with open(self.wsi_list, 'w') as f:
+            f.write('wsi,mpp\na.png,0.5\nb.png,0.5\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _processor(self):
+        return Processor(job_dir=self.job_dir, wsi_source=self.wsi_dir, wsi_ext=['.png'], custom_list_of_wsis=self.wsi_list, max_workers=0)
+
+    def _read(self, path):
+        with h5py.File(path, 'r') as f:
+            return f['coords'][:]
+
+    def test_matches_single_jobs(self):
+        configs = [(20, 64, 0, 0.), (10, 64, 16, 0.5)]
+        saveto = [f'multi_{i}' for i in range(len(configs))]
+        processor = self._processor()
+        paths = processor.run_multi_patching_job(configs, saveto=saveto, visualize=False)
+        self.assertEqual(paths, [os.path.join(self.job_dir, s) for s in saveto])
+
+        for (mag, patch_size, overlap, threshold), path in zip(configs, paths):
+            single = processor.run_patching_job(mag, patch_size, overlap, saveto=f'single_{mag}', visualize=False, min_tissue_proportion=threshold)
+            with open(os.path.join(path, '_config_coords.json')) as f:
+                config = json.load(f)
+            self.assertEqual((config['target_magnification'], config['patch_size'], config['overlap']), (mag, patch_size, overlap))
+            for name in ['a', 'b']:
+                coords = self._read(os.path.join(path, 'patches', f'{name}_patches.h5'))
+                self.assertGreater(len(coords), 0)
+                np.testing.assert_array_equal(coords, self._read(os.path.join(single, 'patches', f'{name}_patches.h5')))
+
+    def test_saveto_length_mismatch(self):
+        with self.assertRaises(ValueError):
+            self._processor().run_multi_patching_job([(20, 64, 0, 0.)], saveto=['x', 'y'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+import os
+import shutil
+import tempfile
+import unittest
+import h5py
+import numpy as np
+import geopandas as gpd
+from PIL import Image
+from shapely import Point, box
+
+import sys; sys.path.append('../')
+from trident import load_wsi
+from trident.wsi_objects.WSIPatcher import WSIPatcher, hilbert_index
+from _synthetic import FakeWSI
+
+"""
+Test that the vectorized patch grid of WSIPatcher matches the original per-cell implementation,
+that the streamed (chunked) grid matches the full one, and the row and Hilbert patch orders.
+"""
+
+
+def reference_grid(patcher):
+    """ Grid of the original implementation: while loops over `_colrow_to_xy` and a list comprehension. """
+    col, row = 0, 0
+    x, y = patcher._colrow_to_xy(col, row)
+    while x < patcher.width:
+        col += 1
+        x, _ = patcher._colrow_to_xy(col, row)
+    cols = col
+    while y < patcher.height:
+        row += 1
+        _, y = patcher._colrow_to_xy(col, row)
+    rows = row
+    col_rows = np.array([[c, r] for c in range(cols) for r in range(rows)])
+    coords = np.array([patcher._colrow_to_xy(xy[0], xy[1]) for xy in col_rows])
+    return cols, rows, coords
+
+
+class TestPatcherGrid(unittest.TestCase):
+
+    def test_grid_matches_reference(self):
+        for width, height in [(1, 1), (255, 256), (256, 257), (5000, 3001), (12345, 678)]:
+            for patch_size, overlap in [(256, 0), (224, 32), (512, 255), (100, 1)]:
+                for src_mag, dst_mag in [(20, 20), (40, 20), (40, 10), (20, 40)]:
+                    with self.subTest(size=(width, height), patch_size=patch_size, overlap=overlap, mags=(src_mag, dst_mag)):
+                        patcher = WSIPatcher(FakeWSI(width, height), patch_size, src_mag=src_mag, dst_mag=dst_mag, overlap=overlap)
+                        cols, rows, coords = reference_grid(patcher)
+                        self.assertEqual(patcher.get_cols_rows(), (cols, rows))
+                        self.assertEqual(patcher.valid_coords.shape, coords.shape)
+                        self.assertEqual(patcher.valid_coords.dtype, coords.dtype)
+                        np.testing.assert_array_equal(patcher.valid_coords, coords)
+
+    def test_overlap_must_be_smaller_than_patch(self):
+        with self.assertRaises(ValueError):
+            WSIPatcher(FakeWSI(1000, 1000), 256, src_mag=20, dst_mag=20, overlap=256)
+
+
+class TestStreamedGrid(unittest.TestCase):
+
+    def test_chunks_match_full_grid(self):
+        wsi = FakeWSI(20000, 15000)
+        mask = gpd.GeoDataFrame(geometry=[Point(6000, 5000).buffer(4000), box(12000, 2000, 19000, 14000)])
+        for mask_mode in ['geometry', 'raster']:
+            for threshold in [0., 0.5]:
+                for chunk_size in [1, 500, 10**6]:
+                    with self.subTest(mask_mode=mask_mode, threshold=threshold, chunk_size=chunk_size):
+                        kwargs = dict(src_mag=40, dst_mag=20, overlap=64, mask=mask, threshold=threshold, mask_mode=mask_mode, coords_only=True)
+                        full = WSIPatcher(wsi, 256, **kwargs)
+                        streamed = WSIPatcher(wsi, 256, stream=True, **kwargs)
+                        chunks = list(streamed.iter_valid_coords(chunk_size))
+                        self.assertTrue(all(len(chunk) > 0 for chunk in chunks))
+                        np.testing.assert_array_equal(np.concatenate(chunks), full.valid_coords)
+                        self.assertEqual(sum(map(len, full.iter_valid_coords(chunk_size))), len(full))
+
+    def test_custom_coords_and_no_mask(self):
+        wsi = FakeWSI(5000, 3000)
+        full = WSIPatcher(wsi, 256, src_mag=20, dst_mag=20)
+        streamed = WSIPatcher(wsi, 256, src_mag=20, dst_mag=20, stream=True)
+        np.testing.assert_array_equal(np.concatenate(list(streamed.iter_valid_coords(7))), full.valid_coords)
+        with self.assertRaises(TypeError):
+            len(streamed)
+
+        custom_coords = full.valid_coords[::3]
+        mask = gpd.GeoDataFrame(geometry=[box(0, 0, 2500, 3000)])
+        full = WSIPatcher(wsi, 256, src_mag=20, dst_mag=20, mask=mask, custom_coords=custom_coords)
+        streamed = WSIPatcher(wsi, 256, src_mag=20, dst_mag=20, mask=mask, custom_coords=custom_coords, stream=True)
+        np.testing.assert_array_equal(np.concatenate(list(streamed.iter_valid_coords(10))), full.valid_coords)
+
+    def test_extract_tissue_coords(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            png_path = os.path.join(tmp_dir, 'slide.png')
+            Image.fromarray(np.zeros((1200, 1500, 3), dtype=np.uint8)).save(png_path)
+            wsi = load_wsi(png_path, mpp=0.5, lazy_init=False, cache_dir=os.path.join(tmp_dir, 'cache'))
+            wsi.gdf_contours = gpd.GeoDataFrame(geometry=[Point(600, 500).buffer(400)])
+            expected = wsi.create_patcher(patch_size=64, src_mag=20, dst_mag=20, overlap=16, mask=wsi.gdf_contours, threshold=0.3, coords_only=True).valid_coords
+            path = wsi.extract_tissue_coords(target_mag=20, patch_size=64, save_coords=tmp_dir, overlap=16, min_tissue_proportion=0.3, chunk_size=100)
+            with h5py.File(path, 'r') as f:
+                np.testing.assert_array_equal(f['coords'][:], expected)
+                self.assertEqual(f['coords'].attrs['patch_size'], 64)
+                self.assertEqual(f['coords'].attrs['overlap'], 16)
+            self.assertEqual(os.listdir(os.path.dirname(path)), ['slide_patches.h5'])
+
+            # Hilbert order: the same patches, with their column order position
+            path = wsi.extract_tissue_coords(target_mag=20, patch_size=64, save_coords=tmp_dir, overlap=16, min_tissue_proportion=0.3, chunk_size=100, order='hilbert')
+            with h5py.File(path, 'r') as f:
+                self.assertEqual(f['coords'].attrs['patch_order'], 'hilbert')
+                np.testing.assert_array_equal(f['coords'][:][np.argsort(f['grid_index'][:])], expected)
+
+            # No tissue: an empty (0, 2) dataset
+            wsi.gdf_contours = gpd.GeoDataFrame(geometry=[])
+            path = wsi.extract_tissue_coords(target_mag=20, patch_size=64, save_coords=tmp_dir)
+            with h5py.File(path, 'r') as f:
+                self.assertEqual(f['coords'].shape, (0, 2))
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+class TestPatchOrder(unittest.TestCase):
+
+    def test_hilbert_index(self):
+        cols, rows = np.meshgrid(np.arange(32), np.arange(32), indexing='ij')
+        d = hilbert_index(cols.ravel(), rows.ravel(), 5)
+        np.testing.assert_array_equal(np.sort(d), np.arange(32 * 32))
+        # Consecutive cells along the curve are neighbours
+        order = np.argsort(d)
+        steps = np.abs(np.diff(cols.ravel()[order])) + np.abs(np.diff(rows.ravel()[order]))
+        self.assertTrue(np.all(steps == 1))
+
+    def test_orders(self):
+        wsi = FakeWSI(20000, 15000)
+        mask = gpd.GeoDataFrame(geometry=[Point(6000, 5000).buffer(4000), box(12000, 2000, 19000, 14000)])
+        kwargs = dict(src_mag=40, dst_mag=20, overlap=64, mask=mask, threshold=0.5, coords_only=True)
+        column = WSIPatcher(wsi, 256, **kwargs)
+        np.testing.assert_array_equal(column.grid_index, np.flatnonzero(column.valid_mask))
+        for order in ['row', 'hilbert']:
+            with self.subTest(order=order):
+                patcher = WSIPatcher(wsi, 256, order=order, **kwargs)
+                # Same patches, and `grid_index` restores the column order
+                np.testing.assert_array_equal(patcher.valid_coords[np.argsort(patcher.grid_index)], column.valid_coords)
+                np.testing.assert_array_equal(patcher.valid_mask, column.valid_mask)
+                if order == 'row':
+                    np.testing.assert_array_equal(patcher.valid_coords, column.valid_coords[np.lexsort(column.valid_coords.T)])
+                for chunk_size in [1, 30, 500, 10**6]:
+                    streamed = WSIPatcher(wsi, 256, order=order, stream=True, **kwargs)
+                    chunks = list(streamed.iter_valid_coords(chunk_size, return_index=True))
+                    np.testing.assert_array_equal(np.concatenate([coords for coords, _ in chunks]), patcher.valid_coords)
+                    np.testing.assert_array_equal(np.concatenate([index for _, index in chunks]), patcher.grid_index)
+
+    def test_custom_coords(self):
+        wsi = FakeWSI(5000, 3000)
+        custom_coords = WSIPatcher(wsi, 256, src_mag=20, dst_mag=20).valid_coords[::-2]
+        mask = gpd.GeoDataFrame(geometry=[box(0, 0, 2500, 3000)])
+        for order in ['column', 'hilbert']:
+            with self.subTest(order=order):
+                full = WSIPatcher(wsi, 256, src_mag=20, dst_mag=20, mask=mask, custom_coords=custom_coords, order=order)
+                np.testing.assert_array_equal(full.valid_coords, custom_coords[full.grid_index])
+                if order == 'column':
+                    np.testing.assert_array_equal(full.valid_coords, custom_coords[full.valid_mask])
+                streamed = WSIPatcher(wsi, 256, src_mag=20, dst_mag=20, mask=mask, custom_coords=custom_coords, order=order, stream=True)
+                np.testing.assert_array_equal(np.concatenate(list(streamed.iter_valid_coords(10))), full.valid_coords)
+
+    def test_invalid_order(self):
+        with self.assertRaises(ValueError):
+            WSIPatcher(FakeWSI(1000, 1000), 256, src_mag=20, dst_mag=20, order='zigzag')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+import numpy as np
+import geopandas as gpd
+from shapely import Point, Polygon, box
+
+import sys; sys.path.append('../')
+from trident.wsi_objects.WSIPatcher import WSIPatcher, rasterize_polygons
+from _synthetic import FakeWSI
+
+"""
+Test the tissue masking engines of WSIPatcher: the indexed geometry engine against the original
+implementation, and the raster engine against the geometry engine.
+"""
+
+
+def random_tissue(width, height, n, seed=0):
+    rng = np.random.default_rng(seed)
+    polygons = []
+    for i in range(n):
+        radius = rng.uniform(0.05, 0.15) * min(width, height)
+        center = Point(rng.uniform(radius, width - radius), rng.uniform(radius, height - radius))
+        blob = center.buffer(radius, quad_segs=32)
+        if i % 2:
+            blob = blob.difference(center.buffer(radius / 3))
+        polygons.append(blob)
+    return gpd.GeoDataFrame(geometry=polygons)
+
+
+def reference_valid_mask(patcher, coords, threshold):
+    """ Patches kept by the original geometry engine: per-polygon bounding box filter, then each patch against the union. """
+    mask = patcher.mask.simplify(tolerance=patcher.patch_size_target / 4, preserve_topology=True)
+    bbox_masks = []
+    for _, bbox in mask.geometry.bounds.iterrows():
+        bbox_masks.append(
+            (coords[:, 0] >= bbox['minx'] - patcher.patch_size_src) & (coords[:, 0] <= bbox['maxx'] + patcher.patch_size_src) &
+            (coords[:, 1] >= bbox['miny'] - patcher.patch_size_src) & (coords[:, 1] <= bbox['maxy'] + patcher.patch_size_src)
+        )
+    bbox_mask = np.vstack(bbox_masks).any(axis=0)
+    union_mask = mask.union_all()
+    size = patcher.patch_size_src
+    squares = gpd.GeoSeries([Polygon([(x, y), (x + size, y), (x + size, y + size), (x, y + size)]) for x, y in coords[bbox_mask]])
+    if threshold == 0:
+        valid_mask = squares.intersects(union_mask).values
+    else:
+        valid_mask = squares.intersection(union_mask).area >= threshold * squares.area
+    bbox_mask[bbox_mask] &= valid_mask
+    return bbox_mask
+
+
+class TestGeometryMask(unittest.TestCase):
+
+    def test_matches_reference(self):
+        wsi = FakeWSI(30000, 20000)
+        # Overlapping blobs (some with holes) and thin fragments
+        mask = random_tissue(wsi.width, wsi.height, 30, seed=1)
+        mask = gpd.GeoDataFrame(geometry=list(mask.geometry) + [box(1000, 1000 + 400 * i, 9000, 1100 + 400 * i) for i in range(10)])
+        for threshold in [0., 0.15, 0.5, 1.]:
+            for overlap in [0, 128]:
+                with self.subTest(threshold=threshold, overlap=overlap):
+                    patcher = WSIPatcher(wsi, 256, src_mag=40, dst_mag=20, overlap=overlap, mask=mask, coords_only=True, threshold=threshold)
+                    grid = WSIPatcher(wsi, 256, src_mag=40, dst_mag=20, overlap=overlap, coords_only=True).valid_coords
+                    expected = reference_valid_mask(patcher, grid, threshold)
+                    np.testing.assert_array_equal(patcher.valid_mask, expected)
+                    np.testing.assert_array_equal(patcher.valid_coords, grid[expected])
+
+    def test_empty_mask(self):
+        patcher = WSIPatcher(FakeWSI(4096, 4096), 256, src_mag=20, dst_mag=20, mask=gpd.GeoDataFrame(geometry=[]), threshold=0.5)
+        self.assertEqual(len(patcher), 0)
+
+
+class TestRasterMask(unittest.TestCase):
+
+    def _patch(self, wsi, mask, **kwargs):
+        return WSIPatcher(wsi, 256, src_mag=40, dst_mag=20, mask=mask, coords_only=True, **kwargs)
+
+    def test_agrees_with_geometry(self):
+        wsi = FakeWSI(40000, 30000)
+        mask = random_tissue(wsi.width, wsi.height, 12)
+        for threshold in [0., 0.15, 0.5, 0.9]:
+            for overlap in [0, 64]:
+                with self.subTest(threshold=threshold, overlap=overlap):
+                    exact = self._patch(wsi, mask, threshold=threshold, overlap=overlap)
+                    raster = self._patch(wsi, mask, threshold=threshold, overlap=overlap, mask_mode='raster')
+                    self.assertEqual(len(exact.valid_mask), len(raster.valid_mask))
+                    # Decisions only differ for patches on the tissue boundary
+                    disagreement = np.mean(exact.valid_mask != raster.valid_mask)
+                    self.assertLess(disagreement, 0.01)
+                    self.assertLess(abs(len(raster) - len(exact)), 0.03 * len(exact))
+
+    def test_exact_on_aligned_tissue(self):
+        # Tissue edges on the raster cells: the raster engine is exact
+        wsi = FakeWSI(10240, 8192)
+        mask = gpd.GeoDataFrame(geometry=[
+            Polygon(box(512, 512, 4608, 4096).exterior, [box(1024, 1024, 2048, 2048).exterior.coords]),
+            box(6144, 1024, 6656, 7168),
+            box(6400, 4096, 9216, 5120),  # overlaps the previous one
+        ])
+        for threshold in [0., 0.25, 0.5, 1.]:
+            with self.subTest(threshold=threshold):
+                exact = self._patch(wsi, mask, threshold=threshold)
+                raster = self._patch(wsi, mask, threshold=threshold, mask_mode='raster')
+                if threshold == 0:
+                    # Patches sharing only an edge with the tissue "intersect" it geometrically
+                    self.assertTrue(np.all(raster.valid_mask <= exact.valid_mask))
+                else:
+                    np.testing.assert_array_equal(raster.valid_coords, exact.valid_coords)
+
+    def test_custom_coords_outside_slide(self):
+        wsi = FakeWSI(4096, 4096)
+        mask = gpd.GeoDataFrame(geometry=[box(0, 0, 4096, 4096)])
+        # Patches of 512px at level 0, half (or a quarter) of them outside the slide
+        coords = np.array([[0, 0], [3584, 3840], [3840, 3840], [-256, 0], [5000, 5000]])
+        exact = self._patch(wsi, mask, threshold=0.5, custom_coords=coords)
+        raster = self._patch(wsi, mask, threshold=0.5, custom_coords=coords, mask_mode='raster')
+        np.testing.assert_array_equal(raster.valid_coords, [[0, 0], [3584, 3840], [-256, 0]])
+        np.testing.assert_array_equal(raster.valid_coords, exact.valid_coords)
+
+    def test_rasterize_polygons(self):
+        mask = gpd.GeoDataFrame(geometry=[box(2, 2, 12, 12), box(10, 2, 14.4, 6)])
+        raster = rasterize_polygons(mask, (20, 20))
+        expected = np.zeros((20, 20), dtype=np.uint8)
+        expected[2:12, 2:12] = 1
+        expected[2:6, 10:14] = 1
+        np.testing.assert_array_equal(raster, expected)
+        # Cells partially covered are filled as well
+        touched = rasterize_polygons(mask, (20, 20), all_touched=True)
+        self.assertTrue(np.all(touched >= raster))
+        self.assertTrue(np.all(touched[2:6, 14] == 1))
+        self.assertEqual(touched[:2].sum() + touched[:, :2].sum() + touched[14:].sum() + touched[:, 16:].sum(), 0)
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            self._patch(FakeWSI(1000, 1000), gpd.GeoDataFrame(geometry=[box(0, 0, 10, 10)]), mask_mode='pixels')
+
+
+if __name__ == '__main__':
+    unittest.main()
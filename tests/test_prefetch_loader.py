@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from torch.utils.data import DataLoader
+
+import sys; sys.path.append('../')
+from _synthetic import make_synthetic_slides
+from trident import load_wsi, WSIPatcherDataset, ThreadedPrefetchLoader
+from trident.IO import get_num_workers
+from trident.wsi_objects.PrefetchLoader import make_patch_dataloader
+
+"""
+Test the threaded prefetching loader used when patches are read without DataLoader workers.
+"""
+
+class TestThreadedPrefetchLoader(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        _, cls.png_path, _ = make_synthetic_slides(cls.tmp_dir, (900, 1100))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def _dataset(self):
+        wsi = load_wsi(self.png_path, mpp=0.5, lazy_init=False, cache_dir=os.path.join(self.tmp_dir, 'cache'))
+        patcher = wsi.create_patcher(patch_size=128, src_mag=20, dst_mag=20, pil=False)
+        return WSIPatcherDataset(patcher, transform=np.array)
+
+    def test_batches_match_dataloader(self):
+        dataset = self._dataset()
+        expected = list(DataLoader(dataset, batch_size=7, num_workers=0))
+        for prefetch_batches, num_threads in [(1, 1), (3, 2), (8, 4)]:
+            with self.subTest(prefetch_batches=prefetch_batches, num_threads=num_threads):
+                loader = ThreadedPrefetchLoader(dataset, batch_size=7, prefetch_batches=prefetch_batches, num_threads=num_threads)
+                batches = list(loader)
+                self.assertEqual(len(batches), len(loader))
+                self.assertEqual(len(batches), len(expected))
+                for (imgs, (xs, ys)), (ref_imgs, (ref_xs, ref_ys)) in zip(batches, expected):
+                    np.testing.assert_array_equal(imgs.numpy(), ref_imgs.numpy())
+                    np.testing.assert_array_equal(xs.numpy(), ref_xs.numpy())
+                    np.testing.assert_array_equal(ys.numpy(), ref_ys.numpy())
+
+    def test_early_stop_and_errors(self):
+        dataset = self._dataset()
+        for i, _ in enumerate(ThreadedPrefetchLoader(dataset, batch_size=2, prefetch_batches=4)):
+            if i == 1:
+                break
+
+        class Failing:
+            def __len__(self):
+                return 10
+
+            def __getitem__(self, index):
+                if index == 5:
+                    raise RuntimeError('unreadable patch')
+                return index
+
+        with self.assertRaises(RuntimeError):
+            list(ThreadedPrefetchLoader(Failing(), batch_size=2))
+
+    def test_main_process_loading(self):
+        self.assertEqual(get_num_workers(64, max_workers=0), 0)
+        self.assertIsInstance(make_patch_dataloader(self._dataset(), batch_size=8, num_workers=0), ThreadedPrefetchLoader)
+        self.assertIsInstance(make_patch_dataloader(self._dataset(), batch_size=8, num_workers=2), DataLoader)
+
+
+if __name__ == '__main__':
+    unittest.main()
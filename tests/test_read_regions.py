@@ -0,0 +1,154 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import h5py
+import numpy as np
+import torch
+import geopandas as gpd
+from shapely import Point
+from torch.utils.data import DataLoader
+
+import sys; sys.path.append('../')
+from _synthetic import make_synthetic_slides
+from trident import load_wsi, WSIPatcherDataset
+from trident.wsi_objects.WSIPatcherDataset import collate_regions
+
+"""
+Test that batched region reads (`read_regions`, `WSIPatcherDataset.__getitems__`, region mode)
+return exactly the same pixels as the per-patch `read_region` path.
+"""
+
+class TestReadRegions(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.image, cls.png_path, cls.tiff_path = make_synthetic_slides(cls.tmp_dir, (1100, 1300), tiff=True, downsamples=(4,))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def _slides(self):
+        slides = [load_wsi(self.png_path, mpp=0.5, lazy_init=False)]
+        if self.tiff_path is not None:
+            slides.append(load_wsi(self.tiff_path, lazy_init=False))
+            slides.append(load_wsi(self.tiff_path, reader_type='tifffile', lazy_init=False))
+        return slides
+
+    def test_read_regions_matches_read_region(self):
+        coords = np.array([[0, 0], [256, 128], [1200, 1000], [37, 911]])
+        for wsi in self._slides():
+            with self.subTest(backend=wsi.__class__.__name__):
+                batch = wsi.read_regions(coords, level=0, size=(200, 150))
+                self.assertEqual(batch.shape, (len(coords), 150, 200, 3))
+                self.assertEqual(batch.dtype, np.uint8)
+                for i, (x, y) in enumerate(coords):
+                    single = wsi.read_region((int(x), int(y)), 0, (200, 150), read_as='numpy')
+                    np.testing.assert_array_equal(batch[i], single)
+
+    def test_openslide_public_api_fallback(self):
+        if self.tiff_path is None:
+            self.skipTest('tifffile is required to write the test slide.')
+        wsi = load_wsi(self.tiff_path, lazy_init=False)
+        coords = np.array([[0, 0], [1204, 1000], [-20, -32], [300, 500]])
+        expected = wsi.read_regions(coords, 0, (100, 120))
+        # openslide-python releases without the private binding read through `OpenSlide.read_region`
+        with mock.patch('trident.wsi_objects.OpenSlideWSI._HAS_LOWLEVEL_READ', False):
+            np.testing.assert_array_equal(wsi.read_regions(coords, 0, (100, 120)), expected)
+
+    def test_read_regions_out_buffer(self):
+        wsi = self._slides()[0]
+        out = np.zeros((2, 64, 64, 3), dtype=np.uint8)
+        res = wsi.read_regions(np.array([[0, 0], [64, 64]]), level=0, size=(64, 64), out=out)
+        self.assertIs(res, out)
+        np.testing.assert_array_equal(out[1], self.image[64:128, 64:128])
+        with self.assertRaises(ValueError):
+            wsi.read_regions(np.array([[0, 0]]), level=0, size=(64, 64), out=out)
+
+    def test_read_region_into_matches_read_region(self):
+        for wsi in self._slides():
+            with self.subTest(backend=wsi.__class__.__name__):
+                levels = range(wsi.level_count)
+                for level, location in [(lvl, loc) for lvl in levels for loc in [(0, 0), (1204, 1000), (13, 7)]]:
+                    batch = np.zeros((2, 120, 100, 4), dtype=np.uint8)
+                    view = batch[1, :, :, 1:]  # non-contiguous destination
+                    res = wsi.read_region_into(location, level, (100, 120), out=view)
+                    self.assertIs(res, view)
+                    single = np.asarray(wsi.read_region(location, level, (100, 120), read_as='pil'))
+                    np.testing.assert_array_equal(view, single)
+                    self.assertFalse(batch[0].any() or batch[1, :, :, 0].any())
+                with self.assertRaises(ValueError):
+                    wsi.read_region_into((0, 0), 0, (100, 120), out=np.zeros((100, 120, 3), dtype=np.uint8))
+
+    def test_coalesced_reads_match_single_reads(self):
+        if self.tiff_path is None:
+            self.skipTest('tifffile is required to write a tiled test slide.')
+        wsi = load_wsi(self.tiff_path, lazy_init=False)
+        for level, overlap in [(0, 0), (0, 48), (1, 16)]:
+            with self.subTest(level=level, overlap=overlap):
+                patcher = wsi.create_patcher(patch_size=96, src_mag=20, dst_mag=20 / 4 ** level, overlap=overlap)
+                size = (patcher.patch_size_level, patcher.patch_size_level)
+                wsi.coalesce_reads = True
+                coalesced = wsi.read_regions(patcher.valid_coords, patcher.level, size)
+                wsi.coalesce_reads = False
+                single = wsi.read_regions(patcher.valid_coords, patcher.level, size)
+                np.testing.assert_array_equal(coalesced, single)
+
+    def test_dataset_batches_match_single_reads(self):
+        for wsi in self._slides():
+            for pil in (False, True):
+                with self.subTest(backend=wsi.__class__.__name__, pil=pil):
+                    patcher = wsi.create_patcher(patch_size=128, src_mag=20, dst_mag=10, pil=pil)
+                    dataset = WSIPatcherDataset(patcher, transform=np.array)
+                    loader = DataLoader(dataset, batch_size=5, num_workers=0)
+                    seen = 0
+                    for imgs, (xs, ys) in loader:
+                        for img, x, y in zip(imgs, xs, ys):
+                            tile, _, _ = patcher.get_tile_xy(int(x), int(y))
+                            np.testing.assert_array_equal(img.numpy(), np.asarray(tile))
+                            seen += 1
+                    self.assertEqual(seen, len(patcher))
+
+    def test_region_mode_matches_single_reads(self):
+        for wsi in self._slides():
+            for pil, overlap, dst_mag, region_size in [(False, 0, 10, 256), (True, 32, 10, 200), (False, 16, 20, 512), (False, 0, 5, 1024)]:
+                with self.subTest(backend=wsi.__class__.__name__, pil=pil, overlap=overlap, dst_mag=dst_mag):
+                    patcher = wsi.create_patcher(patch_size=96, src_mag=20, dst_mag=dst_mag, overlap=overlap, pil=pil, region_size=region_size)
+                    self.assertLess(len(patcher.regions), len(patcher))
+                    np.testing.assert_array_equal(np.sort(patcher.region_order), np.arange(len(patcher)))
+                    dataset = WSIPatcherDataset(patcher, transform=np.array)
+                    self.assertEqual(len(dataset), len(patcher.regions))
+                    loader = DataLoader(dataset, batch_size=3, num_workers=0, collate_fn=collate_regions)
+                    imgs = np.concatenate([batch.numpy() for batch, _ in loader])
+                    xs = np.concatenate([xs.numpy() for _, (xs, _) in loader])
+                    np.testing.assert_array_equal(xs, patcher.valid_coords[patcher.region_order, 0])
+                    for img, index in zip(imgs, patcher.region_order):
+                        x, y = patcher.valid_coords[index]
+                        tile, _, _ = patcher.get_tile_xy(int(x), int(y))
+                        np.testing.assert_array_equal(img, np.asarray(tile))
+
+    def test_region_mode_features_keep_coords_order(self):
+        class MeanColor(torch.nn.Module):
+            eval_transforms = np.array
+            def forward(self, imgs):
+                return imgs.float().mean(dim=(1, 2))
+
+        wsi = load_wsi(self.png_path, mpp=0.5, lazy_init=False, max_workers=0)
+        wsi.gdf_contours = gpd.GeoDataFrame(geometry=[Point(600, 500).buffer(450)])
+        coords_path = wsi.extract_tissue_coords(target_mag=20, patch_size=64, save_coords=self.tmp_dir, order='hilbert')
+        features = []
+        for region_size in [None, 256]:
+            path = wsi.extract_patch_features(
+                patch_encoder=MeanColor(), coords_path=coords_path, save_features=os.path.join(self.tmp_dir, f'features_{region_size}'),
+                device='cpu', batch_limit=100, region_size=region_size,
+            )
+            with h5py.File(path, 'r') as f:
+                features.append(f['features'][:])
+        np.testing.assert_array_equal(features[0], features[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
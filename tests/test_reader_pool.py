@@ -0,0 +1,229 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import weakref
+from unittest import mock
+import h5py
+import numpy as np
+import torch
+import geopandas as gpd
+from PIL import Image
+from shapely import box
+from torchvision import transforms as T
+from torch.utils.data import DataLoader
+
+import sys; sys.path.append('../')
+from trident import Processor, load_wsi, WSIPatcherDataset, SlideReaderPool, ImageWSI
+
+"""
+Test the reader pool shared across slides: batches streamed slide after slide match a DataLoader per
+slide, read errors are confined to their slide, datasets are released once read, and Processor jobs give the
+same outputs with it (and close their slides).
+"""
+
+
+class Failing(torch.utils.data.Dataset):
+
+    def __len__(self):
+        return 10
+
+    def __getitem__(self, index):
+        if index == 5:
+            raise IOError('corrupted tile')
+        return index
+
+
+class MeanColor(torch.nn.Module):
+    enc_name = 'mean_color'
+    eval_transforms = T.Compose([T.ToTensor(), T.Normalize((0.5, 0.5, 0.5), (0.25, 0.25, 0.25))])
+
+    def forward(self, imgs):
+        return imgs.mean(dim=(2, 3))
+
+
+class Threshold(torch.nn.Module):
+    input_size = 64
+    target_mag = 10
+    precision = torch.float32
+    eval_transforms = T.ToTensor()
+
+    def forward(self, imgs):
+        return (imgs.mean(dim=1) > 0.5).to(torch.uint8)
+
+
+class TestSlideReaderPool(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(0)
+        cls.png_paths = []
+        for i, (height, width) in enumerate([(300, 500), (700, 400), (260, 260)]):
+            cls.png_paths.append(os.path.join(cls.tmp_dir, f'slide_{i}.png'))
+            Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8)).save(cls.png_paths[-1])
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def _dataset(self, png_path):
+        wsi = load_wsi(png_path, mpp=0.5, lazy_init=False, max_workers=0)
+        return WSIPatcherDataset(wsi.create_patcher(patch_size=128, src_mag=20, dst_mag=20, pil=False), transform=None)
+
+    def _collect(self, stream):
+        batches, ends, errors = {}, [], []
+        for key, batch in stream:
+            if batch is None:
+                ends.append(key)
+            elif isinstance(batch, Exception):
+                errors.append(key)
+            else:
+                batches.setdefault(key, []).append(batch)
+        return batches, ends, errors
+
+    def test_batches_match_dataloader(self):
+        datasets = [self._dataset(png_path) for png_path in self.png_paths]
+        for num_workers, prefetch_batches in [(0, 1), (0, 3), (2, 2)]:
+            with self.subTest(num_workers=num_workers, prefetch_batches=prefetch_batches):
+                with SlideReaderPool(num_workers=num_workers, prefetch_batches=prefetch_batches, cached_slides=1) as pool:
+                    # Twice, through the same workers
+                    for _ in range(2):
+                        batches, ends, errors = self._collect(pool.stream((i, dataset, 3, None) for i, dataset in enumerate(datasets)))
+                        self.assertEqual((ends, errors), ([0, 1, 2], []))
+                        for i, dataset in enumerate(datasets):
+                            expected = list(DataLoader(dataset, batch_size=3))
+                            self.assertEqual(len(batches[i]), len(expected))
+                            for (tiles, (xs, ys)), (ref_tiles, (ref_xs, ref_ys)) in zip(batches[i], expected):
+                                np.testing.assert_array_equal(tiles.numpy(), ref_tiles.numpy())
+                                np.testing.assert_array_equal(xs.numpy(), ref_xs.numpy())
+                                np.testing.assert_array_equal(ys.numpy(), ref_ys.numpy())
+
+    def test_errors_and_submit(self):
+        dataset = self._dataset(self.png_paths[2])
+        for num_workers in [0, 2]:
+            with self.subTest(num_workers=num_workers), SlideReaderPool(num_workers=num_workers) as pool:
+                events = []
+                for key, batch in pool.stream([('a', dataset, 2, None), ('failing', Failing(), 2, None), ('b', dataset, 2, None)]):
+                    if isinstance(batch, Exception):
+                        self.assertIn('corrupted tile', str(batch))
+                        events.append((key, 'error'))
+                    elif batch is None:
+                        events.append((key, 'end'))
+                        if key == 'a':
+                            pool.submit('a2', dataset, 4)
+                # Submitted items are read as soon as workers are free, before the items not started yet
+                self.assertEqual(events[:2], [('a', 'end'), ('failing', 'error')])
+                self.assertCountEqual(events[2:], [('b', 'end'), ('a2', 'end')])
+
+                # A stream left early does not leak its batches into the next one
+                for _ in pool.stream([('c', dataset, 1, None)]):
+                    break
+                batches, ends, errors = self._collect(pool.stream([('d', dataset, 1, None), ('e', Failing(), 5, None)]))
+                self.assertEqual((ends, errors), (['d'], ['e']))
+                self.assertEqual(len(batches['d']), len(dataset))
+
+    def test_datasets_released(self):
+        for num_workers in [0, 2]:
+            with self.subTest(num_workers=num_workers), SlideReaderPool(num_workers=num_workers, cached_slides=4) as pool:
+                datasets = [self._dataset(png_path) for png_path in self.png_paths] + [Failing()]
+                refs = [weakref.ref(dataset) for dataset in datasets]
+                work_items = [(i, dataset, 2, None) for i, dataset in enumerate(datasets)]
+                del datasets
+                _, ends, errors = self._collect(pool.stream(work_items))
+                self.assertEqual((ends, errors), ([0, 1, 2], [3]))
+                self.assertEqual([len(slides) for slides in pool._worker_slides], [0] * len(pool))
+                if num_workers == 0:
+                    # The reader threads drop their datasets too
+                    del work_items
+                    deadline = time.monotonic() + 5
+                    while any(ref() is not None for ref in refs) and time.monotonic() < deadline:
+                        time.sleep(0.01)
+                    self.assertEqual([ref() for ref in refs], [None] * len(refs))
+
+
+class TestProcessorReaderPool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.wsi_dir = os.path.join(self.tmp_dir, 'wsis')
+        os.makedirs(self.wsi_dir)
+        rng = np.random.default_rng(0)
+        names = ['a', 'b', 'c']
+        for name, (height, width) in zip(names, [(600, 800), (500, 300), (900, 700)]):
+            img = rng.integers(0, 96, (height, width, 3), dtype=np.uint8)
+            img[height // 4: 3 * height // 4, width // 5: 3 * width // 5] += 128  # bright tissue
+            Image.fromarray(img).save(os.path.join(self.wsi_dir, f'{name}.png'))
+        self.wsi_list = os.path.join(self.tmp_dir, 'wsis.csv')
+        with open(self.wsi_list, 'w') as f:
+            f.write('wsi,mpp\n' + ''.join(f'{name}.png,0.5\n' for name in names))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _processor(self, job_dir, persistent_readers):
+        return Processor(
+            job_dir=job_dir, wsi_source=self.wsi_dir, wsi_ext=['.png'], custom_list_of_wsis=self.wsi_list,
+            max_workers=0, persistent_readers=persistent_readers,
+        )
+
+    def _closed_slides(self):
+        return mock.patch.object(ImageWSI, 'close', autospec=True, side_effect=ImageWSI.close)
+
+    def test_segmentation_job(self):
+        contours = []
+        for persistent_readers in [False, True]:
+            job_dir = os.path.join(self.tmp_dir, f'seg_{persistent_readers}')
+            processor = self._processor(job_dir, persistent_readers)
+            with self._closed_slides() as close:
+                processor.run_segmentation_job(Threshold(), seg_mag=10, batch_size=4, device='cpu')
+            self.assertCountEqual([call.args[0].name for call in close.call_args_list], 'abc')
+            processor.close()
+            contours.append({name: gpd.read_file(os.path.join(job_dir, 'contours_geojson', f'{name}.geojson')) for name in 'abc'})
+            self.assertEqual(len(os.listdir(os.path.join(job_dir, '_image_cache'))), 3)  # decoded slides kept in the job dir
+        for name in 'abc':
+            self.assertFalse(contours[0][name].empty)
+            self.assertTrue(contours[1][name].geometry.union_all().equals(contours[0][name].geometry.union_all()))
+
+        # Artifact removal pass, queued on the pool once the first pass of each slide is saved
+        job_dir = os.path.join(self.tmp_dir, 'seg_artifacts')
+        processor = self._processor(job_dir, True)
+        with self._closed_slides() as close:
+            processor.run_segmentation_job(Threshold(), seg_mag=10, batch_size=4, artifact_remover_model=Threshold(), device='cpu')
+        self.assertCountEqual([call.args[0].name for call in close.call_args_list], 'abc')  # once both passes are read
+        processor.close()
+        for name in 'abc':
+            self.assertFalse(gpd.read_file(os.path.join(job_dir, 'contours_geojson', f'{name}.geojson')).empty)
+            with open(os.path.join(job_dir, '_logs_segmentation.txt')) as f:
+                self.assertNotIn('ERROR', f.read())
+
+    def test_patch_feature_extraction_job(self):
+        job_dir = os.path.join(self.tmp_dir, 'job')
+        os.makedirs(os.path.join(job_dir, 'contours_geojson'))
+        for name in 'abc':
+            gdf = gpd.GeoDataFrame(geometry=[box(0, 0, 1000, 1000)]).set_crs("EPSG:3857")
+            gdf.to_file(os.path.join(job_dir, 'contours_geojson', f'{name}.geojson'), driver="GeoJSON")
+        processor = self._processor(job_dir, False)
+        coords_dir = os.path.basename(processor.run_patching_job(target_magnification=20, patch_size=64, visualize=False))
+
+        features = []
+        for persistent_readers in [False, True]:
+            processor = self._processor(job_dir, persistent_readers)
+            for region_size in [None, 256]:
+                saveto = os.path.join(coords_dir, f'features_{persistent_readers}_{region_size}')
+                with self._closed_slides() as close:
+                    processor.run_patch_feature_extraction_job(
+                        coords_dir=coords_dir, patch_encoder=MeanColor(), device='cpu', batch_limit=16, saveto=saveto, region_size=region_size,
+                    )
+                self.assertCountEqual([call.args[0].name for call in close.call_args_list], 'abc')
+                for name in 'abc':
+                    with h5py.File(os.path.join(job_dir, saveto, f'{name}.h5'), 'r') as f:
+                        features.append(f['features'][:])
+            processor.close()
+        for i in range(len(features) // 2):
+            np.testing.assert_allclose(features[len(features) // 2 + i], features[i], atol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
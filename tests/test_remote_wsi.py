@@ -0,0 +1,114 @@
+import os
+import re
+import shutil
+import tempfile
+import threading
+import unittest
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+import sys; sys.path.append('../')
+from _synthetic import make_synthetic_slides
+from trident import load_wsi, BlockCache, RangeFile
+
+"""
+Test reading slides with HTTP range requests (and a local block cache) against a local
+http.server standing in for an object store.
+"""
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """ Static file server answering `Range: bytes=a-b` requests, like object stores. """
+
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def do_GET(self):
+        match = re.fullmatch(r'bytes=(\d+)-(\d+)', self.headers.get('Range', ''))
+        path = self.translate_path(self.path)
+        if match is None or not os.path.isfile(path):
+            return super().do_GET()
+        size = os.path.getsize(path)
+        start, end = int(match.group(1)), min(int(match.group(2)), size - 1)
+        with open(path, 'rb') as f:
+            f.seek(start)
+            body = f.read(end - start + 1)
+        self.server.bytes_served += len(body)
+        self.send_response(206)
+        self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestRemoteWSI(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            import tifffile
+        except ImportError:
+            raise unittest.SkipTest('tifffile is required by the remote slide reader.')
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.serve_dir = os.path.join(cls.tmp_dir, 'bucket')
+        os.makedirs(cls.serve_dir)
+        _, _, cls.slide_path = make_synthetic_slides(cls.serve_dir, (2048, 3072), tiff=True, downsamples=(4,), png=False, name='slide 1', compression='zlib')
+
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), partial(RangeRequestHandler, directory=cls.serve_dir))
+        cls.server.bytes_served = 0
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.url = f'http://127.0.0.1:{cls.server.server_address[1]}/slide%201.tif'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        shutil.rmtree(cls.tmp_dir)
+
+    def test_regions_match_local_file(self):
+        local = load_wsi(self.slide_path, reader_type='tifffile', lazy_init=False)
+        remote = load_wsi(self.url, lazy_init=False, block_cache_dir=os.path.join(self.tmp_dir, 'blocks'))
+        self.assertEqual(remote.__class__.__name__, 'TiffFileWSI')
+        self.assertEqual(remote.level_dimensions, local.level_dimensions)
+        self.assertEqual(remote.mpp, local.mpp)
+
+        coords = np.array([[0, 0], [1000, 700], [2900, 1900]])
+        for level in range(local.level_count):
+            np.testing.assert_array_equal(remote.read_regions(coords, level, (256, 256)), local.read_regions(coords, level, (256, 256)))
+
+        # Only the directories and the touched tiles were transferred
+        stats = remote.transfer_stats()
+        self.assertEqual(stats['file_size'], os.path.getsize(self.slide_path))
+        self.assertLess(stats['bytes_fetched'], stats['file_size'] / 2)
+        self.assertIsNone(local.transfer_stats())
+
+        # A new reader (e.g., a later run) is served by the on-disk block cache
+        served = self.server.bytes_served
+        again = load_wsi(self.url, lazy_init=False, block_cache_dir=os.path.join(self.tmp_dir, 'blocks'))
+        np.testing.assert_array_equal(again.read_regions(coords, 0, (256, 256)), local.read_regions(coords, 0, (256, 256)))
+        self.assertEqual(again.transfer_stats()['bytes_fetched'], 0)
+        self.assertEqual(self.server.bytes_served, served)
+
+    def test_block_cache_eviction(self):
+        cache_dir = os.path.join(self.tmp_dir, 'small_blocks')
+        cache = BlockCache(cache_dir, max_bytes=4 * 1024, block_size=1024)
+        data = bytes(range(256)) * 64
+        fh = RangeFile(lambda offset, count: data[offset:offset + count], len(data), 'blob', cache)
+        self.assertEqual(fh.read_at(1000, 3000), data[1000:4000])
+        fh.seek(10000)
+        self.assertEqual(fh.read(5000), data[10000:15000])
+        self.assertLessEqual(cache.used_bytes(), 4 * 1024)
+        self.assertEqual(fh.read_at(len(data) - 10, 100), data[-10:])
+        self.assertEqual(fh.stats()['file_size'], len(data))
+
+    def test_remote_source_requires_reader_support(self):
+        with self.assertRaises(ValueError):
+            load_wsi(self.url, reader_type='openslide')
+
+
+if __name__ == '__main__':
+    unittest.main()
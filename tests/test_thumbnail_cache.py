@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+
+import sys; sys.path.append('../')
+from _synthetic import make_synthetic_slides
+from trident import load_wsi, visualize_heatmap
+from trident.wsi_objects.ImageWSI import ImageWSI
+
+"""
+Test that thumbnails and low-resolution levels are generated once per slide and reused.
+"""
+
+class TestThumbnailCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.image, cls.png_path, _ = make_synthetic_slides(cls.tmp_dir, (1200, 1100))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def test_thumbnail_generated_once(self):
+        cache_dir = os.path.join(self.tmp_dir, 'thumbs')
+        wsi = load_wsi(self.png_path, mpp=0.5, lazy_init=False, thumbnail_cache_dir=cache_dir)
+        with mock.patch.object(ImageWSI, 'get_thumbnail', wraps=wsi.get_thumbnail) as get_thumbnail:
+            thumb = wsi.get_cached_thumbnail((500, 545))
+            self.assertIs(wsi.get_cached_thumbnail((500, 545)), thumb)
+            wsi.create_patcher(patch_size=256, src_mag=20, dst_mag=20).visualize()  # 917x1000 thumbnail
+            small = wsi.get_cached_thumbnail((100, 109))  # resampled from a cached thumbnail
+            self.assertEqual(get_thumbnail.call_count, 2)
+        self.assertEqual(small.size, (100, 109))
+
+        # A new object (e.g., next run) reads the persisted thumbnail
+        wsi = load_wsi(self.png_path, mpp=0.5, lazy_init=False, thumbnail_cache_dir=cache_dir)
+        with mock.patch.object(ImageWSI, 'get_thumbnail', side_effect=AssertionError('thumbnail regenerated')):
+            np.testing.assert_array_equal(np.asarray(wsi.get_cached_thumbnail((500, 545))), np.asarray(thumb))
+
+    def test_level_image_and_heatmap(self):
+        wsi = load_wsi(self.png_path, mpp=0.5, lazy_init=False, thumbnail_cache_dir=os.path.join(self.tmp_dir, 'levels'))
+        level = wsi.get_level_image(1)
+        self.assertEqual(level.shape, (600, 550, 3))
+        self.assertIs(wsi.get_level_image(1), level)
+
+        coords = np.array([[0, 0], [256, 0], [0, 256], [512, 512]])
+        out_dir = os.path.join(self.tmp_dir, 'heatmap')
+        path = visualize_heatmap(
+            wsi, np.arange(4.), coords, patch_size_level0=256, vis_level=1, num_top_patches_to_save=2, output_dir=out_dir
+        )
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(len(os.listdir(os.path.join(out_dir, 'topk_patches'))), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import torch
+from torchvision import transforms as T
+
+import sys; sys.path.append('../')
+from trident import load_wsi
+
+"""
+Test the tifffile backend against OpenSlide on tiled and stripped TIFF pyramids.
+"""
+
+
+class Threshold(torch.nn.Module):
+    input_size = 64
+    precision = torch.float32
+    eval_transforms = T.ToTensor()
+
+    def forward(self, imgs):
+        return (imgs.mean(dim=1) > 0.5).to(torch.uint8)
+
+
+class TestTiffFileWSI(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            import tifffile
+        except ImportError:
+            raise unittest.SkipTest('tifffile is required by the tifffile backend.')
+        cls.tmp_dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(0)
+        cls.image = rng.integers(0, 256, (1100, 1300, 3), dtype=np.uint8)
+        cls.tiled_path = os.path.join(cls.tmp_dir, 'tiled.tif')
+        with tifffile.TiffWriter(cls.tiled_path) as tw:
+            tw.write(cls.image, tile=(256, 256), compression='zlib', photometric='rgb', resolution=(1e4 / 0.5, 1e4 / 0.5), resolutionunit='CENTIMETER')
+            tw.write(cls.image[::4, ::4], tile=(128, 128), compression='zlib', photometric='rgb', subfiletype=1)
+        cls.stripped_path = os.path.join(cls.tmp_dir, 'stripped.tif')
+        tifffile.imwrite(cls.stripped_path, cls.image, rowsperstrip=100, photometric='rgb')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def test_metadata_matches_openslide(self):
+        reference = load_wsi(self.tiled_path, lazy_init=False)
+        wsi = load_wsi(self.tiled_path, reader_type='tifffile', lazy_init=False)
+        self.assertEqual(wsi.dimensions, reference.dimensions)
+        self.assertEqual(list(wsi.level_dimensions), list(reference.level_dimensions))
+        np.testing.assert_allclose(wsi.level_downsamples, reference.level_downsamples)
+        self.assertAlmostEqual(wsi.mpp, 0.5)
+        self.assertEqual(wsi.mag, reference.mag)
+        self.assertEqual(wsi.get_tile_size(1), (128, 128))
+
+    def test_regions_match_openslide(self):
+        # Level coordinates aligned on the level grid: OpenSlide interpolates sub-pixel offsets.
+        coords = np.array([[0, 0], [1204, 1000], [12, 8], [-20, -32], [300, 500]])
+        reference = load_wsi(self.tiled_path, lazy_init=False)  # OpenSlide does not read stripped TIFFs
+        for path in (self.tiled_path, self.stripped_path):
+            for threads in (1, 4):
+                wsi = load_wsi(path, reader_type='tifffile', lazy_init=False, num_decode_threads=threads, mpp=0.5)
+                for level in range(wsi.level_count):
+                    with self.subTest(path=os.path.basename(path), threads=threads, level=level):
+                        expected = reference.read_regions(coords, level, (100, 120))
+                        np.testing.assert_array_equal(wsi.read_regions(coords, level, (100, 120)), expected)
+                        np.testing.assert_array_equal(wsi.read_regions(coords, level, (100, 120), max_chunks_per_step=1), expected)
+
+    def test_scaled_reads_match_area_resampling(self):
+        import cv2
+        import tifffile
+        smooth = cv2.resize(self.image[:40, :48], (1536, 1280), interpolation=cv2.INTER_CUBIC)
+        for compression, tolerance in [('zlib', 0), ('jpeg', 2)]:
+            path = os.path.join(self.tmp_dir, f'scaled_{compression}.tif')
+            tifffile.imwrite(path, smooth, tile=(256, 256), photometric='rgb', compression=compression)
+            wsi = load_wsi(path, reader_type='tifffile', lazy_init=False, mpp=0.25)
+            full = wsi.read_region((0, 0), 0, (1536, 1280), read_as='numpy')
+            for scale in (2, 4, 8):
+                with self.subTest(compression=compression, scale=scale):
+                    self.assertEqual(wsi.get_dct_scale(0, scale + 0.5), scale)
+                    expected = cv2.resize(full, (1536 // scale, 1280 // scale), interpolation=cv2.INTER_AREA)
+                    scaled = wsi.read_region_scaled((512, 256), 0, (100, 90), scale, read_as='numpy')
+                    diff = np.abs(scaled.astype(int) - expected[256 // scale:256 // scale + 90, 512 // scale:512 // scale + 100])
+                    self.assertLessEqual(diff.mean(), tolerance)
+
+    def test_patcher_decodes_at_reduced_resolution(self):
+        import cv2
+        import tifffile
+        # JPEG slide at 0.25 mpp without a 10x level: 10x patches are decoded 4x smaller and not resized
+        smooth = cv2.resize(self.image[:40, :48], (1536, 1280), interpolation=cv2.INTER_CUBIC)
+        smooth[:, :768] //= 4  # background on the left half
+        path = os.path.join(self.tmp_dir, 'no_10x_level.tif')
+        tifffile.imwrite(path, smooth, tile=(256, 256), photometric='rgb', compression='jpeg', resolution=(1e4 / 0.25, 1e4 / 0.25), resolutionunit='CENTIMETER')
+        wsi = load_wsi(path, reader_type='tifffile', lazy_init=False, max_workers=0)
+        full = cv2.resize(wsi.read_region((0, 0), 0, (1536, 1280), read_as='numpy'), (384, 320), interpolation=cv2.INTER_AREA)
+        for region_size in (None, 1024):
+            with self.subTest(region_size=region_size):
+                patcher = wsi.create_patcher(patch_size=64, src_pixel_size=0.25, dst_pixel_size=1, region_size=region_size)
+                self.assertEqual((patcher.read_scale, patcher.read_size), (4, 64))
+                tiles, coords = patcher.get_tiles_xy(patcher.valid_coords) if region_size is None else patcher.get_region_tiles(0)
+                for tile, (x, y) in zip(tiles, coords):
+                    diff = np.abs(tile.astype(int) - full[y // 4:y // 4 + 64, x // 4:x // 4 + 64])
+                    self.assertLessEqual(diff.mean(), 2)
+
+        job_dir = os.path.join(self.tmp_dir, 'segmentation')
+        with mock.patch.object(wsi, 'read_region_scaled', wraps=wsi.read_region_scaled) as read_region_scaled:
+            gdf_path = wsi.segment_tissue(segmentation_model=Threshold(), target_mag=10, job_dir=job_dir, batch_size=4, device='cpu')
+        # Patches (the thumbnail of the contours is read through it too)
+        patch_reads = [call for call in read_region_scaled.call_args_list if call.args[2] == (64, 64)]
+        self.assertEqual(len(patch_reads), 6 * 5)
+        self.assertTrue(all(call.args[3] == 4 for call in patch_reads))
+        self.assertTrue(os.path.exists(gdf_path))
+
+    def test_pickled_slide_reopens(self):
+        wsi = load_wsi(self.tiled_path, reader_type='tifffile', lazy_init=False)
+        expected = wsi.read_region((256, 128), 0, (64, 64), read_as='numpy')
+        clone = pickle.loads(pickle.dumps(wsi))
+        np.testing.assert_array_equal(clone.read_region((256, 128), 0, (64, 64), read_as='numpy'), expected)
+        wsi.close()
+
+    def test_close_in_forked_child_keeps_parent_handle(self):
+        wsi = load_wsi(self.tiled_path, reader_type='tifffile', lazy_init=False)
+        handle = wsi._img
+        wsi._img_pid = os.getpid() + 1  # as inherited through fork
+        with mock.patch('trident.wsi_objects.WSI._get_worker_handle') as get_worker_handle:
+            wsi.close()
+        get_worker_handle.assert_not_called()
+        self.assertIsNone(wsi._img)
+        self.assertFalse(handle.filehandle.closed)  # still used by the parent
+        handle.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import os
+import shutil
+import tempfile
+import unittest
+from collections import OrderedDict
+import numpy as np
+import torch
+from torchvision import transforms as T
+from torch.utils.data import DataLoader
+
+import sys; sys.path.append('../')
+from _synthetic import make_synthetic_slides
+from trident import Processor, load_wsi, SharedTileCache, WSIPatcherDataset
+
+"""
+Test the shared decoded-tile cache: reads through the cache must match uncached reads,
+counters must be shared by DataLoader workers, and the byte budget must be enforced.
+"""
+
+class TestSharedTileCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.image, cls.png_path, _ = make_synthetic_slides(cls.tmp_dir, (700, 900))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def test_cached_reads_match_uncached(self):
+        cache = SharedTileCache(budget_bytes=32 * 1024**2, tile_size=128)
+        wsi = load_wsi(self.png_path, mpp=0.5, lazy_init=False, tile_cache=cache)
+        for location, size in [((0, 0), (300, 200)), ((850, 650), (128, 128)), ((64, 64), (256, 256))]:
+            region = wsi.read_region(location, 0, size, read_as='numpy')
+            expected = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+            crop = self.image[location[1]:location[1] + size[1], location[0]:location[0] + size[0]]
+            expected[:crop.shape[0], :crop.shape[1]] = crop
+            np.testing.assert_array_equal(region, expected)
+
+        stats = cache.stats()
+        self.assertGreater(stats['hits'], 0)
+        self.assertGreater(stats['misses'], 0)
+        cache.close()
+
+    def test_counters_shared_with_workers(self):
+        cache = SharedTileCache(budget_bytes=32 * 1024**2, tile_size=128)
+        wsi = load_wsi(self.png_path, mpp=0.5, lazy_init=False, tile_cache=cache)
+        patcher = wsi.create_patcher(patch_size=128, src_mag=20, dst_mag=20, overlap=64)
+        loader = DataLoader(WSIPatcherDataset(patcher, None), batch_size=8, num_workers=2)
+
+        for _ in loader:
+            pass
+        first = cache.stats()
+        for _ in loader:
+            pass
+        second = cache.stats()
+
+        self.assertEqual(first['misses'], second['misses'])  # 2nd epoch served from the cache
+        self.assertGreater(second['hits'], first['hits'])
+        cache.close()
+
+    def test_budget_and_evictions(self):
+        cache = SharedTileCache(budget_bytes=2 * 128 * 128 * 3, tile_size=128)
+        wsi = load_wsi(self.png_path, mpp=0.5, lazy_init=False, tile_cache=cache)
+        wsi.read_region((0, 0), 0, (384, 128), read_as='numpy')
+        stats = cache.stats()
+        self.assertEqual(stats['misses'], 3)
+        self.assertEqual(stats['evictions'], 1)
+        self.assertLessEqual(stats['used_bytes'], stats['budget_bytes'])
+        cache.close()
+
+    def test_lookup_table_matches_lru(self):
+        # 6 slots, keys crowded on few buckets so that probes and backward shifts on eviction are exercised
+        cache = SharedTileCache(budget_bytes=6 * 4 * 4 * 3, tile_size=4)
+        reference = OrderedDict()
+        rng = np.random.default_rng(0)
+        src = (slice(None), slice(None))
+        hits = evictions = 0
+        for key in rng.choice([k * cache.n_buckets + rng.integers(3) for k in range(-20, 20)], 2000):
+            key = int(key)
+            dst = np.empty((4, 4, 3), dtype=np.uint8)
+            hit = cache._paste_if_cached(key, dst, src)
+            self.assertEqual(hit, key in reference)
+            if hit:
+                hits += 1
+                reference.move_to_end(key)
+                self.assertTrue((dst == key % 251).all())
+            else:
+                cache._insert(key, np.full((4, 4, 3), key % 251, dtype=np.uint8))
+                reference[key] = None
+                if len(reference) > cache.n_slots:
+                    reference.popitem(last=False)
+                    evictions += 1
+        stats = cache.stats()
+        self.assertEqual(stats['used_bytes'], stats['budget_bytes'])
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (hits, 2000 - hits, evictions))
+        self.assertGreater(hits, 0)
+        cache.close()
+
+    def test_slot_rewritten_during_copy(self):
+        cache = SharedTileCache(budget_bytes=4 * 4 * 3, tile_size=4)  # a single slot
+        cache._insert(1, np.full((4, 4, 3), 1, dtype=np.uint8))
+        tiles = cache._tiles
+
+        class EvictWhileCopying:
+            """ Tiles of the cache, with the slot evicted for another tile (by another worker) as it is read """
+            def __getitem__(self, slot):
+                cache._tiles = tiles
+                cache._insert(2, np.full((4, 4, 3), 2, dtype=np.uint8))
+                return tiles[slot]
+
+        cache._tiles = EvictWhileCopying()
+        dst = np.empty((4, 4, 3), dtype=np.uint8)
+        self.assertFalse(cache._paste_if_cached(1, dst, (slice(None), slice(None))))
+        self.assertTrue(cache._paste_if_cached(2, dst, (slice(None), slice(None))))
+        self.assertTrue((dst == 2).all())
+        cache.close()
+
+    def test_processor_close_releases_cache(self):
+        class Threshold(torch.nn.Module):
+            input_size, target_mag, precision, eval_transforms = 64, 10, torch.float32, T.ToTensor()
+            def forward(self, imgs):
+                return (imgs.mean(dim=1) > 0.5).to(torch.uint8)
+
+        wsi_list = os.path.join(self.tmp_dir, 'wsis.csv')
+        with open(wsi_list, 'w') as f:
+            f.write('wsi,mpp\nslide.png,0.5\n')
+        processor = Processor(
+            job_dir=os.path.join(self.tmp_dir, 'job'), wsi_source=self.tmp_dir, wsi_ext=['.png'], custom_list_of_wsis=wsi_list,
+            max_workers=0, tile_cache_budget=8 * 1024**2,
+        )
+        shm_name = processor.tile_cache._shm.name
+        processor.close()
+        self.assertIsNone(processor.tile_cache)
+        self.assertIsNone(processor.wsis[0].tile_cache)
+        self.assertFalse(os.path.exists(os.path.join('/dev/shm', shm_name)))
+
+        # Created again by the next job, and shared with the slides
+        processor.run_segmentation_job(Threshold(), seg_mag=10, batch_size=4, device='cpu')
+        self.assertIs(processor.wsis[0].tile_cache, processor.tile_cache)
+        self.assertGreater(processor.tile_cache.stats()['misses'], 0)
+        processor.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
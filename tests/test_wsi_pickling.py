@@ -0,0 +1,89 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from torch.utils.data import DataLoader
+
+import sys; sys.path.append('../')
+from _synthetic import make_synthetic_slides
+from trident import load_wsi, SharedTileCache, WSIPatcherDataset
+from trident.wsi_objects.CuCIMWSI import CuCIMWSI
+
+"""
+Test that WSI objects pickle without their backend handle and reopen it lazily,
+so that patch datasets work with the spawn start method and persistent workers.
+"""
+
+class TestWSIPickling(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.image, cls.png_path, cls.tiff_path = make_synthetic_slides(cls.tmp_dir, (600, 700), tiff=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def _slides(self, **kwargs):
+        slides = [load_wsi(self.png_path, mpp=0.5, lazy_init=False, **kwargs)]
+        if self.tiff_path is not None:
+            slides.append(load_wsi(self.tiff_path, lazy_init=False, **kwargs))
+        return slides
+
+    def test_pickle_roundtrip(self):
+        for wsi in self._slides():
+            with self.subTest(backend=wsi.__class__.__name__):
+                payload = pickle.dumps(wsi)
+                clone = pickle.loads(payload)
+                self.assertIsNone(clone.__dict__['_img'])  # handle not serialized
+                self.assertEqual(clone.level_dimensions, wsi.level_dimensions)
+                self.assertEqual(clone.mpp, wsi.mpp)
+                np.testing.assert_array_equal(
+                    clone.read_region((100, 50), 0, (64, 64), read_as='numpy'),
+                    wsi.read_region((100, 50), 0, (64, 64), read_as='numpy'),
+                )
+
+    def test_close_only_closes_own_handle(self):
+        # Without cucim: a slide object around a stand-in for its CuImage handle
+        for forked in (False, True):
+            with self.subTest(forked=forked):
+                wsi = CuCIMWSI.__new__(CuCIMWSI)
+                wsi.slide_path = self.tiff_path or self.png_path
+                handle = mock.Mock()
+                wsi.img = handle
+                if forked:
+                    wsi._img_pid = os.getpid() + 1  # as inherited through fork
+                with mock.patch('trident.wsi_objects.WSI._get_worker_handle') as get_worker_handle:
+                    wsi.close()
+                get_worker_handle.assert_not_called()
+                self.assertEqual(handle.close.call_count, 0 if forked else 1)
+                self.assertIsNone(wsi._img)
+
+    def test_spawn_persistent_workers(self):
+        cache = SharedTileCache(budget_bytes=16 * 1024**2, tile_size=128)
+        for wsi in self._slides(tile_cache=cache):
+            with self.subTest(backend=wsi.__class__.__name__):
+                patcher = wsi.create_patcher(patch_size=128, src_mag=20, dst_mag=20)
+                dataset = WSIPatcherDataset(patcher, transform=np.array)
+                loader = DataLoader(
+                    dataset, batch_size=4, num_workers=2,
+                    multiprocessing_context='spawn', persistent_workers=True
+                )
+                for _ in range(2):
+                    for imgs, (xs, ys) in loader:
+                        for img, x, y in zip(imgs, xs, ys):
+                            x, y = int(x), int(y)
+                            expected = np.zeros((128, 128, 3), dtype=np.uint8)
+                            crop = self.image[y:y + 128, x:x + 128]
+                            expected[:crop.shape[0], :crop.shape[1]] = crop
+                            np.testing.assert_array_equal(img.numpy(), expected)
+        self.assertGreater(cache.stats()['hits'], 0)
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -250,7 +250,7 @@ def update_log(path_to_log, key, message):
     
 ################################################################################
 
-def save_h5(save_path, assets, attributes = None, mode = 'w'):
+def save_h5(save_path, assets, attributes = None, mode = 'w', chunk_rows = 1):
     """
     The `save_h5` function saves a dictionary of assets to an HDF5 file. This is commonly used to store 
     large datasets or hierarchical data structures in a compact and organized format.
@@ -265,6 +265,9 @@ def save_h5(save_path, assets, attributes = None, mode = 'w'):
         A dictionary mapping dataset names to additional metadata (attributes) to save alongside the data. Defaults to None.
     mode : str, optional
         The file mode for opening the HDF5 file. Options include 'w' (write) and 'a' (append). Defaults to 'w'.
+    chunk_rows : int, optional
+        Number of rows per HDF5 chunk of the created datasets. Use more rows for narrow datasets written 
+        or read in bulk (e.g., coordinates). Defaults to 1.
 
     Returns:
     --------
@@ -284,7 +287,7 @@ def save_h5(save_path, assets, attributes = None, mode = 'w'):
             data_shape = val.shape
             if key not in file:
                 data_type = val.dtype
-                chunk_shape = (1, ) + data_shape[1:]
+                chunk_shape = (chunk_rows, ) + data_shape[1:]
                 maxshape = (None, ) + data_shape[1:]
                 dset = file.create_dataset(key, shape=data_shape, maxshape=maxshape, chunks=chunk_shape, dtype=data_type)
                 dset[:] = val
@@ -763,6 +766,7 @@ def get_num_workers(batch_size: int,
         The default number of workers to use if the system's CPU core count cannot be determined. Defaults to 16.
     max_workers : int or None, optional
         The maximum number of workers allowed. Defaults to `2 * batch_size` if not provided.
+        Set to 0 to load data in the main process.
 
     Returns:
     --------
@@ -777,14 +781,15 @@ def get_num_workers(batch_size: int,
 
     Notes:
     ------
-    - The number of workers is clipped to a minimum of 1 to ensure multiprocessing is not disabled.
+    - The number of workers is clipped to a minimum of 1 to ensure multiprocessing is not disabled,
+      unless `max_workers` is 0.
     - The maximum number of workers defaults to `2 * batch_size` unless explicitly specified.
     - The function ensures compatibility with systems where `os.cpu_count()` may return `None`.
     - On Windows systems, the number of workers is always set to 0 to ensure compatibility with PyTorch datasets whose attributes may not be serializable.
     """
 
-    # Disable pytorch multiprocessing on Windows
-    if os.name == 'nt':
+    # Disable pytorch multiprocessing on Windows, or if requested
+    if os.name == 'nt' or max_workers == 0:
         return 0
     
     num_cores = os.cpu_count() or fallback
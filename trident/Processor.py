@@ -3,8 +3,9 @@ import os
 import sys
 from tqdm import tqdm
 import shutil
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 from inspect import signature
+from urllib.parse import quote
 import geopandas as gpd
 
 from trident.IO import create_lock, remove_lock, is_locked, update_log
@@ -12,6 +13,13 @@ from trident import load_wsi
 from trident.Maintenance import deprecated
 from trident.Converter import OPENSLIDE_EXTENSIONS, PIL_EXTENSIONS
 from trident import WSIReaderType
+from trident.wsi_objects.TileCache import SharedTileCache
+from trident.wsi_objects.WSIPatcher import PreparedTissueMask
+from trident.wsi_objects.MetadataIndex import SlideMetadataIndex
+from trident.wsi_objects.RangeReader import is_remote_path
+from trident.wsi_objects.ReaderPool import SlideReaderPool
+from trident.wsi_objects.WSI import WSI
+from trident.IO import get_num_workers
 
 
 class Processor:
@@ -27,6 +35,10 @@ class Processor:
         custom_list_of_wsis: Optional[str] = None,
         max_workers: Optional[int] = None,
         reader_type: Optional[WSIReaderType] = None,
+        tile_cache_budget: Optional[int] = None,
+        use_metadata_index: bool = True,
+        persist_thumbnails: bool = False,
+        persistent_readers: bool = False,
     ) -> None:
         """
         The `Processor` class handles all preprocessing steps starting from whole-slide images (WSIs). 
@@ -35,6 +47,7 @@ class Processor:
             - `populate_cache`: Moves slides from the source directory to a local cache directory for faster downstream processing.
             - `run_segmentation_job`: Performs tissue segmentation on all slides managed by the processor.
             - `run_patching_job`: Extracts patch coordinates from the segmented tissue regions of slides.
+            - `run_multi_patching_job`: Extracts patch coordinates at several settings in a single pass over the slides.
             - `run_patch_feature_extraction_job`: Extracts patch-level features using a specified patch encoder.
                 - Deprecated alias: `run_feature_extraction_job`
             - `run_slide_feature_extraction_job`: Extracts slide-level features using a specified slide encoder.
@@ -46,7 +59,9 @@ class Processor:
             wsi_source (str): 
                 The directory containing the WSIs to be processed. This can either be a local directory 
                 or a network-mounted drive. All slides in this directory matching the specified file 
-                extensions will be considered for processing.
+                extensions will be considered for processing. It can also be an http(s) URL prefix (e.g., an 
+                object store bucket), in which case `custom_list_of_wsis` is required and the slides are read 
+                in place with range requests by the 'tifffile' reader.
             wsi_ext (List[str]): 
                 A list of accepted WSI file extensions, such as ['.ndpi', '.svs']. This allows for 
                 filtering slides based on their format. If set to None, a default list of common extensions 
@@ -54,7 +69,8 @@ class Processor:
             wsi_cache (str, optional): 
                 An optional directory for caching WSIs locally. If specified, slides will be copied 
                 from the source directory to this local directory before processing, improving performance 
-                when the source is a network drive. Defaults to None.
+                when the source is a network drive. For an http(s) `wsi_source`, slides are not copied: this 
+                directory instead caches the blocks of the slides fetched by range requests. Defaults to None.
             clear_cache (bool, optional): 
                 A flag indicating whether slides in the cache should be deleted after processing. 
                 This helps manage storage space. Defaults to False.
@@ -73,8 +89,25 @@ class Processor:
                 Maximum number of workers for data loading. If None, the default behavior will be used.
                 Defaults to None.
             reader_type (WSIReaderType, optional):
-                Force the image reader engine to use. Options are are ["openslide", "image", "cucim"]. Defaults to None
+                Force the image reader engine to use. Options are are ["openslide", "image", "cucim", "tifffile"]. Defaults to None
                 (auto-determine the right engine based on image extension).
+            tile_cache_budget (int, optional):
+                RAM budget in bytes of a cache of decoded tiles shared by all slides and all DataLoader workers.
+                Useful when tiles are decoded several times, e.g., with overlapping patches or when segmentation
+                and artifact removal run back to back. The cache lives in shared memory (/dev/shm), released by `close`. Defaults to None (no cache).
+            use_metadata_index (bool, optional):
+                Whether to keep slide metadata (dimensions, pyramid, mpp, magnification, properties) in a SQLite index
+                in `job_dir`, keyed on slide path, size and modification time. Indexed slides are not opened until
+                pixels are read, across stages and restarts. Defaults to True.
+            persist_thumbnails (bool, optional):
+                Thumbnails and low-resolution levels are generated once per slide and shared by segmentation, patch
+                visualization and contour overlays. If True, they are also saved in `job_dir/_thumbnail_cache` to be
+                reused by later runs. Defaults to False.
+            persistent_readers (bool, optional):
+                Whether to read the patches of segmentation and patch feature extraction jobs with a single pool of 
+                workers shared by all slides (see `SlideReaderPool`), instead of a DataLoader per slide. Workers are 
+                started once rather than per slide, and read the next slides while the current one is processed, 
+                which pays off on many small slides (e.g., biopsies). Call `close` to stop them. Defaults to False.
 
         Returns:
             None: This method initializes the class instance and sets up the environment for processing.
@@ -107,13 +140,30 @@ class Processor:
         self.skip_errors = skip_errors
         self.custom_mpp_keys = custom_mpp_keys
         self.max_workers = max_workers
+        self.tile_cache_budget = tile_cache_budget
+        self.tile_cache = SharedTileCache(budget_bytes=tile_cache_budget) if tile_cache_budget else None
+        self.metadata_index = SlideMetadataIndex(os.path.join(job_dir, '_metadata_index.sqlite')) if use_metadata_index else None
+        self.thumbnail_cache_dir = os.path.join(job_dir, '_thumbnail_cache') if persist_thumbnails else None
+        # Decoded copies of PNG/JPEG slides (several GB each) next to the results rather than in `/tmp`, often a tmpfs
+        self.image_cache_dir = os.path.join(job_dir, '_image_cache')
+        self.persistent_readers = persistent_readers
+        self.reader_pool = None
+
+        # Remote source: slides are read in place, `wsi_cache` holds the fetched blocks rather than full copies.
+        self.remote_source = is_remote_path(wsi_source)
+        self.block_cache_dir = None
+        if self.remote_source:
+            if custom_list_of_wsis is None:
+                raise ValueError(f"Cannot list the slides of the remote source {wsi_source}: provide `custom_list_of_wsis`.")
+            self.block_cache_dir, self.wsi_cache = self.wsi_cache, None
 
         # Collect list of valid slides
         assert isinstance(self.wsi_ext, list), f'wsi_ext must be a list of file extensions, got {self.wsi_ext} of type {type(self.wsi_ext)}'
         valid_slides = []
         for ext in self.wsi_ext:
             assert ext.startswith('.'), 'Each extension in wsi_ext must start with a period.'
-            valid_slides.extend([name for name in os.listdir(wsi_source) if name.endswith(ext)])
+            if not self.remote_source:
+                valid_slides.extend([name for name in os.listdir(wsi_source) if name.endswith(ext)])
 
         if custom_list_of_wsis is not None:
             import pandas as pd
@@ -130,11 +180,16 @@ class Processor:
         if self.wsi_cache:
             os.makedirs(self.wsi_cache, exist_ok=True)
             print(f'Using local cache at {wsi_cache}, which currently contains {len(os.listdir(wsi_cache))} files.')
+        elif self.block_cache_dir:
+            print(f'Caching the blocks read from {wsi_source} in {self.block_cache_dir}.')
 
         # Lazy-init WSI objects
         self.wsis = []
         for wsi_idx, wsi in enumerate(valid_slides):
-            wsi_path = os.path.join(self.wsi_cache, wsi) if self.wsi_cache is not None else os.path.join(self.wsi_source, wsi)
+            if self.remote_source:
+                wsi_path = f"{self.wsi_source.rstrip('/')}/{quote(wsi)}"
+            else:
+                wsi_path = os.path.join(self.wsi_cache, wsi) if self.wsi_cache is not None else os.path.join(self.wsi_source, wsi)
             
             # Get path to segmentation
             tissue_seg_path = os.path.join(self.job_dir, 'contours_geojson', f'{os.path.splitext(wsi)[0]}.geojson')
@@ -149,6 +204,11 @@ class Processor:
                 mpp=valid_mpps[wsi_idx] if valid_mpps is not None else None,
                 max_workers=self.max_workers,
                 reader_type=reader_type,
+                tile_cache=self.tile_cache,
+                metadata_index=self.metadata_index,
+                thumbnail_cache_dir=self.thumbnail_cache_dir,
+                image_cache_dir=self.image_cache_dir,
+                **({'block_cache_dir': self.block_cache_dir} if self.remote_source else {}),
             )
             self.wsis.append(slide)
 
@@ -170,6 +230,9 @@ class Processor:
 
         >>> processor.populate_cache()
         """
+        if self.remote_source:
+            print('Slides of a remote source are read in place (only the blocks used are cached). Nothing to copy.')
+            return
         self.loop = tqdm(self.wsis, desc='Populating cache', total = len(self.wsis))
         for wsi in self.loop:
             # Check if WSI is already in cache
@@ -243,31 +306,19 @@ class Processor:
             ignore = ['segmentation_model', 'loop', 'valid_slides', 'wsis']
         )
 
+        log_fp = os.path.join(self.job_dir, '_logs_segmentation.txt')
+        self._attach_tile_cache()
         self.loop = tqdm(self.wsis, desc='Segmenting tissue', total = len(self.wsis))
-        for wsi in self.loop:   
-            # Check if contour already exists
-            if os.path.exists(os.path.join(saveto, f'{wsi.name}.jpg')) and not is_locked(os.path.join(saveto, f'{wsi.name}.jpg')):
-                self.loop.set_postfix_str(f'{wsi.name} already segmented. Skipping...')
-                update_log(os.path.join(self.job_dir, '_logs_segmentation.txt'), f'{wsi.name}{wsi.ext}', 'Tissue segmented.')
-                self.cleanup(f'{wsi.name}{wsi.ext}')
-                continue
-
-            # Check if another process has claimed this slide
-            if is_locked(os.path.join(saveto, f'{wsi.name}.jpg')):
-                self.loop.set_postfix_str(f'{wsi.name} is locked. Skipping...')
-                continue
+        if self.persistent_readers:
+            self._stream_segmentation(segmentation_model, seg_mag, holes_are_tissue, batch_size, artifact_remover_model, device, saveto, log_fp)
+            self.report_tile_cache()
+            return saveto
 
-            # Check if wsi is in cache
-            if self.wsi_cache is not None:
-                if is_locked(os.path.join(self.wsi_cache, f'{wsi.name}{wsi.ext}')) or not os.path.exists(os.path.join(self.wsi_cache, f'{wsi.name}{wsi.ext}')):
-                    self.loop.set_postfix_str(f'{wsi.name} not found in cache. Skipping...')
-                    update_log(os.path.join(self.job_dir, '_logs_segmentation.txt'), f'{wsi.name}{wsi.ext}', 'WSI not found in cache.')
-                    continue
-            
+        for wsi in self._slides_to_segment(saveto, log_fp):
             try:
                 self.loop.set_postfix_str(f'Segmenting {wsi}')
                 create_lock(os.path.join(saveto, f'{wsi.name}.jpg'))
-                update_log(os.path.join(self.job_dir, '_logs_segmentation.txt'), f'{wsi.name}{wsi.ext}', 'LOCKED. Segmenting tissue...')
+                update_log(log_fp, f'{wsi.name}{wsi.ext}', 'LOCKED. Segmenting tissue...')
 
                 # call a function from WSI object to do the work
                 gdf_saveto = wsi.segment_tissue(
@@ -288,28 +339,124 @@ class Processor:
                         job_dir=self.job_dir
                     )
 
-                remove_lock(os.path.join(saveto, f'{wsi.name}.jpg'))
-
-                gdf = gpd.read_file(gdf_saveto, rows=1)
-                if gdf.empty:
-                    update_log(os.path.join(self.job_dir, '_logs_segmentation.txt'), f'{wsi.name}{wsi.ext}', 'Segmentation returned empty GeoDataFrame.')
-                    self.loop.set_postfix_str(f'Empty GeoDataFrame for {wsi.name}.')
-                else:
-                    update_log(os.path.join(self.job_dir,  '_logs_segmentation.txt'), f'{wsi.name}{wsi.ext}', 'Tissue segmented.')
-
-                self.cleanup(f'{wsi.name}{wsi.ext}')
+                self._finish_segmentation(wsi, gdf_saveto, saveto, log_fp)
             except Exception as e:
                 if isinstance(e, KeyboardInterrupt):
                     remove_lock(os.path.join(saveto, f'{wsi.name}.jpg'))
                 if self.skip_errors:
-                    update_log(os.path.join(self.job_dir, '_logs_segmentation.txt'), f'{wsi.name}{wsi.ext}', f'ERROR: {e}')
+                    update_log(log_fp, f'{wsi.name}{wsi.ext}', f'ERROR: {e}')
                     continue
                 else:
                     raise e
+
+        self.report_tile_cache()
                 
         # Return the directory where the contours are saved
         return saveto
 
+    def _slides_to_segment(self, saveto: str, log_fp: str) -> Iterator[WSI]:
+        """ Slides of `self.loop` that remain to be segmented, skipping (and logging) the others """
+        for wsi in self.loop:   
+            # Check if contour already exists
+            if os.path.exists(os.path.join(saveto, f'{wsi.name}.jpg')) and not is_locked(os.path.join(saveto, f'{wsi.name}.jpg')):
+                self.loop.set_postfix_str(f'{wsi.name} already segmented. Skipping...')
+                update_log(log_fp, f'{wsi.name}{wsi.ext}', 'Tissue segmented.')
+                self.cleanup(f'{wsi.name}{wsi.ext}')
+                continue
+
+            # Check if another process has claimed this slide
+            if is_locked(os.path.join(saveto, f'{wsi.name}.jpg')):
+                self.loop.set_postfix_str(f'{wsi.name} is locked. Skipping...')
+                continue
+
+            # Check if wsi is in cache
+            if self.wsi_cache is not None:
+                if is_locked(os.path.join(self.wsi_cache, f'{wsi.name}{wsi.ext}')) or not os.path.exists(os.path.join(self.wsi_cache, f'{wsi.name}{wsi.ext}')):
+                    self.loop.set_postfix_str(f'{wsi.name} not found in cache. Skipping...')
+                    update_log(log_fp, f'{wsi.name}{wsi.ext}', 'WSI not found in cache.')
+                    continue
+
+            yield wsi
+
+    def _finish_segmentation(self, wsi: WSI, gdf_saveto: str, saveto: str, log_fp: str) -> None:
+        """ Release the lock of a segmented slide and log the outcome """
+        remove_lock(os.path.join(saveto, f'{wsi.name}.jpg'))
+
+        gdf = gpd.read_file(gdf_saveto, rows=1)
+        if gdf.empty:
+            update_log(log_fp, f'{wsi.name}{wsi.ext}', 'Segmentation returned empty GeoDataFrame.')
+            self.loop.set_postfix_str(f'Empty GeoDataFrame for {wsi.name}.')
+        else:
+            update_log(log_fp, f'{wsi.name}{wsi.ext}', 'Tissue segmented.')
+
+        self.cleanup(f'{wsi.name}{wsi.ext}')
+
+    def _stream_segmentation(
+        self,
+        segmentation_model: torch.nn.Module,
+        seg_mag: int,
+        holes_are_tissue: bool,
+        batch_size: int,
+        artifact_remover_model: Optional[torch.nn.Module],
+        device: str,
+        saveto: str,
+        log_fp: str,
+    ) -> None:
+        """
+        `run_segmentation_job` with the persistent reader pool: the patches of all the slides are read by the same
+        workers and streamed back continuously, so that the next slides are read while the current one is segmented.
+        The artifact removal pass of a slide is queued as soon as its first pass is saved.
+        """
+        pool = self.get_reader_pool(batch_size)
+        segmentation_model.to(device)
+        if artifact_remover_model is not None:
+            artifact_remover_model.to(device)
+        jobs = {}  # slide -> (model, holes_are_tissue, predicted_mask, mpp_reduction_factor) of its current pass
+
+        def work_items():
+            for wsi in self._slides_to_segment(saveto, log_fp):
+                try:
+                    self.loop.set_postfix_str(f'Segmenting {wsi}')
+                    create_lock(os.path.join(saveto, f'{wsi.name}.jpg'))
+                    update_log(log_fp, f'{wsi.name}{wsi.ext}', 'LOCKED. Segmenting tissue...')
+                    wsi._lazy_initialize()
+                    dataset, predicted_mask, mpp_reduction_factor = wsi._prepare_segmentation(segmentation_model, seg_mag)
+                except Exception as e:
+                    self._close_slide(wsi)
+                    self._slide_error(wsi, e, os.path.join(saveto, f'{wsi.name}.jpg'), log_fp)
+                    continue
+                jobs[wsi] = (segmentation_model, holes_are_tissue, predicted_mask, mpp_reduction_factor)
+                yield wsi, dataset, batch_size, None
+
+        for wsi, batch in pool.stream(work_items()):
+            if wsi not in jobs:
+                continue  # failed slide
+            last = batch is None or isinstance(batch, Exception)  # no read of the slide left in flight
+            if jobs[wsi] is None:  # failed while read, closed once its reads are over
+                self._fail_slide(wsi, jobs, last)
+                continue
+            model, holes, predicted_mask, mpp_reduction_factor = jobs[wsi]
+            try:
+                if isinstance(batch, Exception):
+                    raise batch
+                if batch is not None:
+                    imgs, (xcoords, ycoords) = batch
+                    wsi._segment_batch(model, imgs, xcoords, ycoords, predicted_mask, mpp_reduction_factor, device)
+                    continue
+                gdf_saveto = wsi._save_segmentation(predicted_mask, mpp_reduction_factor, holes, self.job_dir)
+                if artifact_remover_model is not None and model is segmentation_model:
+                    # additionally remove artifacts for better segmentation.
+                    dataset, predicted_mask, mpp_reduction_factor = wsi._prepare_segmentation(artifact_remover_model, artifact_remover_model.target_mag)
+                    jobs[wsi] = (artifact_remover_model, False, predicted_mask, mpp_reduction_factor)
+                    pool.submit(wsi, dataset, 16)  # default batch size of `segment_tissue`
+                    continue
+                del jobs[wsi]
+                self._finish_segmentation(wsi, gdf_saveto, saveto, log_fp)
+                self._close_slide(wsi)
+            except Exception as e:
+                self._fail_slide(wsi, jobs, last)
+                self._slide_error(wsi, e, os.path.join(saveto, f'{wsi.name}.jpg'), log_fp)
+
     def run_patching_job(
         self, 
         target_magnification: int, 
@@ -318,6 +465,8 @@ class Processor:
         saveto: str | None = None, 
         visualize: bool = True,
         min_tissue_proportion: float = 0.,
+        mask_mode: str = 'geometry',
+        patch_order: str = 'column',
     ) -> str:
         """
         The `run_patching_job` function extracts patches from the segmented tissue regions of slides. 
@@ -338,6 +487,12 @@ class Processor:
                 Whether to generate and save visualizations of the patches. Defaults to True.
             min_tissue_proportion: float, optional 
                 Minimum proportion of the patch under tissue to be kept. Defaults to 0. 
+            mask_mode: str, optional
+                How patches are intersected with the tissue contours: 'geometry' (exact polygon intersection) 
+                or 'raster' (rasterized contours, faster on large slides). Defaults to 'geometry'.
+            patch_order: str, optional
+                Order of the saved patches: 'column', 'row' or 'hilbert'. 'row' and 'hilbert' keep consecutive patches 
+                close on the slide, for faster reads during feature extraction. Defaults to 'column'.
 
         Returns:
             str: Absolute path to directory containing patch coordinates.
@@ -353,36 +508,99 @@ class Processor:
         ...     saveto="output/patches/"
         ... )
         """
-        if saveto is None:
-            saveto = f"{target_magnification}x_{patch_size}px_{overlap}px_overlap"
+        return self.run_multi_patching_job(
+            configs=[(target_magnification, patch_size, overlap, min_tissue_proportion)],
+            saveto=None if saveto is None else [saveto],
+            visualize=visualize,
+            mask_mode=mask_mode,
+            patch_order=patch_order,
+        )[0]
+
+    def run_multi_patching_job(
+        self,
+        configs: List[Tuple[int, int, int, float]],
+        saveto: Optional[List[str]] = None,
+        visualize: bool = True,
+        mask_mode: str = 'geometry',
+        patch_order: str = 'column',
+    ) -> List[str]:
+        """
+        The `run_multi_patching_job` function extracts patch coordinates at several settings in a single pass 
+        over the slides. The tissue contours of each slide are loaded and checked once, and their simplified 
+        geometry, spatial index or raster is shared by all the settings that need it, instead of being rebuilt 
+        by one `run_patching_job` per setting.
 
-        self.target_magnification = target_magnification
+        Parameters:
+            configs (List[Tuple[int, int, int, float]]): 
+                Patching settings as (target_magnification, patch_size, overlap, min_tissue_proportion) tuples.
+            saveto (List[str], optional): 
+                One directory per setting, where patch data and visualizations will be saved. If not provided, 
+                directory names are generated as in `run_patching_job`. Defaults to None.
+            visualize (bool, optional): 
+                Whether to generate and save visualizations of the patches. Defaults to True.
+            mask_mode: str, optional
+                How patches are intersected with the tissue contours: 'geometry' (exact polygon intersection) 
+                or 'raster' (rasterized contours, faster on large slides). Defaults to 'geometry'.
+            patch_order: str, optional
+                Order of the saved patches: 'column', 'row' or 'hilbert'. Defaults to 'column'.
 
-        if visualize:
-            save_patch_viz = os.path.join(saveto, 'visualization')
-            os.makedirs(os.path.join(self.job_dir, save_patch_viz), exist_ok=True)
+        Returns:
+            List[str]: Absolute paths to the directories containing patch coordinates, one per setting.
 
-        os.makedirs(os.path.join(self.job_dir, saveto, 'patches'), exist_ok=True)
+        Example
+        -------
+        Extract patches at 20x and 10x magnification in a single pass:
 
-        sig = signature(self.run_patching_job)
-        local_attrs = {k: v for k, v in locals().items() if k in sig.parameters}
-        self.save_config(
-            saveto=os.path.join(self.job_dir, saveto, '_config_coords.json'),
-            local_attrs=local_attrs,
-            ignore = ['segmentation_model', 'loop', 'valid_slides', 'wsis']
-        )
-        self.loop = tqdm(self.wsis, desc=f'Saving tissue coordinates to {saveto}', total = len(self.wsis))
-        for wsi in self.loop:    
-        
-            # Check if patch coords already exist
-            if os.path.exists(os.path.join(self.job_dir, saveto, 'patches', f'{wsi.name}_patches.h5')):
+        >>> processor.run_multi_patching_job(
+        ...     configs=[(20, 256, 0, 0.), (10, 256, 0, 0.5)],
+        ... )
+        """
+        if saveto is None:
+            saveto = [f"{mag}x_{size}px_{ovlp}px_overlap" for mag, size, ovlp, _ in configs]
+        if len(saveto) != len(configs):
+            raise ValueError(f"Expected one saveto directory per config, got {len(saveto)} for {len(configs)} configs.")
+
+        for (target_magnification, patch_size, overlap, min_tissue_proportion), config_saveto in zip(configs, saveto):
+            if visualize:
+                os.makedirs(os.path.join(self.job_dir, config_saveto, 'visualization'), exist_ok=True)
+            os.makedirs(os.path.join(self.job_dir, config_saveto, 'patches'), exist_ok=True)
+
+            self.target_magnification = target_magnification
+            local_attrs = dict(
+                target_magnification=target_magnification,
+                patch_size=patch_size,
+                overlap=overlap,
+                saveto=config_saveto,
+                visualize=visualize,
+                min_tissue_proportion=min_tissue_proportion,
+                mask_mode=mask_mode,
+                patch_order=patch_order,
+            )
+            self.save_config(
+                saveto=os.path.join(self.job_dir, config_saveto, '_config_coords.json'),
+                local_attrs=local_attrs,
+                ignore = ['segmentation_model', 'loop', 'valid_slides', 'wsis']
+            )
+
+        desc = f'Saving tissue coordinates to {saveto[0]}' if len(saveto) == 1 else f'Saving tissue coordinates to {len(saveto)} directories'
+        self._attach_tile_cache()
+        self.loop = tqdm(self.wsis, desc=desc, total = len(self.wsis))
+        for wsi in self.loop:
+            coords_paths = [os.path.join(self.job_dir, config_saveto, 'patches', f'{wsi.name}_patches.h5') for config_saveto in saveto]
+            log_paths = [os.path.join(self.job_dir, config_saveto, '_logs_coords.txt') for config_saveto in saveto]
+
+            # Check if patch coords already exist for every setting
+            todo = [i for i, coords_path in enumerate(coords_paths) if not os.path.exists(coords_path)]
+            for i in set(range(len(configs))) - set(todo):
+                update_log(log_paths[i], f'{wsi.name}{wsi.ext}', 'Coords generated')
+            if not todo:
                 self.loop.set_postfix_str(f'Patch coords already generated for {wsi.name}. Skipping...')
-                update_log(os.path.join(self.job_dir, saveto, '_logs_coords.txt'), f'{wsi.name}{wsi.ext}', 'Coords generated')
                 self.cleanup(f'{wsi.name}{wsi.ext}')
                 continue
-            
+
             # Check if another process has claimed this slide
-            if is_locked(os.path.join(self.job_dir, saveto, 'patches', f'{wsi.name}_patches.h5')):
+            todo = [i for i in todo if not is_locked(coords_paths[i])]
+            if not todo:
                 self.loop.set_postfix_str(f'{wsi.name} is locked. Skipping...')
                 continue
 
@@ -390,57 +608,74 @@ class Processor:
             if self.wsi_cache is not None:
                 if is_locked(os.path.join(self.wsi_cache, f'{wsi.name}{wsi.ext}')) or not os.path.exists(os.path.join(self.wsi_cache, f'{wsi.name}{wsi.ext}')):
                     self.loop.set_postfix_str(f'{wsi.name}{wsi.ext} not found in cache. Skipping...')
-                    update_log(os.path.join(self.job_dir, saveto, '_logs_coords.txt'), f'{wsi.name}{wsi.ext}', 'WSI not found in cache.')
+                    for i in todo:
+                        update_log(log_paths[i], f'{wsi.name}{wsi.ext}', 'WSI not found in cache.')
                     continue
                         
             # Check if segmentation exists
             if wsi.tissue_seg_path is None or not os.path.exists(wsi.tissue_seg_path):
                 self.loop.set_postfix_str(f'GeoJSON not found for {wsi.name}. Skipping...')
-                update_log(os.path.join(self.job_dir, saveto, '_logs_coords.txt'), f'{wsi.name}{wsi.ext}', 'GeoJSON not found.')
+                for i in todo:
+                    update_log(log_paths[i], f'{wsi.name}{wsi.ext}', 'GeoJSON not found.')
                 continue
             
             # Check if GeoJSON is empty
             gdf = gpd.read_file(wsi.tissue_seg_path, rows=1)
             if gdf.empty:
                 self.loop.set_postfix_str(f'Empty GeoDataFrame for {wsi.name}. Skipping...')
-                update_log(os.path.join(self.job_dir, saveto, '_logs_coords.txt'), f'{wsi.name}{wsi.ext}', 'Empty GeoDataFrame.')
+                for i in todo:
+                    update_log(log_paths[i], f'{wsi.name}{wsi.ext}', 'Empty GeoDataFrame.')
                 continue
 
-            try:
-                self.loop.set_postfix_str(f'Generating patch coords for {wsi.name}{wsi.ext}')
-                update_log(os.path.join(self.job_dir, saveto, '_logs_coords.txt'), f'{wsi.name}{wsi.ext}', 'LOCKED. Generating coords...')
-                create_lock(os.path.join(self.job_dir, saveto, 'patches', f'{wsi.name}_patches.h5'))
-
-                # save tissue coords
-                wsi.extract_tissue_coords(
-                    target_mag=target_magnification,
-                    patch_size=patch_size,
-                    save_coords=os.path.join(self.job_dir, saveto),
-                    overlap=overlap,
-                    min_tissue_proportion=min_tissue_proportion,
-                )
-
-                # save tissue coords visualization
-                if visualize:  
-                    wsi.visualize_coords(
-                        coords_path=os.path.join(self.job_dir, saveto, 'patches', f'{wsi.name}_patches.h5'),
-                        save_patch_viz=os.path.join(self.job_dir, save_patch_viz),
+            tissue_mask, failed = None, False
+            for i in todo:
+                target_magnification, patch_size, overlap, min_tissue_proportion = configs[i]
+                try:
+                    self.loop.set_postfix_str(f'Generating patch coords for {wsi.name}{wsi.ext}')
+                    update_log(log_paths[i], f'{wsi.name}{wsi.ext}', 'LOCKED. Generating coords...')
+                    create_lock(coords_paths[i])
+
+                    # Contours are loaded and prepared once, then shared by all settings
+                    if tissue_mask is None:
+                        wsi._lazy_initialize()
+                        tissue_mask = PreparedTissueMask(wsi.gdf_contours)
+
+                    # save tissue coords
+                    wsi.extract_tissue_coords(
+                        target_mag=target_magnification,
+                        patch_size=patch_size,
+                        save_coords=os.path.join(self.job_dir, saveto[i]),
+                        overlap=overlap,
+                        min_tissue_proportion=min_tissue_proportion,
+                        mask_mode=mask_mode,
+                        tissue_mask=tissue_mask,
+                        order=patch_order,
                     )
 
-                remove_lock(os.path.join(self.job_dir, saveto, 'patches', f'{wsi.name}_patches.h5'))
-                update_log(os.path.join(self.job_dir, saveto, '_logs_coords.txt'), f'{wsi.name}{wsi.ext}', 'Coords generated')
+                    # save tissue coords visualization
+                    if visualize:  
+                        wsi.visualize_coords(
+                            coords_path=coords_paths[i],
+                            save_patch_viz=os.path.join(self.job_dir, saveto[i], 'visualization'),
+                        )
+
+                    remove_lock(coords_paths[i])
+                    update_log(log_paths[i], f'{wsi.name}{wsi.ext}', 'Coords generated')
+                except Exception as e:
+                    if isinstance(e, KeyboardInterrupt):
+                        remove_lock(coords_paths[i])
+                    if self.skip_errors:
+                        update_log(log_paths[i], f'{wsi.name}{wsi.ext}', f'ERROR: {e}')
+                        failed = True
+                        continue
+                    else:
+                        raise e
+
+            if not failed:
                 self.cleanup(f'{wsi.name}{wsi.ext}')
-            except Exception as e:
-                if isinstance(e, KeyboardInterrupt):
-                    remove_lock(os.path.join(self.job_dir, saveto, 'patches', f'{wsi.name}_patches.h5'))
-                if self.skip_errors:
-                    update_log(os.path.join(self.job_dir, saveto, '_logs_coords.txt'), f'{wsi.name}{wsi.ext}', f'ERROR: {e}')
-                    continue
-                else:
-                    raise e
         
-        # Return the directory where the coordinates are saved
-        return os.path.join(self.job_dir, saveto)
+        # Return the directories where the coordinates are saved
+        return [os.path.join(self.job_dir, config_saveto) for config_saveto in saveto]
 
     @deprecated
     def run_feature_extraction_job(
@@ -468,7 +703,9 @@ class Processor:
         device: str, 
         saveas: str = 'h5', 
         batch_limit: int = 512, 
-        saveto: str | None = None
+        saveto: str | None = None,
+        region_size: Optional[int] = None,
+        batch_transforms: bool = False,
     ) -> str:
         """
         The `run_feature_extraction_job` function computes features from the patches generated during the 
@@ -489,6 +726,12 @@ class Processor:
             saveto (str, optional): 
                 Directory where the extracted features will be saved. If not provided, a directory name will 
                 be generated automatically. Defaults to None.
+            region_size (int, optional): 
+                Read the slides by regions of this size in pixels at the read level (e.g., 2048 or 4096), each 
+                cut into all the patches it contains, instead of patch by patch. Defaults to None.
+            batch_transforms (bool, optional): 
+                Load patches as uint8 tiles and apply the encoder transforms once per batch on `device`, 
+                instead of tile by tile in the loading workers. Defaults to False.
 
         Returns:
             str: The absolute path to where the features are saved.
@@ -519,7 +762,50 @@ class Processor:
         )
 
         log_fp = os.path.join(self.job_dir, coords_dir, f'_logs_feats_{patch_encoder.enc_name}.txt')
+        self._attach_tile_cache()
         self.loop = tqdm(self.wsis, desc=f'Extracting patch features from coords in {coords_dir}', total = len(self.wsis))
+        if self.persistent_readers:
+            self._stream_patch_feature_extraction(patch_encoder, coords_dir, device, saveas, batch_limit, saveto, region_size, batch_transforms, log_fp)
+            self.report_tile_cache()
+            return os.path.join(self.job_dir, saveto)
+
+        for wsi, coords_path, wsi_feats_fp in self._slides_to_extract(coords_dir, saveas, saveto, log_fp):
+            try:
+                self.loop.set_postfix_str(f'Extracting features from {wsi.name}{wsi.ext}')
+                create_lock(wsi_feats_fp)
+                update_log(log_fp, f'{wsi.name}{wsi.ext}', 'LOCKED. Extracting features...')
+
+                # under construction
+                wsi.extract_patch_features(
+                    patch_encoder = patch_encoder,
+                    coords_path = coords_path,
+                    save_features=os.path.join(self.job_dir, saveto),
+                    device=device,
+                    saveas=saveas,
+                    batch_limit=batch_limit,
+                    region_size=region_size,
+                    batch_transforms=batch_transforms,
+                )
+
+                remove_lock(wsi_feats_fp)
+                update_log(log_fp, f'{wsi.name}{wsi.ext}', 'Features extracted.')
+                self.cleanup(f'{wsi.name}{wsi.ext}')
+            except Exception as e:
+                if isinstance(e, KeyboardInterrupt):
+                    remove_lock(wsi_feats_fp)
+                if self.skip_errors:
+                    update_log(log_fp, f'{wsi.name}{wsi.ext}', f'ERROR: {e}')
+                    continue
+                else:
+                    raise e
+
+        self.report_tile_cache()
+        
+        # Return the directory where the features are saved
+        return os.path.join(self.job_dir, saveto)
+
+    def _slides_to_extract(self, coords_dir: str, saveas: str, saveto: str, log_fp: str) -> Iterator[Tuple[WSI, str, str]]:
+        """ Slides of `self.loop` whose patch features remain to be extracted, with their coords and features paths """
         for wsi in self.loop:    
             wsi_feats_fp = os.path.join(self.job_dir, saveto, f'{wsi.name}.{saveas}')
             # Check if features already exist
@@ -548,35 +834,69 @@ class Processor:
                 self.loop.set_postfix_str(f'{wsi.name} is locked. Skipping...')
                 continue
 
-            try:
-                self.loop.set_postfix_str(f'Extracting features from {wsi.name}{wsi.ext}')
-                create_lock(wsi_feats_fp)
-                update_log(log_fp, f'{wsi.name}{wsi.ext}', 'LOCKED. Extracting features...')
-
-                # under construction
-                wsi.extract_patch_features(
-                    patch_encoder = patch_encoder,
-                    coords_path = coords_path,
-                    save_features=os.path.join(self.job_dir, saveto),
-                    device=device,
-                    saveas=saveas,
-                    batch_limit=batch_limit
-                )
+            yield wsi, coords_path, wsi_feats_fp
 
+    def _stream_patch_feature_extraction(
+        self,
+        patch_encoder: torch.nn.Module,
+        coords_dir: str,
+        device: str,
+        saveas: str,
+        batch_limit: int,
+        saveto: str,
+        region_size: Optional[int],
+        batch_transforms: bool,
+        log_fp: str,
+    ) -> None:
+        """
+        `run_patch_feature_extraction_job` with the persistent reader pool: the patches of all the slides are read by
+        the same workers and streamed back continuously, so that the next slides are read while the current one is encoded.
+        """
+        pool = self.get_reader_pool(batch_limit)
+        patch_encoder.to(device)
+        patch_encoder.eval()
+        jobs = {}  # slide -> (features path, patcher, batched transform, coords, coords attributes, features)
+
+        def work_items():
+            for wsi, coords_path, wsi_feats_fp in self._slides_to_extract(coords_dir, saveas, saveto, log_fp):
+                try:
+                    self.loop.set_postfix_str(f'Extracting features from {wsi.name}{wsi.ext}')
+                    create_lock(wsi_feats_fp)
+                    update_log(log_fp, f'{wsi.name}{wsi.ext}', 'LOCKED. Extracting features...')
+                    wsi._lazy_initialize()
+                    dataset, batch_size, collate_fn, batch_transform, coords, coords_attrs = wsi._prepare_patch_features(
+                        patch_encoder, coords_path, batch_limit, region_size, batch_transforms
+                    )
+                except Exception as e:
+                    self._close_slide(wsi)
+                    self._slide_error(wsi, e, wsi_feats_fp, log_fp)
+                    continue
+                jobs[wsi] = (wsi_feats_fp, dataset.patcher, batch_transform, coords, coords_attrs, [])
+                yield wsi, dataset, batch_size, collate_fn
+
+        for wsi, batch in pool.stream(work_items()):
+            if wsi not in jobs:
+                continue  # failed slide
+            last = batch is None or isinstance(batch, Exception)  # no read of the slide left in flight
+            if jobs[wsi] is None:  # failed while read, closed once its reads are over
+                self._fail_slide(wsi, jobs, last)
+                continue
+            wsi_feats_fp, patcher, batch_transform, coords, coords_attrs, features = jobs[wsi]
+            try:
+                if isinstance(batch, Exception):
+                    raise batch
+                if batch is not None:
+                    features.append(wsi._encode_patch_batch(patch_encoder, batch[0], batch_transform, device))
+                    continue
+                del jobs[wsi]
+                wsi._save_patch_features(features, patcher, coords, coords_attrs, os.path.join(self.job_dir, saveto), saveas)
                 remove_lock(wsi_feats_fp)
                 update_log(log_fp, f'{wsi.name}{wsi.ext}', 'Features extracted.')
                 self.cleanup(f'{wsi.name}{wsi.ext}')
+                self._close_slide(wsi)
             except Exception as e:
-                if isinstance(e, KeyboardInterrupt):
-                    remove_lock(wsi_feats_fp)
-                if self.skip_errors:
-                    update_log(log_fp, f'{wsi.name}{wsi.ext}', f'ERROR: {e}')
-                    continue
-                else:
-                    raise e
-        
-        # Return the directory where the features are saved
-        return os.path.join(self.job_dir, saveto)
+                self._fail_slide(wsi, jobs, last)
+                self._slide_error(wsi, e, wsi_feats_fp, log_fp)
 
     def run_slide_feature_extraction_job(
         self,
@@ -666,6 +986,7 @@ class Processor:
             ignore=['loop', 'valid_slides', 'wsis']
         )
 
+        self._attach_tile_cache()
         self.loop = tqdm(self.wsis, desc=f'Extracting slide features using {slide_encoder.enc_name}', total=len(self.wsis))
         for wsi in self.loop:
             # Check if slide features already exist
@@ -722,6 +1043,88 @@ class Processor:
         
         return os.path.join(self.job_dir, saveto)
 
+    def get_reader_pool(self, batch_size: int) -> SlideReaderPool:
+        """
+        The `get_reader_pool` function returns the reader pool of the processor (with `persistent_readers=True`), 
+        starting it on first use. Its workers are then shared by all the slides of all the jobs, until `close`.
+
+        Parameters:
+            batch_size (int): 
+                Batch size of the job starting the pool, used to size the pool like a per-slide DataLoader.
+
+        Returns:
+            SlideReaderPool: The reader pool.
+        """
+        if self.reader_pool is None:
+            self.reader_pool = SlideReaderPool(
+                num_workers=get_num_workers(batch_size, max_workers=self.max_workers),
+                pin_memory=True,
+            )
+        return self.reader_pool
+
+    def close(self) -> None:
+        """
+        The `close` function stops the workers of the reader pool and releases the shared memory of the tile cache, 
+        if any. Both are created again by the next job.
+        """
+        if self.reader_pool is not None:
+            self.reader_pool.close()
+            self.reader_pool = None
+        if self.tile_cache is not None:
+            self.tile_cache.close()
+            self.tile_cache = None
+            for wsi in self.wsis:
+                wsi.tile_cache = None
+
+    def _attach_tile_cache(self) -> None:
+        """ Create the tile cache again after `close`, and share it with the slides """
+        if self.tile_cache_budget and self.tile_cache is None:
+            self.tile_cache = SharedTileCache(budget_bytes=self.tile_cache_budget)
+            for wsi in self.wsis:
+                wsi.tile_cache = self.tile_cache
+
+    @staticmethod
+    def _close_slide(wsi: WSI) -> None:
+        """ Release the handle and decoded data of a slide that is done, as `segment_tissue` and `extract_patch_features` do """
+        if hasattr(wsi, 'close'):
+            wsi.close()
+
+    def _fail_slide(self, wsi: WSI, jobs: Dict, last: bool) -> None:
+        """ Drop a slide of a reader pool job, closing it now if its reads are over, or once they are (marked None in `jobs`) """
+        if last:
+            jobs.pop(wsi, None)
+            self._close_slide(wsi)
+        else:
+            jobs[wsi] = None
+
+    def _slide_error(self, wsi: WSI, error: Exception, lock_fp: str, log_fp: str) -> None:
+        """ Log the error of a slide and move on if `skip_errors`, raise it otherwise """
+        if isinstance(error, KeyboardInterrupt):
+            remove_lock(lock_fp)
+        if self.skip_errors:
+            update_log(log_fp, f'{wsi.name}{wsi.ext}', f'ERROR: {error}')
+        else:
+            raise error
+
+    def report_tile_cache(self) -> Optional[Dict[str, int]]:
+        """
+        The `report_tile_cache` function prints the hit, miss and eviction counters of the shared tile cache, 
+        aggregated over all slides and DataLoader workers since the cache was created.
+
+        Returns:
+            Optional[Dict[str, int]]: The cache counters, or None if the processor has no tile cache.
+        """
+        if self.tile_cache is None:
+            return None
+        stats = self.tile_cache.stats()
+        lookups = stats['hits'] + stats['misses']
+        hit_rate = stats['hits'] / lookups if lookups > 0 else 0.
+        print(
+            f"Tile cache: {stats['hits']} hits, {stats['misses']} misses ({100 * hit_rate:.1f}% hit rate), "
+            f"{stats['evictions']} evictions, {stats['used_bytes'] / 1024**2:.0f}/{stats['budget_bytes'] / 1024**2:.0f} MB used."
+        )
+        return stats
+
     def cleanup(self, filename: str) -> None:
         """
         The `cleanup` function is responsible for deleting a specified slide from the local cache directory, 
@@ -3,9 +3,16 @@ __version__ = "0.1.1"
 from trident.wsi_objects.OpenSlideWSI import OpenSlideWSI
 from trident.wsi_objects.CuCIMWSI import CuCIMWSI
 from trident.wsi_objects.ImageWSI import ImageWSI
+from trident.wsi_objects.TiffFileWSI import TiffFileWSI
 from trident.wsi_objects.WSIFactory import load_wsi, WSIReaderType
-from trident.wsi_objects.WSIPatcher import OpenSlideWSIPatcher, WSIPatcher
+from trident.wsi_objects.WSIPatcher import OpenSlideWSIPatcher, WSIPatcher, PreparedTissueMask
 from trident.wsi_objects.WSIPatcherDataset import WSIPatcherDataset
+from trident.wsi_objects.PrefetchLoader import ThreadedPrefetchLoader
+from trident.wsi_objects.ReaderPool import SlideReaderPool
+from trident.patch_encoder_models.utils.transform_utils import BatchedTransform
+from trident.wsi_objects.TileCache import SharedTileCache
+from trident.wsi_objects.MetadataIndex import SlideMetadataIndex
+from trident.wsi_objects.RangeReader import BlockCache, RangeFile, HTTPRangeFile
 
 from trident.Visualization import visualize_heatmap
 
@@ -21,9 +28,19 @@ __all__ = [
     "OpenSlideWSI", 
     "ImageWSI",
     "CuCIMWSI",
+    "TiffFileWSI",
     "WSIPatcher",
     "OpenSlideWSIPatcher",
+    "PreparedTissueMask",
     "WSIPatcherDataset",
+    "ThreadedPrefetchLoader",
+    "SlideReaderPool",
+    "BatchedTransform",
+    "SharedTileCache",
+    "SlideMetadataIndex",
+    "BlockCache",
+    "RangeFile",
+    "HTTPRangeFile",
     "visualize_heatmap",
     "AnyToTiffConverter",
     "deprecated",
@@ -3,8 +3,9 @@ from abc import abstractmethod
 from typing import Literal, Optional
 import torch
 import os 
+from torchvision.transforms import InterpolationMode
 
-from trident.patch_encoder_models.utils.constants import get_constants
+from trident.patch_encoder_models.utils.constants import IMAGENET_MEAN, IMAGENET_STD, HIBOU_MEAN, HIBOU_STD, INCEPTION_MEAN, INCEPTION_STD, KAIKO_MEAN, KAIKO_STD
 from trident.patch_encoder_models.utils.transform_utils import get_eval_transforms
 from trident.IO import get_weights_path, has_internet_connection
 
@@ -110,6 +111,7 @@ def encoder_factory(model_name: str, **kwargs):
 class BasePatchEncoder(torch.nn.Module):
 
     _has_internet = has_internet_connection()
+    EVAL_TRANSFORMS_SPEC = None  # keyword arguments of `get_eval_transforms`, None if the model library builds the transforms
     
     def __init__(self, weights_path: Optional[str] = None, **build_kwargs):
         """
@@ -125,7 +127,7 @@ class BasePatchEncoder(torch.nn.Module):
             enc_name (Optional[str]): Name of the encoder architecture (set during `_build()`).
             weights_path (Optional[str]): Path to local model weights (if provided).
             model (nn.Module): The instantiated encoder model.
-            eval_transforms (Callable): Evaluation-time preprocessing transforms.
+            eval_transforms (Callable): Evaluation-time preprocessing transforms (built from `EVAL_TRANSFORMS_SPEC` when set).
             precision (torch.dtype): Precision used for inference.
         """
 
@@ -203,6 +205,7 @@ class CustomInferenceEncoder(BasePatchEncoder):
 
 
 class MuskInferenceEncoder(BasePatchEncoder):
+    EVAL_TRANSFORMS_SPEC = dict(mean=INCEPTION_MEAN, std=INCEPTION_STD, target_img_size=384, center_crop=True, interpolation=InterpolationMode.BICUBIC, antialias=True)
     
     def __init__(self, **build_kwargs):
         """
@@ -242,9 +245,7 @@ class MuskInferenceEncoder(BasePatchEncoder):
                 traceback.print_exc()
                 raise Exception("Failed to download MUSK model, make sure that you were granted access and that you correctly registered your token")
         
-        from timm.data.constants import IMAGENET_INCEPTION_MEAN, IMAGENET_INCEPTION_STD
-        from torchvision.transforms import InterpolationMode
-        eval_transform = get_eval_transforms(IMAGENET_INCEPTION_MEAN, IMAGENET_INCEPTION_STD, target_img_size = 384, center_crop = True, interpolation=InterpolationMode.BICUBIC, antialias=True)
+        eval_transform = get_eval_transforms(**self.EVAL_TRANSFORMS_SPEC)
         precision = torch.float16
         
         return model, eval_transform, precision
@@ -306,6 +307,7 @@ class Conchv1InferenceEncoder(BasePatchEncoder):
     
 
 class CTransPathInferenceEncoder(BasePatchEncoder):
+    EVAL_TRANSFORMS_SPEC = dict(mean=IMAGENET_MEAN, std=IMAGENET_STD, target_img_size=224, interpolation=InterpolationMode.BILINEAR, max_size=None, antialias=True)
 
     def __init__(self, **build_kwargs):
         """
@@ -314,7 +316,6 @@ class CTransPathInferenceEncoder(BasePatchEncoder):
         super().__init__(**build_kwargs)
 
     def _build(self):
-        from torchvision.transforms import InterpolationMode
         from torch import nn
 
         try:
@@ -356,8 +357,7 @@ class CTransPathInferenceEncoder(BasePatchEncoder):
         assert len(unexpected) == 0, f"Unexpected keys found in state dict: {unexpected}"
         assert missing == ['layers.0.blocks.1.attn_mask', 'layers.1.blocks.1.attn_mask', 'layers.2.blocks.1.attn_mask', 'layers.2.blocks.3.attn_mask', 'layers.2.blocks.5.attn_mask'], f"Unexpected missing keys: {missing}"
 
-        mean, std = get_constants('imagenet')
-        eval_transform = get_eval_transforms(mean, std, target_img_size=224, interpolation=InterpolationMode.BILINEAR, max_size=None, antialias=True)
+        eval_transform = get_eval_transforms(**self.EVAL_TRANSFORMS_SPEC)
 
         precision = torch.float32
         
@@ -365,6 +365,7 @@ class CTransPathInferenceEncoder(BasePatchEncoder):
 
 
 class PhikonInferenceEncoder(BasePatchEncoder):
+    EVAL_TRANSFORMS_SPEC = dict(mean=IMAGENET_MEAN, std=IMAGENET_STD, target_img_size=224, interpolation=InterpolationMode.BILINEAR, max_size=None, antialias=True)
 
     def __init__(self, **build_kwargs):
         """
@@ -374,7 +375,6 @@ class PhikonInferenceEncoder(BasePatchEncoder):
 
     def _build(self):
         from transformers import ViTModel
-        from torchvision.transforms import InterpolationMode
 
         self.enc_name = 'phikon'
         weights_path = self._get_weights_path()
@@ -397,8 +397,7 @@ class PhikonInferenceEncoder(BasePatchEncoder):
                 traceback.print_exc()
                 raise Exception("Failed to download Phikon model, make sure that you were granted access and that you correctly registered your token")
 
-        mean, std = get_constants('imagenet')
-        eval_transform = get_eval_transforms(mean, std, target_img_size=224, interpolation=InterpolationMode.BILINEAR, max_size=None, antialias=True)
+        eval_transform = get_eval_transforms(**self.EVAL_TRANSFORMS_SPEC)
         precision = torch.float32
         return model, eval_transform, precision
     
@@ -413,6 +412,7 @@ class PhikonInferenceEncoder(BasePatchEncoder):
     
 
 class HibouLInferenceEncoder(BasePatchEncoder):
+    EVAL_TRANSFORMS_SPEC = dict(mean=HIBOU_MEAN, std=HIBOU_STD, target_img_size=224, interpolation=InterpolationMode.BICUBIC, max_size=None, antialias=True)
 
     def __init__(self, **build_kwargs):
         """
@@ -422,7 +422,6 @@ class HibouLInferenceEncoder(BasePatchEncoder):
 
     def _build(self):
         from transformers import AutoModel
-        from torchvision.transforms import InterpolationMode
 
         self.enc_name = 'hibou_l'
         weights_path = self._get_weights_path()
@@ -437,8 +436,7 @@ class HibouLInferenceEncoder(BasePatchEncoder):
                 traceback.print_exc()
                 raise Exception("Failed to download Hibou-L model, make sure that you were granted access and that you correctly registered your token")
         
-        mean, std = get_constants('hibou')
-        eval_transform = get_eval_transforms(mean, std, target_img_size=224, interpolation=InterpolationMode.BICUBIC, max_size=None, antialias=True)
+        eval_transform = get_eval_transforms(**self.EVAL_TRANSFORMS_SPEC)
         precision = torch.float32
 
         return model, eval_transform, precision
@@ -457,6 +455,7 @@ class KaikoInferenceEncoder(BasePatchEncoder):
     MODEL_NAME = None  # set in subclasses
     HF_HUB_ID = None # set in subclasses
     IMG_SIZE = None
+    EVAL_TRANSFORMS_SPEC = dict(mean=KAIKO_MEAN, std=KAIKO_STD, target_img_size=224, center_crop=True, interpolation=InterpolationMode.BILINEAR, max_size=None, antialias=True)
 
     def __init__(self, **build_kwargs):
         """
@@ -466,7 +465,6 @@ class KaikoInferenceEncoder(BasePatchEncoder):
 
     def _build(self):
         import timm
-        from torchvision.transforms import InterpolationMode
         self.enc_name = f"kaiko-{self.MODEL_NAME}"
         weights_path = self._get_weights_path()
 
@@ -499,8 +497,7 @@ class KaikoInferenceEncoder(BasePatchEncoder):
                 traceback.print_exc()
                 raise Exception("Failed to download Kaiko model.")
 
-        mean, std = get_constants("kaiko")
-        eval_transform = get_eval_transforms(mean, std, target_img_size=224, center_crop=True, interpolation=InterpolationMode.BILINEAR, max_size=None, antialias=True)
+        eval_transform = get_eval_transforms(**self.EVAL_TRANSFORMS_SPEC)
         precision = torch.float32
 
         return model, eval_transform, precision
@@ -570,6 +567,7 @@ class KaikoL14InferenceEncoder(KaikoInferenceEncoder):
     
 
 class ResNet50InferenceEncoder(BasePatchEncoder):
+    EVAL_TRANSFORMS_SPEC = dict(mean=IMAGENET_MEAN, std=IMAGENET_STD, target_img_size=224, center_crop=True, interpolation=InterpolationMode.BILINEAR, max_size=None, antialias=True)
 
     def __init__(self, **build_kwargs):
         """
@@ -585,7 +583,6 @@ class ResNet50InferenceEncoder(BasePatchEncoder):
         pool=True
     ):
         import timm
-        from torchvision.transforms import InterpolationMode
 
         self.enc_name = 'resnet50'
         weights_path = self._get_weights_path()
@@ -608,8 +605,7 @@ class ResNet50InferenceEncoder(BasePatchEncoder):
                 traceback.print_exc()
                 raise Exception("Failed to download ResNet50 model.")
 
-        mean, std = get_constants('imagenet')
-        eval_transform = get_eval_transforms(mean, std, target_img_size=img_size, center_crop=True, interpolation=InterpolationMode.BILINEAR, max_size=None, antialias=True)
+        eval_transform = get_eval_transforms(**{**self.EVAL_TRANSFORMS_SPEC, 'target_img_size': img_size})
 
         precision = torch.float32
         if pool:
@@ -675,6 +671,7 @@ class LunitS8InferenceEncoder(BasePatchEncoder):
     
 
 class UNIInferenceEncoder(BasePatchEncoder):
+    EVAL_TRANSFORMS_SPEC = dict(mean=IMAGENET_MEAN, std=IMAGENET_STD, target_img_size=224, center_crop=True)
 
     def __init__(self, **build_kwargs):
         """
@@ -687,7 +684,6 @@ class UNIInferenceEncoder(BasePatchEncoder):
         timm_kwargs={"dynamic_img_size": True, "num_classes": 0, "init_values": 1e-5}
     ):
         import timm
-        from torchvision import transforms
 
         self.enc_name = 'uni_v1'
         weights_path = self._get_weights_path()
@@ -717,18 +713,14 @@ class UNIInferenceEncoder(BasePatchEncoder):
                 traceback.print_exc()
                 raise Exception("Failed to download UNI model, make sure that you were granted access and that you correctly registered your token")
 
-        eval_transform = transforms.Compose([
-            transforms.Resize(224),
-            transforms.CenterCrop(224),
-            transforms.ToTensor(),
-            transforms.Normalize(mean=(0.485, 0.456, 0.406), std=(0.229, 0.224, 0.225)),
-        ])
+        eval_transform = get_eval_transforms(**self.EVAL_TRANSFORMS_SPEC)
 
         precision = torch.float16
         return model, eval_transform, precision
     
 
 class UNIv2InferenceEncoder(BasePatchEncoder):
+    EVAL_TRANSFORMS_SPEC = dict(mean=IMAGENET_MEAN, std=IMAGENET_STD, target_img_size=224, center_crop=True)
 
     def __init__(self, **build_kwargs):
         """
@@ -738,7 +730,6 @@ class UNIv2InferenceEncoder(BasePatchEncoder):
 
     def _build(self):
         import timm
-        from torchvision import transforms
 
         self.enc_name = 'uni_v2'
         weights_path = self._get_weights_path()
@@ -777,18 +768,14 @@ class UNIv2InferenceEncoder(BasePatchEncoder):
                 traceback.print_exc()
                 raise Exception("Failed to download UNI v2 model, make sure that you were granted access and that you correctly registered your token")
 
-        eval_transform = transforms.Compose([
-            transforms.Resize(224),
-            transforms.CenterCrop(224),
-            transforms.ToTensor(),
-            transforms.Normalize(mean=(0.485, 0.456, 0.406), std=(0.229, 0.224, 0.225)),
-        ])
+        eval_transform = get_eval_transforms(**self.EVAL_TRANSFORMS_SPEC)
 
         precision = torch.bfloat16
         return model, eval_transform, precision
     
 
 class GigaPathInferenceEncoder(BasePatchEncoder):
+    EVAL_TRANSFORMS_SPEC = dict(mean=IMAGENET_MEAN, std=IMAGENET_STD, target_img_size=256, center_crop=True, crop_img_size=224, interpolation=InterpolationMode.BICUBIC)
 
     def __init__(self, **build_kwargs):
         """
@@ -801,7 +788,6 @@ class GigaPathInferenceEncoder(BasePatchEncoder):
     ):
         import timm
         assert timm.__version__ == '0.9.16', f"Gigapath requires timm version 0.9.16, but found {timm.__version__}. Please install the correct version using `pip install timm==0.9.16`"
-        from torchvision import transforms
 
         self.enc_name = 'gigapath'
         weights_path = self._get_weights_path()
@@ -834,21 +820,13 @@ class GigaPathInferenceEncoder(BasePatchEncoder):
                 traceback.print_exc()
                 raise Exception("Failed to download GigaPath model, make sure that you were granted access and that you correctly registered your token")
 
-        mean, std = get_constants('imagenet')
-        eval_transform = transforms.Compose(
-            [
-                transforms.Resize(256, interpolation=transforms.InterpolationMode.BICUBIC),
-                transforms.CenterCrop(224),
-                transforms.ToTensor(),
-                transforms.Normalize(mean, std),
-            ]
-        )
+        eval_transform = get_eval_transforms(**self.EVAL_TRANSFORMS_SPEC)
         precision = torch.float32
         return model, eval_transform, precision
 
     
 class VirchowInferenceEncoder(BasePatchEncoder):
-    import timm
+    EVAL_TRANSFORMS_SPEC = dict(mean=IMAGENET_MEAN, std=IMAGENET_STD, target_img_size=224, interpolation=InterpolationMode.BICUBIC)
     
     def __init__(self, **build_kwargs):
         """
@@ -859,11 +837,11 @@ class VirchowInferenceEncoder(BasePatchEncoder):
     def _build(
         self,
         return_cls=False,
-        timm_kwargs={'mlp_layer': timm.layers.SwiGLUPacked, 'act_layer': torch.nn.SiLU}
+        timm_kwargs=None
     ):
         import timm
-        import torchvision
-        from torchvision import transforms
+        if timm_kwargs is None:
+            timm_kwargs = {'mlp_layer': timm.layers.SwiGLUPacked, 'act_layer': torch.nn.SiLU}
 
         self.enc_name = 'virchow'
         weights_path = self._get_weights_path()
@@ -896,13 +874,7 @@ class VirchowInferenceEncoder(BasePatchEncoder):
                 traceback.print_exc()
                 raise Exception("Failed to download Virchow model, make sure that you were granted access and that you correctly registered your token")
 
-        eval_transform = transforms.Compose(
-            [
-                transforms.Resize(224, interpolation=torchvision.transforms.InterpolationMode.BICUBIC),
-                transforms.ToTensor(),
-                transforms.Normalize(mean=(0.485, 0.456, 0.406), std=(0.229, 0.224, 0.225)),
-            ]
-        )
+        eval_transform = get_eval_transforms(**self.EVAL_TRANSFORMS_SPEC)
         precision = torch.float16
         self.return_cls = return_cls
         
@@ -921,7 +893,7 @@ class VirchowInferenceEncoder(BasePatchEncoder):
 
 
 class Virchow2InferenceEncoder(BasePatchEncoder):
-    import timm
+    EVAL_TRANSFORMS_SPEC = dict(mean=IMAGENET_MEAN, std=IMAGENET_STD, target_img_size=224, interpolation=InterpolationMode.BICUBIC)
     
     def __init__(self, **build_kwargs):
         """
@@ -932,11 +904,11 @@ class Virchow2InferenceEncoder(BasePatchEncoder):
     def _build(
         self,
         return_cls=False,
-        timm_kwargs={'mlp_layer': timm.layers.SwiGLUPacked, 'act_layer': torch.nn.SiLU}
+        timm_kwargs=None
     ):
         import timm
-        import torchvision
-        from torchvision import transforms
+        if timm_kwargs is None:
+            timm_kwargs = {'mlp_layer': timm.layers.SwiGLUPacked, 'act_layer': torch.nn.SiLU}
 
         self.enc_name = 'virchow2'
         weights_path = self._get_weights_path()
@@ -970,13 +942,7 @@ class Virchow2InferenceEncoder(BasePatchEncoder):
                 traceback.print_exc()
                 raise Exception("Failed to download Virchow-2 model, make sure that you were granted access and that you correctly registered your token")
         
-        eval_transform = transforms.Compose(
-            [
-                transforms.Resize(224, interpolation=torchvision.transforms.InterpolationMode.BICUBIC),
-                transforms.ToTensor(),
-                transforms.Normalize(mean=(0.485, 0.456, 0.406), std=(0.229, 0.224, 0.225)),
-            ]
-        )
+        eval_transform = get_eval_transforms(**self.EVAL_TRANSFORMS_SPEC)
         precision = torch.float16
         self.return_cls = return_cls
         
@@ -995,6 +961,7 @@ class Virchow2InferenceEncoder(BasePatchEncoder):
 
 
 class HOptimus0InferenceEncoder(BasePatchEncoder):
+    EVAL_TRANSFORMS_SPEC = dict(mean=(0.707223, 0.578729, 0.703617), std=(0.211883, 0.230117, 0.177517), target_img_size=224)
 
     def __init__(self, **build_kwargs):
         """
@@ -1008,7 +975,6 @@ class HOptimus0InferenceEncoder(BasePatchEncoder):
     ):
         import timm
         assert timm.__version__ == '0.9.16', f"H-Optimus requires timm version 0.9.16, but found {timm.__version__}. Please install the correct version using `pip install timm==0.9.16`"
-        from torchvision import transforms
 
         self.enc_name = 'hoptimus0'
         weights_path = self._get_weights_path()
@@ -1038,20 +1004,14 @@ class HOptimus0InferenceEncoder(BasePatchEncoder):
                 traceback.print_exc()
                 raise Exception("Failed to download HOptimus-0 model, make sure that you were granted access and that you correctly registered your token")
 
-        eval_transform = transforms.Compose([
-            transforms.Resize(224),  
-            transforms.ToTensor(),
-            transforms.Normalize(
-                mean=(0.707223, 0.578729, 0.703617), 
-                std=(0.211883, 0.230117, 0.177517)
-            ),
-        ])
+        eval_transform = get_eval_transforms(**self.EVAL_TRANSFORMS_SPEC)
         
         precision = torch.float16
         return model, eval_transform, precision
 
 
 class HOptimus1InferenceEncoder(BasePatchEncoder):
+    EVAL_TRANSFORMS_SPEC = dict(mean=(0.707223, 0.578729, 0.703617), std=(0.211883, 0.230117, 0.177517), target_img_size=224)
 
     def __init__(self, **build_kwargs):
         """
@@ -1066,7 +1026,6 @@ class HOptimus1InferenceEncoder(BasePatchEncoder):
     ):
         import timm
         assert timm.__version__ == '0.9.16', f"H-Optimus requires timm version 0.9.16, but found {timm.__version__}. Please install the correct version using `pip install timm==0.9.16`"
-        from torchvision import transforms
 
         self.enc_name = 'hoptimus1'
         weights_path = self._get_weights_path()
@@ -1096,20 +1055,14 @@ class HOptimus1InferenceEncoder(BasePatchEncoder):
                 traceback.print_exc()
                 raise Exception("Failed to download HOptimus-1 model, make sure that you were granted access and that you correctly registered your token")
 
-        eval_transform = transforms.Compose([
-            transforms.Resize(224),  
-            transforms.ToTensor(),
-            transforms.Normalize(
-                mean=(0.707223, 0.578729, 0.703617), 
-                std=(0.211883, 0.230117, 0.177517)
-            ),
-        ])
+        eval_transform = get_eval_transforms(**self.EVAL_TRANSFORMS_SPEC)
         
         precision = torch.float16
         return model, eval_transform, precision
 
 
 class Phikonv2InferenceEncoder(BasePatchEncoder):
+    EVAL_TRANSFORMS_SPEC = dict(mean=IMAGENET_MEAN, std=IMAGENET_STD, target_img_size=224, center_crop=True)
 
     def __init__(self, **build_kwargs):
         """
@@ -1119,8 +1072,6 @@ class Phikonv2InferenceEncoder(BasePatchEncoder):
 
     def _build(self):
         from transformers import AutoModel
-        import torchvision.transforms as T
-        from .utils.constants import IMAGENET_MEAN, IMAGENET_STD
 
         self.enc_name = 'phikon_v2'
         weights_path = self._get_weights_path()
@@ -1143,12 +1094,7 @@ class Phikonv2InferenceEncoder(BasePatchEncoder):
                 traceback.print_exc()
                 raise Exception("Failed to download Phikon v2 model, make sure that you were granted access and that you correctly registered your token")
 
-        eval_transform = T.Compose([
-            T.Resize(224),  
-            T.CenterCrop(224),  
-            T.ToTensor(),
-            T.Normalize(mean=IMAGENET_MEAN, std=IMAGENET_STD)  # Normalize with specified mean and std
-        ])
+        eval_transform = get_eval_transforms(**self.EVAL_TRANSFORMS_SPEC)
 
         precision = torch.float32
         return model, eval_transform, precision
@@ -1160,6 +1106,7 @@ class Phikonv2InferenceEncoder(BasePatchEncoder):
 
 
 class Conchv15InferenceEncoder(BasePatchEncoder):
+    EVAL_TRANSFORMS_SPEC = dict(mean=IMAGENET_MEAN, std=IMAGENET_STD, target_img_size=448, center_crop=True, interpolation=InterpolationMode.BILINEAR)
 
     def __init__(self, **build_kwargs):
         """
@@ -1175,7 +1122,7 @@ class Conchv15InferenceEncoder(BasePatchEncoder):
 
         if weights_path:
             try:
-                model, eval_transform = create_model_from_pretrained(checkpoint_path=weights_path, img_size=img_size)
+                model, _ = create_model_from_pretrained(checkpoint_path=weights_path, img_size=img_size)
             except:
                 traceback.print_exc()
                 raise Exception(
@@ -1185,16 +1132,18 @@ class Conchv15InferenceEncoder(BasePatchEncoder):
         else:
             self.ensure_has_internet(self.enc_name)
             try:
-                model, eval_transform = create_model_from_pretrained(checkpoint_path="hf_hub:MahmoodLab/conchv1_5", img_size=img_size)
+                model, _ = create_model_from_pretrained(checkpoint_path="hf_hub:MahmoodLab/conchv1_5", img_size=img_size)
             except:
                 traceback.print_exc()
                 raise Exception("Failed to download CONCH v1.5 model, make sure that you were granted access and that you correctly registered your token")
 
+        eval_transform = get_eval_transforms(**{**self.EVAL_TRANSFORMS_SPEC, 'target_img_size': img_size})
         precision = torch.float16
         return model, eval_transform, precision
 
 
 class Midnight12kInferenceEncoder(BasePatchEncoder):
+    EVAL_TRANSFORMS_SPEC = dict(mean=KAIKO_MEAN, std=KAIKO_STD, target_img_size=224, center_crop=True)
 
     def __init__(self, **build_kwargs):
         """
@@ -1204,8 +1153,6 @@ class Midnight12kInferenceEncoder(BasePatchEncoder):
 
     def _build(self, return_type: Literal["cls_token", "cls+mean"] = "cls_token"):
         from transformers import AutoModel
-        from .utils.constants import KAIKO_MEAN, KAIKO_STD
-        from torchvision import transforms
 
         self.enc_name = "midnight12k"
         weights_path = self._get_weights_path()
@@ -1228,14 +1175,7 @@ class Midnight12kInferenceEncoder(BasePatchEncoder):
                 traceback.print_exc()
                 raise Exception("Failed to download Midnight-12k model")
 
-        eval_transform = transforms.Compose(
-            [
-                transforms.Resize(224),
-                transforms.CenterCrop(224),
-                transforms.ToTensor(),
-                transforms.Normalize(mean=KAIKO_MEAN, std=KAIKO_STD),
-            ]
-        )
+        eval_transform = get_eval_transforms(**self.EVAL_TRANSFORMS_SPEC)
 
         precision = torch.float32
         self.return_type = return_type
@@ -1,13 +1,19 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import torch
 from torchvision import transforms
+import torchvision.transforms.v2.functional as F
+
 
-def get_eval_transforms(mean, std, target_img_size = -1, center_crop = False, **resize_kwargs):
+def get_eval_transforms(mean, std, target_img_size = -1, center_crop = False, crop_img_size = None, **resize_kwargs):
     trsforms = []
     
     if target_img_size > 0:
         trsforms.append(transforms.Resize(target_img_size, **resize_kwargs))
     if center_crop:
         assert target_img_size > 0, "target_img_size must be set if center_crop is True"
-        trsforms.append(transforms.CenterCrop(target_img_size))
+        trsforms.append(transforms.CenterCrop(crop_img_size or target_img_size))
         
     
     trsforms.append(transforms.ToTensor())
@@ -15,4 +21,189 @@ def get_eval_transforms(mean, std, target_img_size = -1, center_crop = False, **
         trsforms.append(transforms.Normalize(mean, std))
     trsforms = transforms.Compose(trsforms)
 
-    return trsforms
\ No newline at end of file
+    return trsforms
+
+
+def compile_eval_transforms(mean, std, target_img_size = -1, center_crop = False, crop_img_size = None, **resize_kwargs):
+    """
+    Compile the transform spec of `get_eval_transforms` into a single fused operation on batches of
+    (B, H, W, 3) uint8 tiles: resize and center crop in uint8 (skipped when they do not change the tile size),
+    then conversion to float and normalization in one multiply-add.
+    """
+    return BatchedTransform(get_eval_transforms(mean, std, target_img_size, center_crop, crop_img_size, **resize_kwargs))
+
+
+class BatchedTransform:
+    """
+    Per-image torchvision evaluation transform (e.g., an encoder's `eval_transforms`) compiled into a single
+    fused operation on a whole batch of uint8 tiles, run in the consumer process and on the device of the batch.
+
+    Data loading workers then return the raw (B, H, W, 3) uint8 tiles, 4x fewer bytes than float32 tensors
+    through the DataLoader IPC, and skip the per-tile Python transforms. The transform is compiled once per
+    tile size into a plan:
+        - `Resize` and `CenterCrop` run on the uint8 tiles (as they do on PIL images), with the vectorized uint8
+          kernels of torchvision, and are dropped when they would not change the tile size (e.g., 224 -> 224).
+        - `ToTensor` and all the `Normalize` steps are fused into a single per-channel multiply-add on the batch.
+    With an `input_size`, tiles of any size stand for tiles of `input_size` (e.g., a `WSIPatcher(rescale=False)` sends
+    tiles as read, instead of rescaled to `patch_size`): their rescale is folded into the first `Resize`, so that tiles
+    are resampled once, from the read level straight to the encoder input size.
+
+    Example:
+    --------
+    >>> batch_transform = BatchedTransform(patch_encoder.eval_transforms)
+    >>> for tiles, coords in dataloader:  # WSIPatcherDataset(patcher, transform=None)
+    ...     features = patch_encoder(batch_transform(tiles.to('cuda')))
+    """
+
+    def __init__(self, transform: Callable, input_size: Optional[Sequence[int]] = None) -> None:
+        """
+        Args:
+            transform (Callable): `transforms.Compose` of `Resize` and `CenterCrop` steps, then `ToTensor`
+                (or timm's `MaybeToTensor`) and `Normalize` steps.
+            input_size (Sequence[int], optional): (height, width) of the tiles the transform expects. Tiles of another
+                size are resampled to it, in the same step as the first `Resize` of the transform if it has one
+                (bilinear otherwise). Defaults to None (tiles are transformed as they are).
+
+        Raises:
+            ValueError: If a step of the transform cannot run on batched tensors.
+        """
+        self.transform = transform
+        self.input_size = tuple(input_size) if input_size is not None else None
+        self.geometry, self.scale, self.shift = self._compile(transform)
+        self._plans: Dict[Tuple[int, int], List[Callable[[torch.Tensor], torch.Tensor]]] = {}
+        self._affine: Dict[torch.device, Tuple[torch.Tensor, torch.Tensor]] = {}
+
+    @classmethod
+    def supports(cls, transform: Callable) -> bool:
+        """ Whether `transform` can be applied to batches of uint8 tiles """
+        try:
+            cls._compile(transform)
+        except ValueError:
+            return False
+        return True
+
+    @staticmethod
+    def _flatten(transform: Callable) -> List[Any]:
+        if isinstance(transform, transforms.Compose):
+            return [step for sub in transform.transforms for step in BatchedTransform._flatten(sub)]
+        return [transform]
+
+    @staticmethod
+    def _compile(transform: Callable) -> Tuple[List[Any], torch.Tensor, torch.Tensor]:
+        """ Split the transform into its uint8 geometric steps and the (scale, shift) of the fused float conversion """
+        geometry, converted = [], False
+        scale, shift = torch.full((3,), 1 / 255, dtype=torch.float64), torch.zeros(3, dtype=torch.float64)
+        for step in BatchedTransform._flatten(transform):
+            if type(step).__name__ in ('ToTensor', 'MaybeToTensor'):
+                if converted:
+                    raise ValueError("The transform converts images to tensors twice.")
+                converted = True
+            elif isinstance(step, (transforms.Resize, transforms.CenterCrop)) and not converted:
+                if isinstance(step, transforms.Resize) and step.size is None:
+                    raise ValueError(f"Step {step} of the transform has no size.")
+                geometry.append(step)
+            elif getattr(step, '__name__', None) == '_convert_to_rgb':
+                continue  # open_clip's RGB conversion, tiles are RGB already
+            elif isinstance(step, transforms.Normalize) and converted:
+                mean = torch.as_tensor(step.mean, dtype=torch.float64).expand(3)
+                std = torch.as_tensor(step.std, dtype=torch.float64).expand(3)
+                scale, shift = scale / std, (shift - mean) / std
+            else:
+                raise ValueError(f"Step {step} of the transform cannot be applied to batched tensors.")
+        if not converted:
+            raise ValueError("The transform does not convert images to tensors (no ToTensor step).")
+        return geometry, scale.float().view(1, 3, 1, 1), shift.float().view(1, 3, 1, 1)
+
+    def output_size(self, size: Sequence[int]) -> Tuple[int, int]:
+        """ (height, width) of the tensors the transform makes from (height, width) tiles """
+        return self._plan_geometry(tuple(size))[1]
+
+    def _plan_geometry(self, size: Tuple[int, int]) -> Tuple[List[Callable[[torch.Tensor], torch.Tensor]], Tuple[int, int]]:
+        plan, geometry = [], self.geometry
+        if self.input_size is not None and size != self.input_size:
+            # Resample once from the tile size to the output size of the first resize (or to input_size)
+            if geometry and isinstance(geometry[0], transforms.Resize):
+                step, geometry = geometry[0], geometry[1:]
+                out = _resized_size(self.input_size, step.size, step.max_size)
+                interpolation, antialias = step.interpolation, step.antialias
+            else:
+                out, interpolation, antialias = self.input_size, transforms.InterpolationMode.BILINEAR, True
+            if out != size:
+                plan.append(_Resize(out, interpolation, antialias))
+            size = out
+        for step in geometry:
+            if isinstance(step, transforms.Resize):
+                out = _resized_size(size, step.size, step.max_size)
+                if out != size:
+                    plan.append(_Resize(out, step.interpolation, step.antialias))
+            else:
+                out = tuple(step.size)
+                if out != size:
+                    plan.append(_CenterCrop(out))
+            size = out
+        return plan, size
+
+    def plan(self, size: Sequence[int]) -> List[Callable[[torch.Tensor], torch.Tensor]]:
+        """ Compiled geometric steps for (height, width) tiles, without the no-op resizes and crops """
+        size = tuple(size)
+        if size not in self._plans:
+            self._plans[size] = self._plan_geometry(size)[0]
+        return self._plans[size]
+
+    def __call__(self, tiles: torch.Tensor) -> torch.Tensor:
+        """
+        Args:
+            tiles (torch.Tensor): (B, H, W, 3) uint8 batch of tiles.
+
+        Returns:
+            torch.Tensor: (B, 3, H', W') float32 batch, as `torch.stack([transform(tile) for tile in tiles])`.
+        """
+        x = tiles.permute(0, 3, 1, 2)
+        for step in self.plan(x.shape[-2:]):
+            x = step(x)
+        if x.device not in self._affine:
+            self._affine[x.device] = (self.scale.to(x.device), self.shift.to(x.device))
+        scale, shift = self._affine[x.device]
+        return x.float().mul_(scale).add_(shift)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.transform})"
+
+
+class _Resize:
+    """ Batched `Resize` of uint8 tiles to an exact (height, width) """
+
+    def __init__(self, size: Tuple[int, int], interpolation, antialias: Optional[bool]) -> None:
+        self.size, self.interpolation, self.antialias = list(size), interpolation, antialias
+
+    def __call__(self, x: torch.Tensor) -> torch.Tensor:
+        return F.resize(x, self.size, interpolation=self.interpolation, antialias=self.antialias)
+
+    def __repr__(self) -> str:
+        return f"Resize(size={self.size}, interpolation={self.interpolation.value}, antialias={self.antialias})"
+
+
+class _CenterCrop:
+    """ Batched `CenterCrop`, a view of the tiles unless it pads them """
+
+    def __init__(self, size: Tuple[int, int]) -> None:
+        self.size = list(size)
+
+    def __call__(self, x: torch.Tensor) -> torch.Tensor:
+        return F.center_crop(x, self.size)
+
+    def __repr__(self) -> str:
+        return f"CenterCrop(size={self.size})"
+
+
+def _resized_size(size: Tuple[int, int], target, max_size: Optional[int]) -> Tuple[int, int]:
+    """ (height, width) after `transforms.Resize(target, max_size=max_size)`, as computed by torchvision """
+    if isinstance(target, int) or len(target) == 1:
+        requested = target if isinstance(target, int) else target[0]
+        height, width = size
+        short, long = (width, height) if width <= height else (height, width)
+        new_short, new_long = requested, int(requested * long / short)
+        if max_size is not None and new_long > max_size:
+            new_short, new_long = int(max_size * new_short / new_long), max_size
+        return (new_long, new_short) if width <= height else (new_short, new_long)
+    return tuple(target)
@@ -1,14 +1,29 @@
 from __future__ import annotations
+import os
 import numpy as np
 from PIL import Image
 from typing import Tuple, Optional, Union
 
-from trident.wsi_objects.WSI import WSI, ReadMode
+from trident.wsi_objects.WSI import WSI, ReadMode, _drop_worker_handle
 
 
 class CuCIMWSI(WSI):
 
-    def __init__(self, **kwargs) -> None:
+    def __init__(self, num_read_workers: Optional[int] = None, **kwargs) -> None:
+        """
+        Initialize a WSI object read with CuCIM.
+
+        Parameters
+        ----------
+        num_read_workers : int, optional
+            Number of CuCIM threads reading the regions of a batch (`read_regions`). Defaults to
+            the number of CPUs available to the process, capped at 8.
+        **kwargs : dict
+            Additional keyword arguments passed to `WSI` (e.g., `slide_path`, `mpp`, `lazy_init`).
+        """
+        if num_read_workers is None:
+            num_read_workers = min(8, len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1))
+        self.num_read_workers = num_read_workers
         super().__init__(**kwargs)
 
     def _lazy_initialize(self) -> None:
@@ -23,7 +38,7 @@ class CuCIMWSI(WSI):
         Raises
         ------
         ImportError
-            If `cupy` and/or `cucim` are not installed.
+            If `cucim` is not installed.
         FileNotFoundError
             If the WSI file or required segmentation mask is missing.
         Exception
@@ -43,14 +58,13 @@ class CuCIMWSI(WSI):
         super()._lazy_initialize()
 
         try:
-            from cucim import CuImage
-            import cupy as cp
+            from cucim import CuImage  # regions are read on CPU: `cupy` is not required
         except ImportError as e:
             raise ImportError(
-                "Required dependencies not found: `cupy` and/or `cucim`.\n"
-                "Please install them with:\n"
+                "Required dependency not found: `cucim`.\n"
+                "Please install it with:\n"
                 "  pip install cucim cupy-cuda12x\n"
-                "Make sure `cupy-cuda12x` matches your local CUDA version.\n"
+                "Make sure `cupy-cuda12x` matches your local CUDA version (not needed for CPU-only reading).\n"
                 "Links:\n"
                 "  cucim: https://docs.rapids.ai/install/\n"
                 "  cupy: https://docs.cupy.dev/en/stable/install.html"
@@ -58,7 +72,7 @@ class CuCIMWSI(WSI):
 
         if not self.lazy_init:
             try:
-                self.img = CuImage(self.slide_path)
+                self.img = self._open_handle()
                 self.dimensions = (self.img.size()[1], self.img.size()[0])  # width, height are reverted compared to openslide!!
                 self.width, self.height = self.dimensions
                 self.level_count = self.img.resolutions['level_count']
@@ -69,10 +83,15 @@ class CuCIMWSI(WSI):
                     self.mpp = self._fetch_mpp(self.custom_mpp_keys)
                 self.mag = self._fetch_magnification(self.custom_mpp_keys)
                 self.lazy_init = True
+                self._record_metadata()
 
             except Exception as e:
                 raise RuntimeError(f"Failed to initialize WSI using CuCIM: {e}") from e
 
+    def _open_handle(self):
+        from cucim import CuImage
+        return CuImage(self.slide_path)
+
     def _fetch_mpp(self, custom_keys: dict = None) -> float:
         """
         Fetch the microns per pixel (MPP) from CuImage metadata.
@@ -233,18 +252,85 @@ class CuCIMWSI(WSI):
         >>> region.show()
         """
 
-        import cupy as cp
-
-        region = self.img.read_region(location=location, level=level, size=size, device='cpu')
-        region = cp.asnumpy(region)  # Convert from CuPy to NumPy
+        region = self._read_region_numpy(location, level, size)
 
         if read_as == 'numpy':
             return region
         elif read_as == 'pil':
-            return Image.fromarray(region).convert("RGB")
+            return Image.fromarray(region)
         else:
             raise ValueError(f"Invalid `read_as` value: {read_as}. Must be 'pil' or 'numpy'.")
-        
+
+    def _read_region_raw(self, location: Tuple[int, int], level: int, size: Tuple[int, int]) -> np.ndarray:
+        out = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        self._read_region_raw_into(location, level, size, out)
+        return out
+
+    def _read_region_raw_into(self, location: Tuple[int, int], level: int, size: Tuple[int, int], out: np.ndarray) -> None:
+        # CPU-resident CuImage regions expose the array interface: copy RGB without an intermediate array
+        region = self.img.read_region(location=(int(location[0]), int(location[1])), level=level, size=size, device='cpu')
+        out[...] = np.asarray(region)[:, :, :3]
+
+    def read_regions(
+        self,
+        coords: np.ndarray,
+        level: int,
+        size: Tuple[int, int],
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Read several regions of the same size and level into one (N, H, W, 3) uint8 array.
+
+        All locations are passed to a single CuCIM `read_region` call, which decodes them with
+        `num_read_workers` native threads and returns the whole batch as one (N, H, W, C) array,
+        copied into the output buffer through its array interface (no per-patch CuPy or PIL
+        conversion). Batches with locations outside of the slide are read region by region.
+
+        Parameters
+        ----------
+        coords : np.ndarray
+            (N, 2) array of (x, y) top-left coordinates in the level 0 reference frame.
+        level : int
+            Pyramid level to read from.
+        size : Tuple[int, int]
+            (width, height) of each region.
+        out : np.ndarray, optional
+            Preallocated uint8 array of shape (N, height, width, 3). Allocated if None.
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (N, height, width, 3) holding the RGB regions.
+        """
+        if self.tile_cache is not None:
+            return super().read_regions(coords, level, size, out)
+
+        coords = np.asarray(coords)
+        out = self._prepare_regions_buffer(len(coords), size, out)
+        if len(coords) < 2 or (coords < 0).any():
+            for i in range(len(coords)):
+                self._read_region_raw_into(coords[i], level, size, out[i])
+            return out
+
+        batches = self.img.read_region(
+            location=coords.astype(np.int64).tolist(),
+            size=size,
+            level=level,
+            num_workers=self.num_read_workers,
+            batch_size=len(coords),
+            device='cpu',
+        )
+        start = 0
+        for batch in batches:
+            regions = np.asarray(batch)
+            if regions.ndim == 3:  # batches of one region are not stacked
+                regions = regions[None]
+            out[start:start + len(regions)] = regions[..., :3]
+            start += len(regions)
+        if start != len(coords):
+            raise RuntimeError(f"CuCIM returned {start} regions for {len(coords)} locations.")
+        return out
+
     def get_dimensions(self) -> Tuple[int, int]:
         """
         Return the (width, height) dimensions of the CuCIM-managed WSI.
@@ -287,7 +373,10 @@ class CuCIMWSI(WSI):
         return out
 
     def close(self):
-        if self.img is not None:
-            self.img.close()
+        _drop_worker_handle(self)
+        if self._img is not None:
+            # A handle inherited through fork belongs to the parent: only drop the reference
+            if self._img_pid == os.getpid():
+                self._img.close()
             self.img = None
             self.lazy_init = False
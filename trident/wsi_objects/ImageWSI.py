@@ -1,14 +1,17 @@
 from __future__ import annotations
+import os
+import tempfile
 import numpy as np
 from PIL import Image
-from typing import Tuple, Union
+from typing import List, Tuple, Union, Optional
 
-from trident.wsi_objects.WSI import WSI, ReadMode
+from trident.wsi_objects.WSI import WSI, ReadMode, _drop_worker_handle
+from trident.wsi_objects.TiledImageStore import TiledImageStore
 
 
 class ImageWSI(WSI):
 
-    def __init__(self, **kwargs) -> None:
+    def __init__(self, use_memmap: bool = True, cache_dir: Optional[str] = None, **kwargs) -> None:
         """
         Initialize a WSI object from a standard image file (e.g., PNG, JPEG, etc.).
 
@@ -22,6 +25,16 @@ class ImageWSI(WSI):
             Optional name for the slide.
         lazy_init : bool, default=True
             Whether to defer initialization until the WSI is accessed.
+        use_memmap : bool, default=True
+            Whether to decode the image once into a tile-chunked, memory-mapped file under `cache_dir`.
+            Regions are then read from the memory map, shared by all DataLoader workers, and later runs
+            skip decoding. If False, the decoded image is held in RAM by each process.
+            The files hold the raw RGB pixels: 3 bytes per pixel (e.g., 30 GB for a 100k x 100k image),
+            plus about a third more for the downsampled levels built on first use. They are never
+            evicted: delete `cache_dir` when the slides are no longer processed.
+        cache_dir : str, optional
+            Directory of the memory-mapped files. Defaults to `<tmp>/trident_image_cache`, which is in
+            RAM where `/tmp` is a tmpfs: prefer a directory on disk (`Processor` uses `<job_dir>/_image_cache`).
 
         Raises
         ------
@@ -47,6 +60,8 @@ class ImageWSI(WSI):
         PngImagePlugin.MAX_TEXT_MEMORY = 2**30
         PngImagePlugin.MAX_IMAGE_PIXELS = None  # Optional: disables large image warning
 
+        self.use_memmap = use_memmap
+        self.cache_dir = cache_dir if cache_dir is not None else os.path.join(tempfile.gettempdir(), 'trident_image_cache')
         self.img = None
         super().__init__(**kwargs)
 
@@ -54,8 +69,10 @@ class ImageWSI(WSI):
         """
         Lazily initialize the WSI using a standard image file (e.g., JPEG, PNG, etc.).
 
-        This method loads the image using PIL and extracts relevant metadata such as
-        dimensions and magnification. It assumes a single-resolution image (no pyramid).
+        This method decodes the image using PIL into a tile-chunked store (memory-mapped if
+        `use_memmap`) and extracts relevant metadata such as dimensions and magnification.
+        The image has a single resolution: coarser levels are synthesized on first use (see
+        `get_synthetic_downsamples`).
         If a tissue segmentation mask is available, it is also loaded.
 
         Raises
@@ -70,9 +87,9 @@ class ImageWSI(WSI):
         After initialization, the following attributes are set:
         - `width` and `height`: dimensions of the image.
         - `dimensions`: (width, height) tuple of the image.
-        - `level_downsamples`: set to `[1]` (single resolution).
-        - `level_dimensions`: set to a list containing the image dimensions.
-        - `level_count`: set to `1`.
+        - `level_downsamples`: synthetic pyramid downsamples, e.g. `[1, 2, 4, 8]`.
+        - `level_dimensions`: image dimensions at each synthetic level.
+        - `level_count`: number of synthetic levels.
         - `mag`: estimated magnification level.
         - `gdf_contours`: loaded from `tissue_seg_path`, if available.
         """
@@ -82,21 +99,57 @@ class ImageWSI(WSI):
         if not self.lazy_init:
             try:
                 self._ensure_image_open()
-                self.level_downsamples = [1]
                 self.dimensions = (self.img.width, self.img.height)
                 self.width, self.height = self.dimensions[0], self.dimensions[1]
                 self.mag = self._fetch_magnification(self.custom_mpp_keys)
-                self.dimensions = self.img.size
-                self.level_dimensions = [(self.img.width, self.img.height)]
-                self.level_count = 1
+                self.level_downsamples = self.get_synthetic_downsamples(self.width, self.height)
+                self.level_dimensions = [(self.width // ds, self.height // ds) for ds in self.level_downsamples]
+                self.level_count = len(self.level_downsamples)
                 self.lazy_init = True
+                self._record_metadata()
 
             except Exception as e:
                 raise Exception(f"Error initializing WSI with PIL.Image: {e}")
 
     def _ensure_image_open(self):
         if self.img is None:
-            self.img = Image.open(self.slide_path).convert("RGB")
+            self.img = self._open_handle()
+
+    def _open_handle(self) -> TiledImageStore:
+        return TiledImageStore.from_image(self.slide_path, cache_dir=self.cache_dir if self.use_memmap else None)
+
+    @staticmethod
+    def get_synthetic_downsamples(width: int, height: int, min_size: int = 512) -> List[int]:
+        """
+        Downsamples of the synthetic pyramid reported for a single-resolution image.
+
+        Powers of two are added while the longest side of the level stays above `min_size`.
+        The levels are area-resampled from level 0 lazily, the first time they are read.
+
+        Parameters
+        ----------
+        width, height : int
+            Dimensions of the image.
+        min_size : int, default=512
+            Minimum longest side of the coarsest level.
+
+        Returns
+        -------
+        List[int]
+            Downsample of each level, starting with 1.
+        """
+        downsamples = [1]
+        while max(width, height) // (downsamples[-1] * 2) >= min_size:
+            downsamples.append(downsamples[-1] * 2)
+        return downsamples
+
+    def create_patcher(self, *args, **kwargs):
+        patcher = super().create_patcher(*args, **kwargs)
+        if not patcher.coords_only:
+            # Build the level once here, rather than concurrently in every DataLoader worker.
+            self._ensure_image_open()
+            self.img.level(self.level_downsamples[patcher.level])
+        return patcher
 
     def get_dimensions(self):
         return self.dimensions
@@ -116,9 +169,12 @@ class ImageWSI(WSI):
             RGB thumbnail image.
         """
         self._ensure_image_open()
-        img = self.img.copy()
-        img.thumbnail(size)
-        return img
+        # Same size as `PIL.Image.thumbnail`: fit within `size`, keep the aspect ratio, never upscale.
+        scale = min(size[0] / self.width, size[1] / self.height, 1)
+        thumb_size = (max(int(round(self.width * scale)), 1), max(int(round(self.height * scale)), 1))
+        # Resample from the coarsest synthetic level that is still larger than the thumbnail
+        downsample = max(ds for ds in self.level_downsamples if ds <= 1 / scale)
+        return Image.fromarray(self.img.level(downsample).resize_area(thumb_size))
 
     def read_region(
         self,
@@ -135,7 +191,7 @@ class ImageWSI(WSI):
         location : Tuple[int, int]
             (x, y) coordinates of the top-left corner of the region to extract.
         level : int
-            Pyramid level to read from. Only level 0 is supported for non-pyramidal images.
+            Level of the synthetic pyramid to read from.
         size : Tuple[int, int]
             (width, height) of the region to extract.
         read_as : {'pil', 'numpy'}, optional
@@ -151,7 +207,7 @@ class ImageWSI(WSI):
         Raises
         ------
         ValueError
-            If `level` is not 0 or if `read_as` is not one of the supported options.
+            If `read_as` is not one of the supported options.
 
         Example
         -------
@@ -159,24 +215,62 @@ class ImageWSI(WSI):
         >>> print(region.shape)
         (512, 512, 3)
         """
-        if level != 0:
-            raise ValueError("ImageWSI only supports reading at level=0 (no pyramid levels).")
-
-        self._ensure_image_open()
-        region = self.img.crop((
-            location[0],
-            location[1],
-            location[0] + size[0],
-            location[1] + size[1]
-        )).convert('RGB')
+        region = self._read_region_numpy(location, level, size)
 
         if read_as == 'pil':
-            return region
+            return Image.fromarray(region)
         elif read_as == 'numpy':
-            return np.array(region)
+            return region
         else:
             raise ValueError(f"Invalid `read_as` value: {read_as}. Must be 'pil' or 'numpy'.")
 
+    def _read_region_raw(self, location: Tuple[int, int], level: int, size: Tuple[int, int]) -> np.ndarray:
+        out = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        self._read_region_raw_into(location, level, size, out)
+        return out
+
+    def _read_region_raw_into(self, location: Tuple[int, int], level: int, size: Tuple[int, int], out: np.ndarray) -> None:
+        self._ensure_image_open()
+        downsample = self.level_downsamples[level]
+        self.img.level(downsample).read_into(int(location[0]) // downsample, int(location[1]) // downsample, out)
+
+    def read_regions(
+        self,
+        coords: np.ndarray,
+        level: int,
+        size: Tuple[int, int],
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Read several regions of the same size into one (N, H, W, 3) uint8 array.
+
+        Crops are copied from the chunks of the decoded RGB image directly into the output buffer.
+
+        Parameters
+        ----------
+        coords : np.ndarray
+            (N, 2) array of (x, y) top-left coordinates.
+        level : int
+            Level of the synthetic pyramid to read from.
+        size : Tuple[int, int]
+            (width, height) of each region.
+        out : np.ndarray, optional
+            Preallocated uint8 array of shape (N, height, width, 3). Allocated if None.
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (N, height, width, 3) holding the RGB regions.
+        """
+        if self.tile_cache is not None:
+            return super().read_regions(coords, level, size, out)
+
+        coords = np.asarray(coords)
+        out = self._prepare_regions_buffer(len(coords), size, out)
+        for i in range(len(coords)):
+            self._read_region_raw_into(coords[i], level, size, out[i])
+        return out
+
     def segment_tissue(self, **kwargs):
         out = super().segment_tissue(**kwargs)
         self.close()
@@ -204,8 +298,8 @@ class ImageWSI(WSI):
 
     def close(self):
         """
-        Close the internal image object to free memory. These can take several GB in RAM.
+        Release the decoded image chunks (in-memory copy or memory map). These can take several GB in RAM.
         """
-        if self.img is not None:
-            self.img.close()
+        _drop_worker_handle(self)
+        if self._img is not None:
             self.img = None
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from typing import Any, Dict, Optional
+
+
+class SlideMetadataIndex:
+    """
+    Persistent index of slide metadata (dimensions, pyramid, mpp, magnification and backend
+    properties) stored in a SQLite file, typically in the job directory.
+
+    Entries are keyed on the slide path, file size and modification time, so a modified or
+    replaced slide is re-read. WSI objects given an index restore their metadata from it
+    instead of opening the slide; the backend handle is then opened on the first pixel read.
+
+    Example:
+    --------
+    >>> index = SlideMetadataIndex("results/_metadata_index.sqlite")
+    >>> wsi = load_wsi("slide.svs", metadata_index=index, lazy_init=False)  # opens the slide once, then never again
+    """
+
+    def __init__(self, db_path: str) -> None:
+        """
+        Args:
+            db_path (str): Path to the SQLite file. Created (with its parent directory) if missing.
+        """
+        self.db_path = db_path
+        self._conn = None
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS slides ("
+                " slide_path TEXT NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+                " backend TEXT NOT NULL, options TEXT NOT NULL, metadata TEXT NOT NULL,"
+                " PRIMARY KEY (slide_path, size, mtime_ns, backend, options))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # Several processes (e.g., concurrent Processor jobs) may share the index.
+            self._conn = sqlite3.connect(self.db_path, timeout=60)
+            try:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.OperationalError:  # e.g., filesystems without shared memory support
+                pass
+        return self._conn
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {'db_path': self.db_path, '_conn': None}
+
+    @staticmethod
+    def _key(slide_path: str, backend: str, options: Dict[str, Any]) -> tuple:
+        stat = os.stat(slide_path)
+        return (os.path.abspath(slide_path), stat.st_size, stat.st_mtime_ns, backend, json.dumps(options, sort_keys=True))
+
+    def get(self, slide_path: str, backend: str, options: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Return the metadata stored for a slide, or None if the slide is not indexed or changed on disk.
+
+        Args:
+            slide_path (str): Path to the slide.
+            backend (str): Name of the WSI backend class (metadata differs across readers).
+            options (Dict[str, Any]): Reader options affecting the metadata (e.g., MPP override).
+
+        Returns:
+            Optional[Dict[str, Any]]: The stored metadata.
+        """
+        try:
+            key = self._key(slide_path, backend, options)
+        except OSError:  # missing slide: let the backend report it when opening
+            return None
+        row = self._connect().execute(
+            "SELECT metadata FROM slides WHERE slide_path=? AND size=? AND mtime_ns=? AND backend=? AND options=?", key
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put(self, slide_path: str, backend: str, options: Dict[str, Any], metadata: Dict[str, Any]) -> None:
+        """
+        Store (or replace) the metadata of a slide. Values must be JSON serializable.
+        """
+        try:
+            key = self._key(slide_path, backend, options)
+        except OSError:  # e.g., remote slide: nothing to key the entry on
+            return
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO slides VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, json.dumps(metadata, default=str)),
+            )
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM slides").fetchone()[0]
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __repr__(self) -> str:
+        return f"<SlideMetadataIndex db_path={self.db_path}>"
@@ -1,20 +1,31 @@
 from __future__ import annotations
+import sys
+from ctypes import POINTER, c_uint32
+import cv2
 import numpy as np
 import openslide
+from openslide import lowlevel
 from PIL import Image
 from typing import List, Tuple, Union, Optional
 
 from trident.wsi_objects.WSI import WSI, ReadMode
+from trident.wsi_objects.RegionCoalescing import plan_coalesced_reads
+
+# `_read_argb` calls the private ctypes binding of openslide-python (checked with 1.4.6)
+_HAS_LOWLEVEL_READ = hasattr(lowlevel, '_read_region')
 
 
 class OpenSlideWSI(WSI):
 
-    def __init__(self, **kwargs) -> None:
+    def __init__(self, coalesce_reads: bool = True, **kwargs) -> None:
         """
         Initialize an OpenSlideWSI instance.
 
         Parameters
         ----------
+        coalesce_reads : bool, default=True
+            Whether `read_regions` merges neighbouring regions into reads aligned to the native
+            tile grid, so that each tile is decoded once per batch rather than once per patch.
         **kwargs : dict
             Keyword arguments forwarded to the base `WSI` class. Most important key is:
             - slide_path (str): Path to the WSI.
@@ -28,6 +39,7 @@ class OpenSlideWSI(WSI):
         >>> print(wsi)
         <width=100000, height=80000, backend=OpenSlideWSI, mpp=0.25, mag=40>
         """
+        self.coalesce_reads = coalesce_reads
         super().__init__(**kwargs)
 
     def _lazy_initialize(self) -> None:
@@ -63,9 +75,9 @@ class OpenSlideWSI(WSI):
 
         if not self.lazy_init:
             try:
-                self.img = openslide.OpenSlide(self.slide_path)
+                self.img = self._open_handle()
                 # set openslide attrs as self
-                self.dimensions = self.get_dimensions()
+                self.dimensions = self.img.dimensions
                 self.width, self.height = self.dimensions
                 self.level_count = self.img.level_count
                 self.level_downsamples = self.img.level_downsamples
@@ -75,10 +87,14 @@ class OpenSlideWSI(WSI):
                     self.mpp = self._fetch_mpp(self.custom_mpp_keys)
                 self.mag = self._fetch_magnification(self.custom_mpp_keys)
                 self.lazy_init = True
+                self._record_metadata()
 
             except Exception as e:
                 raise RuntimeError(f"Failed to initialize WSI with OpenSlide: {e}") from e
 
+    def _open_handle(self) -> openslide.OpenSlide:
+        return openslide.OpenSlide(self.slide_path)
+
     def _fetch_mpp(self, custom_mpp_keys: Optional[List[str]] = None) -> float:
         """
         Retrieve microns per pixel (MPP) from OpenSlide metadata.
@@ -210,15 +226,143 @@ class OpenSlideWSI(WSI):
         >>> print(region.shape)
         (512, 512, 3)
         """
-        region = self.img.read_region(location, level, size).convert('RGB')
+        region = self._read_region_numpy(location, level, size)
 
         if read_as == 'pil':
-            return region
+            return Image.fromarray(region)
         elif read_as == 'numpy':
-            return np.array(region)
+            return region
         else:
             raise ValueError(f"Invalid `read_as` value: {read_as}. Must be 'pil', 'numpy'.")
 
+    def _read_region_raw(self, location: Tuple[int, int], level: int, size: Tuple[int, int]) -> np.ndarray:
+        out = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        self._read_region_raw_into(location, level, size, out)
+        return out
+
+    def _read_region_raw_into(self, location: Tuple[int, int], level: int, size: Tuple[int, int], out: np.ndarray) -> None:
+        self._argb_to_rgb(self._read_argb(location, level, size), out)
+
+    def _read_argb(self, location: Tuple[int, int], level: int, size: Tuple[int, int]) -> np.ndarray:
+        """
+        Read a region as OpenSlide's premultiplied ARGB pixels, without going through PIL.
+
+        This relies on openslide-python internals, `OpenSlide._osr` and `openslide.lowlevel._read_region`
+        (checked with openslide-python 1.4.6). Without them, reads go through the public `read_region`.
+
+        Returns
+        -------
+        np.ndarray
+            (height, width, 4) uint8 array of premultiplied pixels, in native byte order.
+        """
+        width, height = size
+        osr = getattr(self.img, '_osr', None)
+        if sys.byteorder != 'little' or osr is None or not _HAS_LOWLEVEL_READ or width == 0 or height == 0:
+            # Fallback on the public API (e.g., ImageSlide handles, other openslide-python releases or big-endian hosts):
+            # already un-premultiplied.
+            rgba = np.asarray(self.img.read_region((int(location[0]), int(location[1])), level, size))
+            bgra = np.ascontiguousarray(rgba[:, :, [2, 1, 0, 3]])
+            bgra[:, :, 3] = 255
+            return bgra
+        argb = np.empty((height, width), dtype=np.uint32)
+        lowlevel._read_region(
+            osr, argb.ctypes.data_as(POINTER(c_uint32)),
+            int(location[0]), int(location[1]), level, width, height
+        )
+        return argb.view(np.uint8).reshape(height, width, 4)  # B, G, R, A on little-endian hosts
+
+    @staticmethod
+    def _argb_to_rgb(bgra: np.ndarray, out: np.ndarray) -> None:
+        """
+        Write the RGB channels of premultiplied BGRA pixels into `out`, dropping alpha. Pixels that
+        are not fully opaque are un-premultiplied, matching OpenSlide's own RGBA conversion.
+        """
+        if out.flags.c_contiguous:
+            cv2.cvtColor(bgra, cv2.COLOR_BGRA2RGB, dst=out)
+        else:
+            out[...] = cv2.cvtColor(bgra, cv2.COLOR_BGRA2RGB)
+        if bgra.view(np.uint32).min() < 0xFF000000:  # some pixels are not fully opaque
+            alpha = bgra[:, :, 3]
+            translucent = alpha != 255
+            a = alpha[translucent].astype(np.uint32)[:, None]
+            rgb = out[translucent].astype(np.uint32)
+            out[translucent] = np.where(a > 0, rgb * 255 // np.maximum(a, 1), 0).astype(np.uint8)
+
+    def read_regions(
+        self,
+        coords: np.ndarray,
+        level: int,
+        size: Tuple[int, int],
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Read several regions of the same size and level into one (N, H, W, 3) uint8 array.
+
+        The ARGB pixels decoded by OpenSlide are converted straight into the output buffer
+        (see `read_region_into`), skipping the per-region PIL `convert('RGB')` round trip.
+        If `coalesce_reads` is enabled and the level is tiled, neighbouring regions are grouped
+        into super-regions aligned to the native tile grid, each read once and sliced into the
+        output, so shared tiles (e.g., with overlapping patches) are decoded only once.
+
+        Parameters
+        ----------
+        coords : np.ndarray
+            (N, 2) array of (x, y) top-left coordinates in the level 0 reference frame.
+        level : int
+            Pyramid level to read from.
+        size : Tuple[int, int]
+            (width, height) of each region.
+        out : np.ndarray, optional
+            Preallocated uint8 array of shape (N, height, width, 3). Allocated if None.
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (N, height, width, 3) holding the RGB regions.
+        """
+        if self.tile_cache is not None:
+            return super().read_regions(coords, level, size, out)
+
+        coords = np.asarray(coords)
+        out = self._prepare_regions_buffer(len(coords), size, out)
+
+        tile_size = self.get_tile_size(level) if self.coalesce_reads and len(coords) > 1 else None
+        if tile_size is not None:
+            super_regions, single = plan_coalesced_reads(coords, self.level_downsamples[level], size, tile_size)
+        else:
+            super_regions, single = [], range(len(coords))
+
+        downsample = int(round(self.level_downsamples[level]))
+        for (x0, y0), region_size, members in super_regions:
+            region = self._read_argb((x0 * downsample, y0 * downsample), level, region_size)
+            for i in members:
+                dx, dy = int(coords[i][0]) // downsample - x0, int(coords[i][1]) // downsample - y0
+                self._argb_to_rgb(region[dy:dy + size[1], dx:dx + size[0]], out[i])
+
+        for i in single:
+            self._read_region_raw_into(coords[i], level, size, out[i])
+        return out
+
+    def get_tile_size(self, level: int) -> Optional[Tuple[int, int]]:
+        """
+        Return the (width, height) of the native tiles at a given level.
+
+        Parameters
+        ----------
+        level : int
+            Pyramid level.
+
+        Returns
+        -------
+        Optional[Tuple[int, int]]
+            Native tile size, or None if the level is not tiled (or the backend does not report it).
+        """
+        tile_width = self.properties.get(f'openslide.level[{level}].tile-width')
+        tile_height = self.properties.get(f'openslide.level[{level}].tile-height')
+        if tile_width is None or tile_height is None:
+            return None
+        return int(tile_width), int(tile_height)
+
     def get_dimensions(self) -> Tuple[int, int]:
         """
         Return the dimensions (width, height) of the WSI.
@@ -228,7 +372,7 @@ class OpenSlideWSI(WSI):
         tuple of int
             (width, height) in pixels.
         """
-        return self.img.dimensions
+        return self.dimensions
 
     def get_thumbnail(self, size: tuple[int, int]) -> Image.Image:
         """
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import math
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, List, Optional
+import torch
+from torch.utils.data import DataLoader, Dataset
+from torch.utils.data._utils.collate import default_collate
+from torch.utils.data._utils.pin_memory import pin_memory as _pin_memory
+
+
+class ThreadedPrefetchLoader:
+    """
+    Batch iterator reading the next `prefetch_batches` batches of a dataset in background threads,
+    while the current batch is being consumed (e.g., by a model on GPU).
+
+    It replaces a DataLoader without worker processes (`num_workers=0`), where reading is otherwise
+    synchronous with inference. Slide readers decode tiles outside of the GIL (OpenSlide, tifffile
+    codecs, memory-mapped copies), so threads overlap I/O and compute without multiprocessing.
+    Batches are yielded in order, and built with `__getitems__` (batched reads) when the dataset has it.
+
+    Example:
+    --------
+    >>> loader = ThreadedPrefetchLoader(WSIPatcherDataset(patcher, transform), batch_size=64, prefetch_batches=4)
+    >>> for imgs, (xs, ys) in loader:
+    ...     features = model(imgs.to('cuda'))
+    """
+
+    def __init__(
+        self,
+        dataset: Dataset,
+        batch_size: int = 1,
+        prefetch_batches: int = 2,
+        num_threads: Optional[int] = None,
+        collate_fn: Callable[[List[Any]], Any] = default_collate,
+        pin_memory: bool = False,
+    ) -> None:
+        """
+        Args:
+            dataset (Dataset): Map-style dataset to read.
+            batch_size (int): Number of samples per batch. Defaults to 1.
+            prefetch_batches (int): Number of batches read ahead of the consumer. Defaults to 2.
+            num_threads (int, optional): Number of reading threads. Defaults to `prefetch_batches`, capped by the CPU count.
+            collate_fn (Callable): Merges a list of samples into a batch. Defaults to PyTorch's `default_collate`.
+            pin_memory (bool): Copy batches into page-locked memory (if CUDA is available), in the reading threads. Defaults to False.
+        """
+        if batch_size < 1 or prefetch_batches < 1:
+            raise ValueError(f"batch_size and prefetch_batches must be positive, got {batch_size} and {prefetch_batches}.")
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.prefetch_batches = prefetch_batches
+        self.num_threads = num_threads or max(1, min(prefetch_batches, os.cpu_count() or 1))
+        self.collate_fn = collate_fn
+        self.pin_memory = pin_memory and torch.cuda.is_available()
+
+    def __len__(self) -> int:
+        return math.ceil(len(self.dataset) / self.batch_size)
+
+    def _load(self, indices: List[int]) -> Any:
+        if hasattr(self.dataset, '__getitems__'):
+            samples = self.dataset.__getitems__(indices)
+        else:
+            samples = [self.dataset[i] for i in indices]
+        batch = self.collate_fn(samples)
+        return _pin_memory(batch) if self.pin_memory else batch
+
+    def __iter__(self) -> Iterator[Any]:
+        n = len(self.dataset)
+        batches = (list(range(start, min(start + self.batch_size, n))) for start in range(0, n, self.batch_size))
+        pool = ThreadPoolExecutor(self.num_threads, thread_name_prefix='trident-prefetch')
+        pending = deque()
+        try:
+            for indices in batches:
+                pending.append(pool.submit(self._load, indices))
+                if len(pending) > self.prefetch_batches:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # Consumer stopped early (or a read failed): drop the batches that were not started
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=True)
+
+
+def make_patch_dataloader(
+    dataset: Dataset,
+    batch_size: int,
+    num_workers: int,
+    pin_memory: bool = False,
+    prefetch_batches: int = 2,
+    collate_fn: Optional[Callable[[List[Any]], Any]] = None,
+):
+    """
+    Build the loader of a patch dataset: a `DataLoader` with `num_workers` worker processes, or a
+    `ThreadedPrefetchLoader` when `num_workers` is 0 so that reading still overlaps with inference.
+
+    Args:
+        dataset (Dataset): Patch dataset (e.g., `WSIPatcherDataset`).
+        batch_size (int): Number of patches per batch.
+        num_workers (int): Number of DataLoader worker processes (see `get_num_workers`).
+        pin_memory (bool): Return batches in page-locked memory. Defaults to False.
+        prefetch_batches (int): Number of batches read ahead by threads when `num_workers` is 0. Defaults to 2.
+        collate_fn (Callable, optional): Merges a list of samples into a batch (e.g., `collate_regions`). Defaults to None (PyTorch's `default_collate`).
+
+    Returns:
+        Union[DataLoader, ThreadedPrefetchLoader]: iterable over (imgs, coords) batches.
+    """
+    collate_fn = collate_fn or default_collate
+    if num_workers > 0:
+        return DataLoader(dataset, batch_size=batch_size, num_workers=num_workers, pin_memory=pin_memory, collate_fn=collate_fn)
+    return ThreadedPrefetchLoader(dataset, batch_size=batch_size, prefetch_batches=prefetch_batches, pin_memory=pin_memory, collate_fn=collate_fn)
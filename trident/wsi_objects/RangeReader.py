@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import hashlib
+import http.client
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+def is_remote_path(path: str) -> bool:
+    """ Whether `path` is an http(s) URL rather than a local path. """
+    return isinstance(path, str) and path.lower().startswith(('http://', 'https://'))
+
+
+class BlockCache:
+    """
+    Size-bounded cache of fixed-size blocks of remote files, stored on disk (or in memory).
+
+    Blocks are keyed by (file key, block index). On disk, each block is a file under
+    `cache_dir/<file digest>/`, written atomically so that several processes (e.g., DataLoader
+    workers) can share the cache. When the cache exceeds `max_bytes`, the least recently used
+    blocks (oldest modification time, refreshed on every hit) are deleted.
+
+    Example:
+    --------
+    >>> cache = BlockCache("/scratch/trident_blocks", max_bytes=20 * 1024**3)
+    >>> fh = HTTPRangeFile("https://store/slides/slide.svs", cache=cache)
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = 8 * 1024**3, block_size: int = 256 * 1024) -> None:
+        """
+        Args:
+            cache_dir (str, optional): Directory of the cached blocks. If None, blocks are kept in memory. Defaults to None.
+            max_bytes (int): Maximum size of the cached blocks. Defaults to 8 GiB.
+            block_size (int): Size of the blocks in bytes, i.e., granularity of the fetched ranges. Defaults to 256 KiB.
+        """
+        if max_bytes < block_size:
+            raise ValueError(f"Block cache of {max_bytes} bytes cannot hold a single {block_size} bytes block.")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._memory: OrderedDict = OrderedDict()
+        self._used = 0
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._used = sum(size for _, _, size in self._scan())
+
+    def __getstate__(self) -> Dict:
+        return {'cache_dir': self.cache_dir, 'max_bytes': self.max_bytes, 'block_size': self.block_size}
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__init__(**state)
+
+    def _block_path(self, key: str, block: int) -> str:
+        digest = hashlib.blake2b(f'{key}|{self.block_size}'.encode(), digest_size=8).hexdigest()
+        return os.path.join(self.cache_dir, digest, f'{block}.blk')
+
+    def _scan(self) -> List[Tuple[float, str, int]]:
+        """ (mtime, path, size) of every cached block file. """
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.blk'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:  # evicted by another process
+                        continue
+                    entries.append((stat.st_mtime, path, stat.st_size))
+        return entries
+
+    def get(self, key: str, block: int) -> Optional[bytes]:
+        """ Return a cached block, or None on a miss. """
+        if self.cache_dir is None:
+            with self._lock:
+                data = self._memory.get((key, block))
+                if data is not None:
+                    self._memory.move_to_end((key, block))
+                return data
+        path = self._block_path(key, block)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # mark as recently used
+            return data
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, block: int, data: bytes) -> None:
+        """ Store a block, evicting the least recently used blocks if the cache is full. """
+        with self._lock:
+            if self.cache_dir is None:
+                if (key, block) not in self._memory:
+                    self._memory[(key, block)] = data
+                    self._used += len(data)
+                while self._used > self.max_bytes:
+                    _, evicted = self._memory.popitem(last=False)
+                    self._used -= len(evicted)
+                return
+
+            path = self._block_path(key, block)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._used += len(data)
+            if self._used > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # Other processes write to the same directory: rescan it rather than trusting our own count.
+        entries = sorted(self._scan())
+        used = sum(size for _, _, size in entries)
+        target = int(self.max_bytes * 0.9)  # leave some headroom to amortize the scans
+        for _, path, size in entries:
+            if used <= target:
+                break
+            try:
+                os.remove(path)
+                used -= size
+            except FileNotFoundError:
+                pass
+        self._used = used
+
+    def used_bytes(self) -> int:
+        """ Size of the cached blocks. """
+        if self.cache_dir is None:
+            return self._used
+        return sum(size for _, _, size in self._scan())
+
+
+class RangeFile(io.RawIOBase):
+    """
+    Read-only, seekable binary file over a `read_range(offset, count)` function, e.g., HTTP range
+    requests or an object store client. Reads are served by blocks of `cache.block_size` bytes,
+    fetched once and kept in a `BlockCache`; consecutive missing blocks are fetched in one range.
+
+    `read_at` reads at an explicit offset without moving the file position, and can be called
+    from several threads at once.
+
+    Example:
+    --------
+    >>> fh = RangeFile(lambda offset, count: client.get_range("slide.svs", offset, count), size, "slide.svs")
+    >>> tif = tifffile.TiffFile(fh)
+    """
+
+    def __init__(
+        self,
+        read_range: Callable[[int, int], bytes],
+        size: int,
+        name: str,
+        cache: Optional[BlockCache] = None,
+        version: str = '',
+    ) -> None:
+        """
+        Args:
+            read_range (Callable[[int, int], bytes]): Returns `count` bytes (fewer at the end of the file) starting at `offset`.
+            size (int): Size of the file in bytes.
+            name (str): Name of the file, e.g., its URL.
+            cache (BlockCache, optional): Cache of the fetched blocks. Defaults to an in-memory cache of 64 MiB.
+            version (str): Version of the file (e.g., an ETag). Blocks are cached under the name, size and version
+                of the file, so that a modified file is fetched again. Defaults to ''.
+        """
+        super().__init__()
+        self._read_range = read_range
+        self.size = size
+        self.name = name
+        self.cache_key = f'{name}|{size}|{version}'
+        self.cache = cache if cache is not None else BlockCache(max_bytes=64 * 1024**2)
+        self._pos = 0
+        self._stats_lock = threading.Lock()
+        self._stats = {'bytes_read': 0, 'bytes_fetched': 0, 'requests': 0}
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        data = self.read_at(self._pos, len(buffer))
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self.size - self._pos
+        data = self.read_at(self._pos, size)
+        self._pos += len(data)
+        return data
+
+    def read_at(self, offset: int, count: int) -> bytes:
+        """ Return `count` bytes starting at `offset` (fewer at the end of the file). """
+        count = max(0, min(count, self.size - offset))
+        if count == 0:
+            return b''
+        block_size = self.cache.block_size
+        first, last = offset // block_size, (offset + count - 1) // block_size
+        blocks = {block: self.cache.get(self.cache_key, block) for block in range(first, last + 1)}
+
+        # Fetch each run of consecutive missing blocks with a single range
+        missing = [block for block, data in blocks.items() if data is None]
+        runs = []
+        for block in missing:
+            if runs and runs[-1][1] == block - 1:
+                runs[-1][1] = block
+            else:
+                runs.append([block, block])
+        fetched = 0
+        for start, stop in runs:
+            begin, end = start * block_size, min((stop + 1) * block_size, self.size)
+            data = self._read_range(begin, end - begin)
+            if len(data) != end - begin:
+                raise OSError(f"Short read on {self.name}: expected {end - begin} bytes at offset {begin}, got {len(data)}.")
+            fetched += len(data)
+            for block in range(start, stop + 1):
+                blocks[block] = data[(block - start) * block_size:(block - start + 1) * block_size]
+                self.cache.put(self.cache_key, block, blocks[block])
+
+        with self._stats_lock:
+            self._stats['bytes_fetched'] += fetched
+            self._stats['bytes_read'] += count
+            self._stats['requests'] += len(runs)
+        data = b''.join(blocks[block] for block in range(first, last + 1))
+        start = offset - first * block_size
+        return data[start:start + count]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the bytes read from the file, the bytes fetched from the source (the others were served
+        by the block cache), the number of range requests, and the file size.
+        """
+        with self._stats_lock:
+            return {**self._stats, 'file_size': self.size}
+
+
+class HTTPRangeFile(RangeFile):
+    """
+    `RangeFile` reading a file served over HTTP(S) with range requests (e.g., an object store
+    or a presigned URL). Each thread keeps its own persistent connection.
+
+    Example:
+    --------
+    >>> fh = HTTPRangeFile("https://store/slides/slide.svs", cache=BlockCache("/scratch/blocks"))
+    >>> tif = tifffile.TiffFile(fh)
+    >>> print(fh.stats())
+    {'bytes_read': 1183744, 'bytes_fetched': 1310720, 'requests': 4, 'file_size': 1073741824}
+    """
+
+    def __init__(self, url: str, cache: Optional[BlockCache] = None, timeout: float = 60, headers: Optional[Dict[str, str]] = None) -> None:
+        """
+        Args:
+            url (str): http(s) URL of the file. The server must support range requests.
+            cache (BlockCache, optional): Cache of the fetched blocks. Defaults to an in-memory cache.
+            timeout (float): Timeout in seconds of each request. Defaults to 60.
+            headers (Dict[str, str], optional): Additional request headers (e.g., authorization).
+        """
+        self.url = url
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self._local = threading.local()
+        parts = urlsplit(url)
+        self._scheme, self._netloc = parts.scheme.lower(), parts.netloc
+        self._target = parts.path + (f'?{parts.query}' if parts.query else '')
+        size, version = self._head()
+        super().__init__(self._fetch, size, url, cache, version)
+
+    def _request(self, method: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        for attempt in range(2):
+            conn = getattr(self._local, 'conn', None)
+            if conn is None:
+                conn_class = http.client.HTTPSConnection if self._scheme == 'https' else http.client.HTTPConnection
+                conn = self._local.conn = conn_class(self._netloc, timeout=self.timeout)
+            try:
+                conn.request(method, self._target, headers={**self.headers, **headers})
+                response = conn.getresponse()
+                return response.status, {k.lower(): v for k, v in response.getheaders()}, response.read()
+            except (http.client.HTTPException, ConnectionError):
+                conn.close()
+                self._local.conn = None  # stale keep-alive connection: reconnect once
+                if attempt == 1:
+                    raise
+
+    def _head(self) -> Tuple[int, str]:
+        """ Size and version (ETag or modification date) of the file. """
+        status, headers, _ = self._request('HEAD', {})
+        if status != 200 or 'content-length' not in headers:
+            raise OSError(f"Cannot get the size of {self.url} (HTTP {status}).")
+        return int(headers['content-length']), headers.get('etag', headers.get('last-modified', ''))
+
+    def _fetch(self, offset: int, count: int) -> bytes:
+        status, headers, body = self._request('GET', {'Range': f'bytes={offset}-{offset + count - 1}'})
+        if status != 206:
+            raise OSError(f"Range request on {self.url} failed (HTTP {status}); the server must support range requests.")
+        return body
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+        super().close()
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import itertools
+import math
+import queue
+import threading
+import traceback
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+import torch
+import torch.multiprocessing as mp
+from torch.utils.data import Dataset
+from torch.utils.data._utils.collate import default_collate
+from torch.utils.data._utils.pin_memory import pin_memory as _pin_memory
+
+WorkItem = Tuple[Hashable, Dataset, int, Optional[Callable[[List[Any]], Any]]]
+
+
+class SlideReaderPool:
+    """
+    Long-lived pool of reader workers shared by all the slides of a job (and by successive jobs).
+
+    A `DataLoader` per slide starts its worker processes, forks the parent (with the model resident),
+    and tears them down at the end of the slide, which dominates on cohorts of small biopsies. The pool
+    starts its workers once. It is fed work items, (key, dataset, batch_size, collate_fn) with e.g. a
+    `WSIPatcherDataset` per slide, and streams their batches back continuously: workers read the first
+    batches of the next slides while the batches of the current one are being consumed.
+
+    Each worker keeps the datasets of the slides it is reading, so that a slide (and its opened handle) is
+    sent to a worker once rather than with every batch. A dataset is dropped as soon as all the batches of
+    its slide are sent, so that workers do not hold on to slides that are done (e.g., decoded in-memory
+    images of `ImageWSI`). With `num_workers=0`, threads read the batches.
+
+    Example:
+    --------
+    >>> pool = SlideReaderPool(num_workers=8)
+    >>> work_items = ((wsi.name, WSIPatcherDataset(wsi.create_patcher(...), transform), 64, None) for wsi in wsis)
+    >>> for key, batch in pool.stream(work_items):
+    ...     if batch is None:
+    ...         save(key)  # all the batches of `key` were received
+    ...     elif isinstance(batch, Exception):
+    ...         log(key, batch)  # reading `key` failed, its remaining batches are dropped
+    ...     else:
+    ...         imgs, coords = batch
+    >>> pool.close()
+    """
+
+    def __init__(
+        self,
+        num_workers: int,
+        prefetch_batches: int = 2,
+        pin_memory: bool = False,
+        mp_context: Optional[str] = None,
+        cached_slides: int = 4,
+    ) -> None:
+        """
+        Args:
+            num_workers (int): Number of worker processes (see `get_num_workers`). 0 reads with threads in the main process.
+            prefetch_batches (int): Number of batches read ahead per worker (or per thread). Defaults to 2.
+            pin_memory (bool): Copy batches into page-locked memory (if CUDA is available). Defaults to False.
+            mp_context (str, optional): Start method of the workers ('fork', 'spawn', 'forkserver'). Defaults to None (PyTorch's default).
+            cached_slides (int): Maximum number of slide datasets each worker keeps, e.g. when several slides are
+                read at once or a stream is left early. Defaults to 4.
+        """
+        if num_workers < 0 or prefetch_batches < 1 or cached_slides < 1:
+            raise ValueError(f"Invalid pool settings: num_workers={num_workers}, prefetch_batches={prefetch_batches}, cached_slides={cached_slides}.")
+        self.num_workers = num_workers
+        self.prefetch_batches = prefetch_batches
+        self.pin_memory = pin_memory and torch.cuda.is_available()
+        self.cached_slides = cached_slides
+        self._ids = itertools.count()
+        self._submitted: Deque[WorkItem] = deque()
+        self._closed = False
+
+        # Threads when num_workers is 0, as many as batches read ahead
+        n_readers = num_workers or max(1, prefetch_batches)
+        if num_workers > 0:
+            ctx = mp.get_context(mp_context)
+            self._results = ctx.Queue()
+            self._tasks = [ctx.Queue() for _ in range(n_readers)]
+            self._workers = [
+                ctx.Process(target=_reader_loop, args=(i, self._tasks[i], self._results, cached_slides), daemon=True, name=f'trident-reader-{i}')
+                for i in range(n_readers)
+            ]
+        else:
+            self._results = queue.Queue()
+            self._tasks = [queue.Queue() for _ in range(n_readers)]
+            self._workers = [
+                threading.Thread(target=_reader_loop, args=(i, self._tasks[i], self._results, cached_slides), daemon=True, name=f'trident-reader-{i}')
+                for i in range(n_readers)
+            ]
+        for worker in self._workers:
+            worker.start()
+        # Mirror of the dataset cache of each worker, and number of batches it has queued
+        self._worker_slides = [OrderedDict() for _ in self._workers]
+        self._worker_load = [0] * len(self._workers)
+
+    def __len__(self) -> int:
+        return len(self._workers)
+
+    def submit(self, key: Hashable, dataset: Dataset, batch_size: int, collate_fn: Optional[Callable[[List[Any]], Any]] = None) -> None:
+        """ Queue a work item ahead of the remaining ones of `stream` (e.g., a second pass over a slide that just finished) """
+        self._submitted.append((key, dataset, batch_size, collate_fn))
+
+    def _dispatch(self, slide_id: int, dataset: Dataset, batch_no: int, indices: List[int], collate_fn: Callable) -> None:
+        """ Send a batch to the least loaded worker, with the dataset unless the worker already has it """
+        worker = min(range(len(self._workers)), key=self._worker_load.__getitem__)
+        slides = self._worker_slides[worker]
+        known = slide_id in slides
+        if known:
+            slides.move_to_end(slide_id)
+        else:
+            slides[slide_id] = None
+            if len(slides) > self.cached_slides:
+                slides.popitem(last=False)
+        self._tasks[worker].put((slide_id, batch_no, None if known else dataset, indices, collate_fn))
+        self._worker_load[worker] += 1
+
+    def _release(self, slide_id: int) -> None:
+        """ Drop the dataset of a slide from the workers that have it, once all its batches are sent """
+        for worker, slides in enumerate(self._worker_slides):
+            if slide_id in slides:
+                del slides[slide_id]
+                self._tasks[worker].put(_Release(slide_id))
+
+    def stream(self, work_items: Iterable[WorkItem]) -> Iterator[Tuple[Hashable, Any]]:
+        """
+        Read the batches of the work items, pulled from `work_items` (and `submit`) as workers need them.
+
+        Args:
+            work_items (Iterable[WorkItem]): (key, dataset, batch_size, collate_fn) tuples, with collate_fn None
+                for PyTorch's `default_collate`.
+
+        Returns:
+            Iterator[Tuple[Hashable, Any]]: (key, batch) in order, with each work item ending with (key, None), or with
+                (key, exception) if one of its batches could not be read. Either way, the workers are done reading the
+                work item (e.g., its slide can be closed).
+        """
+        if self._closed:
+            raise RuntimeError("The reader pool is closed.")
+        work_items = iter(work_items)
+        max_pending = len(self._workers) * self.prefetch_batches
+        slides: Dict[int, _Slide] = {}
+        order: Deque[int] = deque()  # slides to yield, in order
+        feeding: Optional[_Slide] = None
+        exhausted, pending = False, 0
+        while True:
+            # Keep every worker busy, moving on to the next work items without waiting for the current ones
+            while pending < max_pending:
+                if feeding is None or feeding.sent == feeding.n_batches or feeding.error is not None:
+                    if self._submitted:
+                        item = self._submitted.popleft()
+                    elif not exhausted:
+                        item = next(work_items, None)
+                        exhausted = item is None
+                        if exhausted:
+                            break
+                    else:
+                        break
+                    feeding = _Slide(next(self._ids), *item)
+                    slides[feeding.id] = feeding
+                    order.append(feeding.id)
+                    continue
+                start = feeding.sent * feeding.batch_size
+                indices = list(range(start, min(start + feeding.batch_size, len(feeding.dataset))))
+                self._dispatch(feeding.id, feeding.dataset, feeding.sent, indices, feeding.collate_fn)
+                feeding.sent += 1
+                feeding.pending += 1
+                pending += 1
+                if feeding.sent == feeding.n_batches:
+                    self._release(feeding.id)
+
+            # Yield the batches received so far, in order
+            while order:
+                slide = slides[order[0]]
+                if slide.error is not None:
+                    if slide.pending:
+                        break  # wait for its batches in flight
+                    yield slide.key, slide.error
+                elif slide.next in slide.batches:
+                    batch = slide.batches.pop(slide.next)
+                    slide.next += 1
+                    yield slide.key, batch
+                    continue
+                elif slide.next == slide.n_batches:
+                    yield slide.key, None
+                else:
+                    break
+                order.popleft()
+                del slides[slide.id]
+
+            if pending == 0:
+                if not order and exhausted and not self._submitted:
+                    return
+                continue
+
+            worker, slide_id, batch_no, batch = self._get_result()
+            self._worker_load[worker] -= 1
+            slide = slides.get(slide_id)
+            if slide is None:
+                continue  # batch of an abandoned stream
+            pending -= 1
+            slide.pending -= 1
+            if isinstance(batch, _ReadError):
+                if slide.error is None:
+                    slide.error = RuntimeError(f"Failed to read batch {batch_no} of {slide.key}:\n{batch.traceback}")
+                    self._release(slide_id)
+            elif slide.error is None:
+                slide.batches[batch_no] = _pin_memory(batch) if self.pin_memory else batch
+
+    def _get_result(self) -> Tuple[int, int, int, Any]:
+        while True:
+            try:
+                return self._results.get(timeout=5)
+            except queue.Empty:
+                dead = [worker.name for worker in self._workers if not worker.is_alive()]
+                if dead:
+                    raise RuntimeError(f"Reader workers {', '.join(dead)} exited unexpectedly.")
+
+    def close(self) -> None:
+        """ Stop the workers """
+        if self._closed:
+            return
+        self._closed = True
+        for tasks in self._tasks:
+            tasks.put(None)
+        for worker in self._workers:
+            worker.join(timeout=10)
+            if isinstance(worker, mp.Process) and worker.is_alive():
+                worker.terminate()
+
+    def __enter__(self) -> SlideReaderPool:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class _Slide:
+    """ Progress of a work item in `SlideReaderPool.stream` """
+
+    def __init__(self, id: int, key: Hashable, dataset: Dataset, batch_size: int, collate_fn: Optional[Callable]) -> None:
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}.")
+        self.id, self.key, self.dataset, self.batch_size = id, key, dataset, batch_size
+        self.collate_fn = collate_fn or default_collate
+        self.n_batches = math.ceil(len(dataset) / batch_size)
+        self.sent = self.next = self.pending = 0
+        self.batches: Dict[int, Any] = {}
+        self.error: Optional[Exception] = None
+
+
+class _Release:
+    """ Task dropping the dataset of a slide from the cache of a worker """
+
+    def __init__(self, slide_id: int) -> None:
+        self.slide_id = slide_id
+
+
+class _ReadError:
+    """ Failure of a reader worker, with the formatted traceback (exceptions do not always pickle) """
+
+    def __init__(self, traceback: str) -> None:
+        self.traceback = traceback
+
+
+def _reader_loop(worker: int, tasks, results, cached_slides: int) -> None:
+    """ Worker of `SlideReaderPool`: read batches until the None task """
+    torch.set_num_threads(1)
+    datasets = OrderedDict()
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        if isinstance(task, _Release):
+            datasets.pop(task.slide_id, None)
+            continue
+        slide_id, batch_no, dataset, indices, collate_fn = task
+        # Same cache updates as `SlideReaderPool._dispatch`
+        if dataset is None:
+            dataset = datasets[slide_id]
+            datasets.move_to_end(slide_id)
+        else:
+            datasets[slide_id] = dataset
+            if len(datasets) > cached_slides:
+                datasets.popitem(last=False)
+        try:
+            if hasattr(dataset, '__getitems__'):
+                samples = dataset.__getitems__(indices)
+            else:
+                samples = [dataset[i] for i in indices]
+            batch = collate_fn(samples)
+        except Exception:
+            batch = _ReadError(traceback.format_exc())
+        results.put((worker, slide_id, batch_no, batch))
+        task = dataset = samples = batch = None  # not kept alive past the cache
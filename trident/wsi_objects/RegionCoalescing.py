@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from typing import List, Tuple
+import numpy as np
+
+
+def plan_coalesced_reads(
+    coords: np.ndarray,
+    downsample: float,
+    size: Tuple[int, int],
+    tile_size: Tuple[int, int],
+    max_region_size: int = 2048,
+) -> Tuple[List[Tuple[Tuple[int, int], Tuple[int, int], np.ndarray]], np.ndarray]:
+    """
+    Group same-size region reads into super-regions aligned to the native tile grid of a level.
+
+    Patches whose top-left corner falls into the same block of `max_region_size // tile_size`
+    native tiles are merged into one read covering their bounding box, so that every native tile
+    is decoded once per block instead of once per patch (and once more per overlapping neighbour).
+
+    Only regions whose level 0 coordinates are exact multiples of the level downsample can be sliced
+    out of a larger read without resampling. The other regions are returned separately so that the
+    caller reads them one by one.
+
+    Args:
+        coords (np.ndarray): (N, 2) array of (x, y) top-left coordinates in the level 0 reference frame.
+        downsample (float): downsample factor of the level being read.
+        size (Tuple[int, int]): (width, height) of each region at the read level.
+        tile_size (Tuple[int, int]): (width, height) of the native tiles at the read level.
+        max_region_size (int, optional): approximate edge, in pixels at the read level, of a super-region
+            block. Defaults to 2048.
+
+    Returns:
+        Tuple[List[Tuple[Tuple[int, int], Tuple[int, int], np.ndarray]], np.ndarray]:
+            - list of super-regions as ((x, y) at the read level, (width, height), indices of the member regions in `coords`)
+            - indices of the regions that must be read individually
+    """
+    coords = np.asarray(coords, dtype=np.int64).reshape(-1, 2)
+    width, height = size
+    tile_w, tile_h = tile_size
+
+    ds = int(round(downsample))
+    if abs(downsample - ds) > 1e-6 or ds < 1:
+        return [], np.arange(len(coords))
+
+    aligned = (coords % ds == 0).all(axis=1)
+    single = np.flatnonzero(~aligned)
+    aligned_idx = np.flatnonzero(aligned)
+    if len(aligned_idx) == 0:
+        return [], single
+
+    level_xy = coords[aligned_idx] // ds
+    block_w = tile_w * max(1, max_region_size // tile_w)
+    block_h = tile_h * max(1, max_region_size // tile_h)
+    block_keys = np.stack([level_xy[:, 0] // block_w, level_xy[:, 1] // block_h], axis=1)
+    _, group_ids = np.unique(block_keys, axis=0, return_inverse=True)
+    group_ids = group_ids.reshape(-1)
+
+    regions = []
+    order = np.argsort(group_ids, kind='stable')
+    boundaries = np.flatnonzero(np.diff(group_ids[order])) + 1
+    for members in np.split(order, boundaries):
+        if len(members) == 1:
+            single = np.append(single, aligned_idx[members])
+            continue
+        x0, y0 = level_xy[members].min(axis=0)
+        x1, y1 = level_xy[members].max(axis=0) + (width, height)
+        regions.append(((int(x0), int(y0)), (int(x1 - x0), int(y1 - y0)), aligned_idx[members]))
+
+    return regions, np.sort(single)
+
+
+def count_decoded_tiles(
+    regions_xy: np.ndarray,
+    regions_size: np.ndarray,
+    tile_size: Tuple[int, int],
+) -> int:
+    """
+    Count the native tiles touched by a set of reads, i.e. the tiles a decoder without
+    any tile cache would have to decode to serve them.
+
+    Args:
+        regions_xy (np.ndarray): (N, 2) array of (x, y) top-left coordinates at the read level.
+        regions_size (np.ndarray): (N, 2) array of (width, height) of the reads.
+        tile_size (Tuple[int, int]): (width, height) of the native tiles.
+
+    Returns:
+        int: number of tile decodes.
+    """
+    regions_xy = np.asarray(regions_xy).reshape(-1, 2)
+    regions_size = np.broadcast_to(np.asarray(regions_size), regions_xy.shape)
+    tile = np.asarray(tile_size)
+    first = np.floor_divide(regions_xy, tile)
+    last = np.floor_divide(regions_xy + regions_size - 1, tile)
+    return int(np.prod(last - first + 1, axis=1).sum())
@@ -0,0 +1,631 @@
+from __future__ import annotations
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple, Union
+import cv2
+import numpy as np
+from PIL import Image
+
+from trident.wsi_objects.WSI import WSI, ReadMode, _drop_worker_handle
+from trident.wsi_objects.RangeReader import BlockCache, HTTPRangeFile, is_remote_path
+
+
+_REDUCED_DECODE_FLAGS = {2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+# APP14 "Adobe" segment with transform 0: tells libjpeg the samples are RGB, not YCbCr
+_ADOBE_RGB_MARKER = b'\xff\xee\x00\x0eAdobe\x00\x64\x00\x00\x00\x00\x00'
+
+
+class TiffFileWSI(WSI):
+
+    def __init__(
+        self,
+        num_decode_threads: Optional[int] = None,
+        file_opener: Optional[Callable[[str], BinaryIO]] = None,
+        block_cache_dir: Optional[str] = None,
+        block_cache_bytes: int = 8 * 1024**3,
+        **kwargs,
+    ) -> None:
+        """
+        Initialize a WSI object read with `tifffile` (tiled TIFF, SVS and other TIFF-based pyramids).
+
+        Each pyramid level is exposed as a grid of compressed chunks (tiles or strips). A region
+        read fetches the raw bytes of the chunks it overlaps and decodes them in a thread pool;
+        the codecs (`imagecodecs`) release the GIL, so a single process can decode on many cores.
+
+        Slides can also be read remotely: `slide_path` may be an http(s) URL, read with range requests
+        (`HTTPRangeFile`), or any path opened by `file_opener`. Only the TIFF directories and the tiles
+        that are read are then transferred, and kept in a local block cache.
+
+        Parameters
+        ----------
+        slide_path : str
+            Path or http(s) URL of the TIFF file.
+        num_decode_threads : int, optional
+            Number of threads decoding chunks. Defaults to the number of CPUs available to the process.
+        file_opener : Callable[[str], BinaryIO], optional
+            Opens `slide_path` as a seekable binary file, e.g., a `RangeFile` over an object store client.
+            Must be picklable to be used by DataLoader workers. Defaults to `HTTPRangeFile` for URLs.
+        block_cache_dir : str, optional
+            Directory of the cache of blocks read from URLs, shared by processes and runs. If None, blocks
+            are cached in memory only. Defaults to None.
+        block_cache_bytes : int, optional
+            Maximum size of the block cache. Least recently used blocks are evicted. Defaults to 8 GiB.
+        **kwargs : dict
+            Additional keyword arguments passed to `WSI` (e.g., `mpp`, `lazy_init`, `tile_cache`).
+
+        Example
+        -------
+        >>> wsi = TiffFileWSI(slide_path="path/to/slide.svs", lazy_init=False)
+        >>> print(wsi)
+        <width=100000, height=80000, backend=TiffFileWSI, mpp=0.25, mag=40>
+        """
+        if num_decode_threads is None:
+            num_decode_threads = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+        self.num_decode_threads = max(1, int(num_decode_threads or 1))
+        self.file_opener = file_opener
+        self.block_cache_dir = block_cache_dir
+        self.block_cache_bytes = block_cache_bytes
+        self._decode_pool = None
+        self._read_lock = threading.Lock()
+        self._pages = None
+        super().__init__(**kwargs)
+
+    def _lazy_initialize(self) -> None:
+        """
+        Lazily open the TIFF file with `tifffile` and read its pyramid metadata.
+
+        Raises
+        ------
+        ImportError
+            If `tifffile` (or `imagecodecs`, needed for compressed tiles) is not installed.
+        RuntimeError
+            If the file cannot be read as a TIFF pyramid.
+
+        Notes
+        -----
+        After initialization, the following attributes are set:
+        - `width` and `height`: spatial dimensions of the WSI.
+        - `level_count`, `level_downsamples`, and `level_dimensions`: pyramid of the first image series.
+        - `properties`: TIFF tags of level 0 (`tiff.*`) and Aperio description fields (`aperio.*`).
+        - `mpp`: microns per pixel, inferred if not already set.
+        - `mag`: estimated magnification level of the image.
+        - `gdf_contours`: tissue mask contours, if applicable.
+        """
+
+        super()._lazy_initialize()
+
+        try:
+            import tifffile  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                "Required dependency not found: `tifffile`.\n"
+                "Please install it with:\n"
+                "  pip install tifffile imagecodecs"
+            ) from e
+
+        if not self.lazy_init:
+            try:
+                self.img = self._open_handle()
+                levels = self.img.series[0].levels
+                self.level_dimensions = [(int(lvl.keyframe.imagewidth), int(lvl.keyframe.imagelength)) for lvl in levels]
+                self.dimensions = self.level_dimensions[0]
+                self.width, self.height = self.dimensions
+                self.level_count = len(self.level_dimensions)
+                # Same convention as OpenSlide: mean of the width and height ratios
+                self.level_downsamples = [
+                    (self.width / w + self.height / h) / 2 for (w, h) in self.level_dimensions
+                ]
+                self.properties = self._read_properties(levels[0].keyframe)
+                if self.mpp is None:
+                    self.mpp = self._fetch_mpp(self.custom_mpp_keys)
+                self.mag = self._fetch_magnification(self.custom_mpp_keys)
+                self.lazy_init = True
+                self._record_metadata()
+
+            except Exception as e:
+                raise RuntimeError(f"Failed to initialize WSI using tifffile: {e}") from e
+
+    def _open_handle(self):
+        import tifffile
+        if self.file_opener is None and not is_remote_path(self.slide_path):
+            return tifffile.TiffFile(self.slide_path)
+
+        if self.file_opener is not None:
+            fh = self.file_opener(self.slide_path)
+        else:
+            fh = HTTPRangeFile(self.slide_path, cache=BlockCache(self.block_cache_dir, self.block_cache_bytes))
+        tif = tifffile.TiffFile(fh, name=os.path.basename(self.slide_path))
+        tif.range_file = fh  # read chunks with `read_at` rather than through the (locked) file position
+        return tif
+
+    def transfer_stats(self) -> Optional[Dict[str, int]]:
+        """
+        Bytes read from a remote slide and bytes actually fetched from its source (the others were served
+        by the block cache), in this process, and the file size. None for local files.
+
+        Returns
+        -------
+        Optional[Dict[str, int]]
+            e.g., `{'bytes_read': 4718592, 'bytes_fetched': 5242880, 'requests': 21, 'file_size': 1073741824}`
+        """
+        fh = getattr(self.img, 'range_file', None)
+        return fh.stats() if hasattr(fh, 'stats') else None
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state['_decode_pool'] = None
+        state['_read_lock'] = None
+        state['_pages'] = None
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._read_lock = threading.Lock()
+
+    @staticmethod
+    def _read_properties(page) -> Dict[str, object]:
+        """
+        Collect the TIFF tags of a page as `tiff.<TagName>` properties. The `key = value` fields of
+        Aperio image descriptions are also exposed as `aperio.<key>`, as with OpenSlide.
+        """
+        properties = {}
+        for tag in page.tags.values():
+            value = tag.value
+            if isinstance(value, bytes) or (isinstance(value, tuple) and len(value) > 16):
+                continue  # binary blobs, offsets and byte counts
+            if tag.name in ('XResolution', 'YResolution') and isinstance(value, tuple) and len(value) == 2 and value[1]:
+                value = value[0] / value[1]
+            elif tag.name == 'ResolutionUnit':
+                value = {1: 'none', 2: 'inch', 3: 'centimeter'}.get(int(value), str(value))
+            elif hasattr(value, 'name'):  # enums
+                value = value.name
+            properties[f'tiff.{tag.name}'] = value
+
+        description = properties.get('tiff.ImageDescription')
+        if isinstance(description, str) and description.startswith('Aperio'):
+            for field in description.split('|')[1:]:
+                if '=' in field:
+                    key, value = field.split('=', 1)
+                    properties[f'aperio.{key.strip()}'] = value.strip()
+        return properties
+
+    def _fetch_mpp(self, custom_mpp_keys: Optional[List[str]] = None) -> Optional[float]:
+        """
+        Retrieve the microns per pixel (MPP) from the TIFF metadata.
+
+        Custom keys are checked first, then the Aperio `MPP` field, then the TIFF resolution tags.
+
+        Parameters
+        ----------
+        custom_mpp_keys : List[str], optional
+            Property keys to check first for the MPP value.
+
+        Returns
+        -------
+        float
+            MPP value in microns per pixel.
+
+        Raises
+        ------
+        ValueError
+            If MPP cannot be determined from metadata.
+        """
+        for key in list(custom_mpp_keys or []) + ['aperio.MPP', 'openslide.mpp-x']:
+            try:
+                mpp = float(self.properties[key])
+                if mpp > 0:
+                    return mpp
+            except (KeyError, TypeError, ValueError):
+                continue
+
+        resolution = self.properties.get('tiff.XResolution')
+        unit = self.properties.get('tiff.ResolutionUnit')
+        if resolution and unit in ('centimeter', 'inch'):
+            return (1e4 if unit == 'centimeter' else 25400) / float(resolution)
+
+        raise ValueError(
+            f"Unable to extract MPP from TIFF metadata for: '{self.slide_path}'.\n"
+            "Suggestions:\n"
+            "- Provide `custom_mpp_keys` with the property holding the MPP value.\n"
+            "- Set the MPP manually when constructing the TiffFileWSI object."
+        )
+
+    def _page(self, level: int):
+        """ Key frame (first page) of a pyramid level, whose chunk layout applies to the whole level. """
+        img = self.img
+        if self._pages is None or self._pages[0] is not img:  # (re)opened handle
+            self._pages = (img, [lvl.keyframe for lvl in img.series[0].levels])
+        return self._pages[1][level]
+
+    def _read_chunk_bytes(self, offset: int, count: int) -> bytes:
+        range_file = getattr(self.img, 'range_file', None)
+        if hasattr(range_file, 'read_at'):
+            return range_file.read_at(offset, count)
+        fh = self.img.filehandle
+        try:
+            return os.pread(fh.fileno(), count, offset)
+        except (AttributeError, OSError, ValueError, NotImplementedError):
+            # File-like objects without a descriptor: serialize seek + read
+            with self._read_lock:
+                fh.seek(offset)
+                return fh.read(count)
+
+    def _decode_chunk(self, level: int, index: int, scale: int = 1) -> Optional[np.ndarray]:
+        """
+        Decode chunk `index` of a level into a (chunk_height, chunk_width, samples) array, or None if empty.
+        With `scale` > 1, the chunk is downscaled by `scale`: JPEG chunks are decoded directly at the reduced
+        size (DCT-domain scaling), other codecs are decoded at full size and area-resampled.
+        """
+        page = self._page(level)
+        offset, count = page.dataoffsets[index], page.databytecounts[index]
+        if not offset or not count:
+            return None
+        data = self._read_chunk_bytes(offset, count)
+        if scale > 1 and self._is_dct_scalable(page):
+            chunk = cv2.imdecode(np.frombuffer(self._jpeg_stream(page, data), dtype=np.uint8), _REDUCED_DECODE_FLAGS[scale])
+            if chunk is not None:
+                chunk_h, chunk_w, _ = self._chunk_layout(level, scale)
+                if chunk.shape[:2] != (chunk_h, chunk_w):  # e.g., last strip
+                    padded = np.zeros((chunk_h, chunk_w, 3), dtype=np.uint8)
+                    padded[:min(chunk_h, chunk.shape[0]), :min(chunk_w, chunk.shape[1])] = chunk[:chunk_h, :chunk_w]
+                    chunk = padded
+                return cv2.cvtColor(chunk, cv2.COLOR_BGR2RGB, dst=chunk)
+        chunk = page.decode(data, index, jpegtables=page.jpegtables)[0]
+        if chunk is None:
+            return None
+        chunk = chunk[0]
+        if scale > 1:
+            chunk_h, chunk_w, _ = self._chunk_layout(level, scale)
+            chunk = cv2.resize(chunk[..., :3], (chunk_w, chunk_h), interpolation=cv2.INTER_AREA)
+        return chunk
+
+    @staticmethod
+    def _is_dct_scalable(page) -> bool:
+        """ Whether the chunks of `page` are baseline JPEG streams that libjpeg decodes to the right colors. """
+        photometric = int(page.photometric)
+        return (
+            int(page.compression) == 7 and int(page.bitspersample) == 8 and int(page.planarconfig) == 1
+            and (photometric in (1, 6) or (photometric == 2 and not page.is_jfif))
+        )
+
+    @staticmethod
+    def _jpeg_stream(page, data: bytes) -> bytes:
+        """ Standalone JPEG stream of a chunk: shared tables merged in, RGB (not YCbCr) samples flagged. """
+        if page.jpegtables:
+            data = page.jpegtables[:-2] + data[2:]  # tables without EOI + chunk without SOI
+        if int(page.photometric) == 2:
+            data = data[:2] + _ADOBE_RGB_MARKER + data[2:]
+        return data
+
+    def _decode_chunks(self, level: int, indices: Iterable[int], scale: int = 1) -> Dict[int, Optional[np.ndarray]]:
+        indices = list(indices)
+        if len(indices) <= 1 or self.num_decode_threads == 1:
+            return {i: self._decode_chunk(level, i, scale) for i in indices}
+        if self._decode_pool is None:
+            self._decode_pool = ThreadPoolExecutor(self.num_decode_threads, thread_name_prefix='trident-tiff-decode')
+        return dict(zip(indices, self._decode_pool.map(lambda i: self._decode_chunk(level, i, scale), indices)))
+
+    def _chunk_layout(self, level: int, scale: int = 1) -> Tuple[int, int, int]:
+        """ (chunk_height, chunk_width, n_cols) of a level's chunk grid, downscaled by `scale`. """
+        page = self._page(level)
+        if page.is_tiled:
+            chunk_h, chunk_w = int(page.tilelength), int(page.tilewidth)
+        else:
+            chunk_h, chunk_w = int(page.rowsperstrip), int(page.imagewidth)
+        chunk_h = min(chunk_h, int(page.imagelength))
+        return chunk_h // scale, chunk_w // scale, -(-int(page.imagewidth) // chunk_w)
+
+    def _level_window(
+        self, location: Tuple[int, int], level: int, size: Tuple[int, int], scale: int = 1
+    ) -> Tuple[int, int, int, int, int, int]:
+        """
+        Top-left corner of the region in the level frame (downscaled by `scale`) and its intersection
+        (x0, y0, x1, y1) with the level.
+        """
+        downsample = self.level_downsamples[level] * scale
+        x, y = int(location[0] // downsample), int(location[1] // downsample)
+        level_w, level_h = (-(-d // scale) for d in self.level_dimensions[level])
+        return x, y, max(x, 0), max(y, 0), min(x + size[0], level_w), min(y + size[1], level_h)
+
+    def _chunks_of(self, level: int, window: Tuple[int, int, int, int, int, int], scale: int = 1) -> List[int]:
+        _, _, x0, y0, x1, y1 = window
+        if x0 >= x1 or y0 >= y1:
+            return []
+        chunk_h, chunk_w, n_cols = self._chunk_layout(level, scale)
+        return [
+            row * n_cols + col
+            for row in range(y0 // chunk_h, (y1 - 1) // chunk_h + 1)
+            for col in range(x0 // chunk_w, (x1 - 1) // chunk_w + 1)
+        ]
+
+    def _paste_chunks(self, level: int, window, chunks: Dict[int, Optional[np.ndarray]], out: np.ndarray, scale: int = 1) -> None:
+        """ Assemble a region from decoded chunks. Pixels outside of the level (or in empty chunks) are 0. """
+        x, y, x0, y0, x1, y1 = window
+        if x0 != x or y0 != y or x1 != x + out.shape[1] or y1 != y + out.shape[0]:
+            out[...] = 0
+        if x0 >= x1 or y0 >= y1:
+            return
+        chunk_h, chunk_w, n_cols = self._chunk_layout(level, scale)
+        for row in range(y0 // chunk_h, (y1 - 1) // chunk_h + 1):
+            cy0, cy1 = max(y0, row * chunk_h), min(y1, (row + 1) * chunk_h)
+            for col in range(x0 // chunk_w, (x1 - 1) // chunk_w + 1):
+                cx0, cx1 = max(x0, col * chunk_w), min(x1, (col + 1) * chunk_w)
+                dst = out[cy0 - y:cy1 - y, cx0 - x:cx1 - x]
+                chunk = chunks[row * n_cols + col]
+                if chunk is None:
+                    dst[...] = 0
+                    continue
+                src = chunk[cy0 - row * chunk_h:cy1 - row * chunk_h, cx0 - col * chunk_w:cx1 - col * chunk_w]
+                if src.ndim == 2 or src.shape[2] == 1:  # grayscale
+                    dst[...] = src.reshape(src.shape[:2] + (1,))
+                else:
+                    dst[...] = src[..., :3]
+
+    def get_dct_scale(self, level: int, downsample: float) -> int:
+        """
+        Largest reduced-decoding factor (1, 2, 4 or 8) not above `downsample` supported by a level.
+
+        Parameters
+        ----------
+        level : int
+            Pyramid level to read from.
+        downsample : float
+            Additional downsample wanted on top of the level's own downsample.
+
+        Returns
+        -------
+        int
+            Factor to pass to `read_region_scaled`. 1 if the chunks cannot be split evenly.
+        """
+        chunk_h, chunk_w, _ = self._chunk_layout(level)
+        for scale in (8, 4, 2):
+            if scale <= downsample + 1e-6 and chunk_h % scale == 0 and chunk_w % scale == 0:
+                return scale
+        return 1
+
+    def read_region_scaled(
+        self,
+        location: Tuple[int, int],
+        level: int,
+        size: Tuple[int, int],
+        scale: int,
+        read_as: ReadMode = 'pil',
+    ) -> Union[Image.Image, np.ndarray]:
+        """
+        Read the region of `size * scale` pixels of a level, downscaled by `scale`.
+
+        For JPEG-compressed levels, and factors 2, 4 or 8 (see `get_dct_scale`), the tiles are decoded
+        directly at the reduced resolution by libjpeg (DCT-domain scaling), which divides the decoding
+        cost by up to `scale ** 2` compared to decoding at full resolution and resizing. Other cases
+        read at full resolution and area-resample the region.
+
+        Parameters
+        ----------
+        location : Tuple[int, int]
+            (x, y) coordinates of the top-left corner of the region, in the level 0 reference frame.
+        level : int
+            Pyramid level to read from.
+        size : Tuple[int, int]
+            (width, height) of the returned (downscaled) region.
+        scale : int
+            Downscaling factor applied to the level.
+        read_as : {'pil', 'numpy'}, optional
+            Output format for the region. Defaults to 'pil'.
+
+        Returns
+        -------
+        Union[PIL.Image.Image, np.ndarray]
+            The downscaled region, of size `size`.
+
+        Example
+        -------
+        >>> scale = wsi.get_dct_scale(level=0, downsample=4)  # e.g., 10x from a 40x slide without a 10x level
+        >>> region = wsi.read_region_scaled((0, 0), level=0, size=(1024, 1024), scale=scale, read_as='numpy')
+        """
+        scale = int(scale)
+        out = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        if scale == 1 or self.get_dct_scale(level, scale) != scale:
+            region = self._read_region_raw(location, level, (size[0] * scale, size[1] * scale))
+            cv2.resize(region, tuple(size), dst=out, interpolation=cv2.INTER_AREA)
+        else:
+            window = self._level_window(location, level, size, scale)
+            chunks = self._decode_chunks(level, self._chunks_of(level, window, scale), scale)
+            self._paste_chunks(level, window, chunks, out, scale)
+
+        if read_as == 'numpy':
+            return out
+        elif read_as == 'pil':
+            return Image.fromarray(out)
+        else:
+            raise ValueError(f"Invalid `read_as` value: {read_as}. Must be 'pil' or 'numpy'.")
+
+    def get_thumbnail(self, size: tuple[int, int]) -> Image.Image:
+        """
+        Generate a thumbnail image of the WSI.
+
+        The coarsest level larger than the thumbnail is decoded (in parallel, at a reduced resolution
+        for JPEG tiles, see `read_region_scaled`) and area-resampled.
+
+        Parameters
+        ----------
+        size : tuple[int, int]
+            Desired (width, height) of the thumbnail.
+
+        Returns
+        -------
+        Image.Image
+            RGB thumbnail image.
+        """
+        desired_downsample = max(self.width / size[0], self.height / size[1])
+        level, _ = self.get_best_level_and_custom_downsample(desired_downsample)
+        scale = self.get_dct_scale(level, desired_downsample / self.level_downsamples[level])
+        level_w, level_h = self.level_dimensions[level]
+        region = self.read_region_scaled((0, 0), level, (-(-level_w // scale), -(-level_h // scale)), scale, read_as='numpy')
+        return Image.fromarray(cv2.resize(region, tuple(size), interpolation=cv2.INTER_AREA))
+
+    def get_tile_size(self, level: int = 0) -> Tuple[int, int]:
+        """
+        Return the (width, height) of the compressed chunks (tiles or strips) of a level.
+        """
+        chunk_h, chunk_w, _ = self._chunk_layout(level)
+        return chunk_w, chunk_h
+
+    def read_region(
+        self,
+        location: Tuple[int, int],
+        level: int,
+        size: Tuple[int, int],
+        read_as: ReadMode = 'pil',
+    ) -> Union[Image.Image, np.ndarray]:
+        """
+        Extract a specific region from the whole-slide image (WSI) using tifffile.
+
+        Parameters
+        ----------
+        location : Tuple[int, int]
+            (x, y) coordinates of the top-left corner of the region to extract, in the level 0 reference frame.
+        level : int
+            Pyramid level to read from.
+        size : Tuple[int, int]
+            (width, height) of the region to extract.
+        read_as : {'pil', 'numpy'}, optional
+            Output format for the region:
+            - 'pil': returns a PIL Image (default)
+            - 'numpy': returns a NumPy array (H, W, 3)
+
+        Returns
+        -------
+        Union[PIL.Image.Image, np.ndarray]
+            The extracted region in the specified format.
+
+        Raises
+        ------
+        ValueError
+            If `read_as` is not one of the supported options.
+
+        Example
+        -------
+        >>> region = wsi.read_region((1000, 1000), level=0, size=(512, 512), read_as='numpy')
+        >>> print(region.shape)
+        (512, 512, 3)
+        """
+        region = self._read_region_numpy(location, level, size)
+
+        if read_as == 'numpy':
+            return region
+        elif read_as == 'pil':
+            return Image.fromarray(region)
+        else:
+            raise ValueError(f"Invalid `read_as` value: {read_as}. Must be 'pil' or 'numpy'.")
+
+    def _read_region_raw(self, location: Tuple[int, int], level: int, size: Tuple[int, int]) -> np.ndarray:
+        out = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        self._read_region_raw_into(location, level, size, out)
+        return out
+
+    def _read_region_raw_into(self, location: Tuple[int, int], level: int, size: Tuple[int, int], out: np.ndarray) -> None:
+        window = self._level_window(location, level, size)
+        self._paste_chunks(level, window, self._decode_chunks(level, self._chunks_of(level, window)), out)
+
+    def read_regions(
+        self,
+        coords: np.ndarray,
+        level: int,
+        size: Tuple[int, int],
+        out: Optional[np.ndarray] = None,
+        max_chunks_per_step: int = 256,
+    ) -> np.ndarray:
+        """
+        Read several regions of the same size and level into one (N, H, W, 3) uint8 array.
+
+        The chunks overlapped by consecutive regions are decoded together in the thread pool,
+        each chunk once even when shared by neighbouring (e.g., overlapping) patches.
+
+        Parameters
+        ----------
+        coords : np.ndarray
+            (N, 2) array of (x, y) top-left coordinates in the level 0 reference frame.
+        level : int
+            Pyramid level to read from.
+        size : Tuple[int, int]
+            (width, height) of each region.
+        out : np.ndarray, optional
+            Preallocated uint8 array of shape (N, height, width, 3). Allocated if None.
+        max_chunks_per_step : int, optional
+            Maximum number of decoded chunks held at once, bounding memory for large batches. Defaults to 256.
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (N, height, width, 3) holding the RGB regions.
+        """
+        if self.tile_cache is not None:
+            return super().read_regions(coords, level, size, out)
+
+        coords = np.asarray(coords)
+        out = self._prepare_regions_buffer(len(coords), size, out)
+        start = 0
+        while start < len(coords):
+            # Group consecutive regions until their chunks exceed the step budget
+            windows, needed, stop = [], set(), start
+            while stop < len(coords):
+                window = self._level_window(coords[stop], level, size)
+                chunks = self._chunks_of(level, window)
+                if windows and len(needed.union(chunks)) > max_chunks_per_step:
+                    break
+                windows.append(window)
+                needed.update(chunks)
+                stop += 1
+            decoded = self._decode_chunks(level, sorted(needed))
+            for i, window in enumerate(windows):
+                self._paste_chunks(level, window, decoded, out[start + i])
+            start = stop
+        return out
+
+    def get_dimensions(self) -> Tuple[int, int]:
+        """
+        Return the (width, height) dimensions of the WSI.
+        """
+        return self.dimensions
+
+    def segment_tissue(self, **kwargs) -> str:
+        out = super().segment_tissue(**kwargs)
+        self.close()
+        return out
+
+    def extract_tissue_coords(self, **kwargs) -> str:
+        out = super().extract_tissue_coords(**kwargs)
+        self.close()
+        return out
+
+    def visualize_coords(self, **kwargs) -> str:
+        out = super().visualize_coords(**kwargs)
+        self.close()
+        return out
+
+    def extract_patch_features(self, **kwargs) -> str:
+        out = super().extract_patch_features(**kwargs)
+        self.close()
+        return out
+
+    def extract_slide_features(self, **kwargs) -> str:
+        out = super().extract_slide_features(**kwargs)
+        self.close()
+        return out
+
+    def close(self):
+        _drop_worker_handle(self)
+        self._pages = None
+        if self._decode_pool is not None:
+            self._decode_pool.shutdown(wait=True)
+            self._decode_pool = None
+        if self._img is not None:
+            # A handle inherited through fork belongs to the parent: only drop the reference
+            if self._img_pid == os.getpid():
+                range_file = getattr(self._img, 'range_file', None)
+                self._img.close()
+                if range_file is not None:  # not closed by tifffile, which did not open it
+                    range_file.close()
+            self.img = None
+            self.lazy_init = False
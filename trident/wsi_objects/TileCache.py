@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import hashlib
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+
+_EMPTY_KEY = np.iinfo(np.int64).min
+
+
+class SharedTileCache:
+    """
+    Byte-budgeted LRU cache of decoded tiles, stored in shared memory so that every
+    DataLoader worker (forked or spawned) reads and fills the same cache.
+
+    Tiles are square blocks of `tile_size` pixels on a regular grid of each pyramid level,
+    keyed by (slide, level, tile_x, tile_y). Reads that are not aligned on the level's pixel
+    grid (level 0 coordinates not multiple of the level downsample) bypass the cache.
+
+    Example:
+    --------
+    >>> cache = SharedTileCache(budget_bytes=2 * 1024**3)
+    >>> wsi = load_wsi("slide.svs", tile_cache=cache)
+    >>> ...
+    >>> print(cache.stats())
+    {'hits': 1834, 'misses': 212, 'evictions': 0, 'used_bytes': 41680896, 'budget_bytes': 2147483648}
+    """
+
+    def __init__(self, budget_bytes: int = 1024**3, tile_size: int = 256) -> None:
+        """
+        Create the cache and allocate its shared memory block.
+
+        Args:
+            budget_bytes (int): Maximum RAM used by decoded tiles. Defaults to 1 GiB.
+            tile_size (int): Edge in pixels of the cached tiles. Defaults to 256.
+
+        Raises:
+            ValueError: If the budget cannot hold a single tile.
+        """
+        self.tile_size = tile_size
+        self.slot_bytes = tile_size * tile_size * 3
+        self.n_slots = int(budget_bytes // self.slot_bytes)
+        if self.n_slots < 1:
+            raise ValueError(f"Tile cache budget of {budget_bytes} bytes cannot hold a single {tile_size}px tile.")
+
+        self._shm = shared_memory.SharedMemory(create=True, size=self._layout_size())
+        self._owner_pid = os.getpid()
+        # A spawn-context lock can be inherited by forked workers and pickled for spawned ones alike
+        self._lock = multiprocessing.get_context('spawn').Lock()
+        self._map_arrays()
+        self._keys[:] = _EMPTY_KEY
+        self._stamps[:] = 0
+        self._generations[:] = 0
+        self._buckets[:] = -1
+        self._counters[:] = 0
+
+    @property
+    def n_buckets(self) -> int:
+        """ Size of the open-addressing table mapping keys to slots: a power of 2, at most half full """
+        return 1 << (2 * self.n_slots - 1).bit_length()
+
+    def _layout_size(self) -> int:
+        return 8 * (5 + 3 * self.n_slots + self.n_buckets) + self.n_slots * self.slot_bytes
+
+    def _map_arrays(self) -> None:
+        buf = self._shm.buf
+        n, m = self.n_slots, self.n_buckets
+        self._counters = np.ndarray((5,), dtype=np.int64, buffer=buf, offset=0)  # hits, misses, evictions, clock, used slots
+        self._keys = np.ndarray((n,), dtype=np.int64, buffer=buf, offset=40)
+        self._stamps = np.ndarray((n,), dtype=np.int64, buffer=buf, offset=40 + 8 * n)
+        self._generations = np.ndarray((n,), dtype=np.int64, buffer=buf, offset=40 + 16 * n)
+        self._buckets = np.ndarray((m,), dtype=np.int64, buffer=buf, offset=40 + 24 * n)  # slot of each bucket, -1 if empty
+        self._tiles = np.ndarray(
+            (n, self.tile_size, self.tile_size, 3), dtype=np.uint8, buffer=buf, offset=40 + 24 * n + 8 * m
+        )
+
+    def __getstate__(self) -> Dict:
+        # Only the name of the shared block travels to spawned workers, the memory itself is re-attached.
+        return {
+            'tile_size': self.tile_size,
+            'slot_bytes': self.slot_bytes,
+            'n_slots': self.n_slots,
+            'shm_name': self._shm.name,
+            'owner_pid': self._owner_pid,
+            'lock': self._lock,
+        }
+
+    def __setstate__(self, state: Dict) -> None:
+        self.tile_size = state['tile_size']
+        self.slot_bytes = state['slot_bytes']
+        self.n_slots = state['n_slots']
+        self._owner_pid = state['owner_pid']
+        self._lock = state['lock']
+        try:
+            self._shm = shared_memory.SharedMemory(name=state['shm_name'], track=False)
+        except TypeError:  # Python < 3.13
+            self._shm = shared_memory.SharedMemory(name=state['shm_name'])
+        self._map_arrays()
+
+    @staticmethod
+    def _tile_key(slide_path: str, level: int, tile_x: int, tile_y: int) -> int:
+        digest = hashlib.blake2b(f'{slide_path}|{level}|{tile_x}|{tile_y}'.encode(), digest_size=8).digest()
+        key = int.from_bytes(digest, 'little', signed=True)
+        return key if key != _EMPTY_KEY else key + 1
+
+    def _find_bucket(self, key: int) -> int:
+        """ Bucket of `key` in the table (linear probing), or -1 if it is not cached. Called with the lock held. """
+        mask = self.n_buckets - 1
+        bucket = key & mask
+        while True:
+            slot = int(self._buckets[bucket])
+            if slot < 0:
+                return -1
+            if self._keys[slot] == key:
+                return bucket
+            bucket = (bucket + 1) & mask
+
+    def _remove_bucket(self, bucket: int) -> None:
+        """ Empty `bucket`, shifting back the entries probed past it. Called with the lock held. """
+        mask = self.n_buckets - 1
+        nxt = bucket
+        while True:
+            nxt = (nxt + 1) & mask
+            slot = int(self._buckets[nxt])
+            if slot < 0:
+                break
+            home = int(self._keys[slot]) & mask
+            # Move the entry into the hole unless its home bucket lies cyclically in (bucket, nxt]
+            if (bucket < nxt and not bucket < home <= nxt) or (nxt < bucket and nxt < home <= bucket):
+                self._buckets[bucket] = slot
+                bucket = nxt
+        self._buckets[bucket] = -1
+
+    def _paste_if_cached(self, key: int, dst: np.ndarray, src: Tuple[slice, slice]) -> bool:
+        """ Copy the cached tile `key` (cropped to `src`) into `dst`. Returns False on a miss. """
+        with self._lock:
+            bucket = self._find_bucket(key)
+            if bucket < 0:
+                self._counters[1] += 1
+                return False
+            slot = int(self._buckets[bucket])
+            generation = int(self._generations[slot])
+            self._counters[3] += 1
+            self._stamps[slot] = self._counters[3]
+        # Copy without the lock: a slot rewritten in the meantime (evicted for another tile) changed generation
+        dst[...] = self._tiles[slot][src]
+        with self._lock:
+            if self._generations[slot] != generation:
+                self._counters[1] += 1
+                return False
+            self._counters[0] += 1
+            return True
+
+    def _insert(self, key: int, tile: np.ndarray) -> None:
+        with self._lock:
+            if self._find_bucket(key) >= 0:  # Another worker inserted it in the meantime
+                return
+            if self._counters[4] < self.n_slots:
+                slot = int(self._counters[4])
+                self._counters[4] += 1
+            else:
+                # Least recently used slot. Only full caches scan the slots, on misses, which pay a decode anyway.
+                slot = int(np.argmin(self._stamps))
+                self._remove_bucket(self._find_bucket(int(self._keys[slot])))
+                self._counters[2] += 1
+            self._counters[3] += 1
+            self._generations[slot] += 1
+            self._keys[slot] = key
+            self._stamps[slot] = self._counters[3]
+            self._tiles[slot] = tile
+            bucket, mask = key & (self.n_buckets - 1), self.n_buckets - 1
+            while self._buckets[bucket] >= 0:
+                bucket = (bucket + 1) & mask
+            self._buckets[bucket] = slot
+
+    def read_region(
+        self,
+        wsi,
+        location: Tuple[int, int],
+        level: int,
+        size: Tuple[int, int],
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Read a region through the cache, decoding (and caching) the missing tiles with the
+        uncached reader of `wsi`.
+
+        Args:
+            wsi (WSI): Slide to read from. Must implement `_read_region_raw`.
+            location (Tuple[int, int]): (x, y) top-left corner in the level 0 reference frame.
+            level (int): Pyramid level to read from.
+            size (Tuple[int, int]): (width, height) of the region.
+            out (np.ndarray, optional): (height, width, 3) uint8 buffer to write into. Allocated if None.
+
+        Returns:
+            np.ndarray: RGB region of shape (height, width, 3).
+        """
+        downsample = wsi.level_downsamples[level]
+        ds = int(round(downsample))
+        x, y = int(location[0]), int(location[1])
+        width, height = size
+        if out is None:
+            out = np.empty((height, width, 3), dtype=np.uint8)
+        if abs(downsample - ds) > 1e-6 or x % ds or y % ds:
+            wsi._read_region_raw_into((x, y), level, size, out)
+            return out
+
+        tile = self.tile_size
+        lx, ly = x // ds, y // ds
+        for ty in range(ly // tile, (ly + height - 1) // tile + 1):
+            y0, y1 = max(ly, ty * tile), min(ly + height, (ty + 1) * tile)
+            for tx in range(lx // tile, (lx + width - 1) // tile + 1):
+                x0, x1 = max(lx, tx * tile), min(lx + width, (tx + 1) * tile)
+                dst = out[y0 - ly:y1 - ly, x0 - lx:x1 - lx]
+                src = (slice(y0 - ty * tile, y1 - ty * tile), slice(x0 - tx * tile, x1 - tx * tile))
+                key = self._tile_key(wsi.slide_path, level, tx, ty)
+                if not self._paste_if_cached(key, dst, src):
+                    decoded = wsi._read_region_raw((tx * tile * ds, ty * tile * ds), level, (tile, tile))
+                    self._insert(key, decoded)
+                    dst[...] = decoded[src]
+        return out
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the hit, miss and eviction counters of the cache, and its memory usage.
+
+        Returns:
+            Dict[str, int]: counters aggregated over every process using the cache.
+        """
+        with self._lock:
+            used = int(self._counters[4])
+            return {
+                'hits': int(self._counters[0]),
+                'misses': int(self._counters[1]),
+                'evictions': int(self._counters[2]),
+                'used_bytes': used * self.slot_bytes,
+                'budget_bytes': self.n_slots * self.slot_bytes,
+            }
+
+    def clear(self) -> None:
+        """ Drop every cached tile and reset the counters. """
+        with self._lock:
+            self._keys[:] = _EMPTY_KEY
+            self._stamps[:] = 0
+            self._generations += 1
+            self._buckets[:] = -1
+            self._counters[:] = 0
+
+    def close(self) -> None:
+        """ Release the shared memory. The block is unlinked when closed by the process that created it. """
+        if getattr(self, '_shm', None) is None:
+            return
+        self._counters = self._keys = self._stamps = self._generations = self._buckets = self._tiles = None
+        self._shm.close()
+        if os.getpid() == self._owner_pid:
+            self._shm.unlink()
+        self._shm = None
+
+    def __del__(self) -> None:
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __repr__(self) -> str:
+        return f"<SharedTileCache tile_size={self.tile_size}, budget={self.n_slots * self.slot_bytes} bytes>"
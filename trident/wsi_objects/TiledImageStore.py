@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import Callable, Dict, Optional, Tuple
+import cv2
+import numpy as np
+from PIL import Image
+
+
+class TiledImageStore:
+    """
+    Decoded RGB image stored as a grid of square chunks, of shape (n_rows, n_cols, T, T, 3).
+
+    The chunks are either kept in memory or in a `.npy` file opened as a read-only memory map,
+    in which case every process reading the image shares the same OS page cache and repeated
+    runs skip decoding. Reading a patch touches a few contiguous chunks instead of one strided
+    row per pixel line. Downsampled copies of the image (`level`) are built on first use and
+    stored the same way.
+    """
+
+    def __init__(self, chunks: np.ndarray, width: int, height: int, cache_path: Optional[str] = None) -> None:
+        self.chunks = chunks
+        self.width = width
+        self.height = height
+        self.chunk_size = chunks.shape[2]
+        self.cache_path = cache_path
+        self._levels: Dict[int, TiledImageStore] = {1: self}
+
+    @classmethod
+    def from_image(
+        cls,
+        image_path: str,
+        cache_dir: Optional[str] = None,
+        chunk_size: int = 256,
+    ) -> 'TiledImageStore':
+        """
+        Open the chunked copy of an image, decoding it (once) if needed.
+
+        Args:
+            image_path (str): Path to an image readable by PIL.
+            cache_dir (str, optional): Directory of the memory-mapped chunk files. If None, the chunks
+                are kept in memory. Defaults to None.
+            chunk_size (int, optional): Edge in pixels of the chunks. Defaults to 256.
+
+        Returns:
+            TiledImageStore: the chunked image.
+        """
+        cache_path = None if cache_dir is None else cls.cache_path_of(image_path, cache_dir, chunk_size)
+        with Image.open(image_path) as img:
+            width, height = img.size  # header only, no decoding
+            if cache_path is not None and os.path.exists(cache_path):
+                return cls(np.load(cache_path, mmap_mode='r'), width, height, cache_path)
+
+            if cache_dir is not None:
+                os.makedirs(cache_dir, exist_ok=True)
+            rgb = img if img.mode == 'RGB' else img.convert('RGB')
+            return cls._build(
+                width, height, chunk_size, cache_path,
+                lambda y0, y1: np.asarray(rgb.crop((0, y0, width, y1))),
+            )
+
+    @staticmethod
+    def cache_path_of(image_path: str, cache_dir: str, chunk_size: int = 256) -> str:
+        """ Path of the chunk file of an image, keyed on its absolute path, size and modification time. """
+        stat = os.stat(image_path)
+        key = f'{os.path.abspath(image_path)}|{stat.st_size}|{stat.st_mtime_ns}|{chunk_size}'
+        digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+        name = os.path.splitext(os.path.basename(image_path))[0]
+        return os.path.join(cache_dir, f'{name}_{digest}.npy')
+
+    @classmethod
+    def _build(
+        cls,
+        width: int,
+        height: int,
+        chunk_size: int,
+        cache_path: Optional[str],
+        read_rows: Callable[[int, int], np.ndarray],
+    ) -> 'TiledImageStore':
+        """
+        Fill a new chunk grid from `read_rows(y0, y1)`, which returns image rows [y0, y1) as a
+        (y1 - y0, width, 3) array, one strip of chunks at a time to bound peak memory.
+        """
+        shape = (-(-height // chunk_size), -(-width // chunk_size), chunk_size, chunk_size, 3)
+        if cache_path is None:
+            chunks = np.empty(shape, dtype=np.uint8)
+        else:
+            tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+            chunks = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.uint8, shape=shape)
+
+        n_cols = shape[1]
+        try:
+            for row in range(shape[0]):
+                y0, y1 = row * chunk_size, min((row + 1) * chunk_size, height)
+                strip = np.zeros((chunk_size, n_cols * chunk_size, 3), dtype=np.uint8)
+                strip[:y1 - y0, :width] = read_rows(y0, y1)
+                chunks[row] = strip.reshape(chunk_size, n_cols, chunk_size, 3).transpose(1, 0, 2, 3)
+
+            if cache_path is None:
+                return cls(chunks, width, height)
+            chunks.flush()
+            del chunks
+            os.replace(tmp_path, cache_path)  # atomic: concurrent builders never expose a partial file
+        finally:
+            # Interrupted build (e.g., decoding error, KeyboardInterrupt): do not leave the partial file behind
+            if cache_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return cls(np.load(cache_path, mmap_mode='r'), width, height, cache_path)
+
+    def level(self, downsample: int) -> 'TiledImageStore':
+        """
+        Return the image downsampled by an integer factor with area resampling, of size
+        (width // downsample, height // downsample). Built (and persisted next to the
+        level 0 chunk file, if any) on first use.
+        """
+        if downsample not in self._levels:
+            cache_path = None
+            if self.cache_path is not None:
+                cache_path = f'{os.path.splitext(self.cache_path)[0]}_ds{downsample}.npy'
+            width, height = self.width // downsample, self.height // downsample
+            if cache_path is not None and os.path.exists(cache_path):
+                level = TiledImageStore(np.load(cache_path, mmap_mode='r'), width, height, cache_path)
+            else:
+                level = self._build(
+                    width, height, self.chunk_size, cache_path,
+                    lambda y0, y1: self._downsample_rows(downsample, width, y0, y1),
+                )
+            self._levels[downsample] = level
+        return self._levels[downsample]
+
+    def _downsample_rows(self, downsample: int, width: int, y0: int, y1: int, max_band_pixels: int = 2**24) -> np.ndarray:
+        """ Rows [y0, y1) of the image downsampled by `downsample`, reading bounded bands of source rows. """
+        out = np.empty((y1 - y0, width, 3), dtype=np.uint8)
+        step = max(1, max_band_pixels // (3 * width * downsample * downsample))
+        for r0 in range(y0, y1, step):
+            r1 = min(r0 + step, y1)
+            band = self.read_into(0, r0 * downsample, np.empty(((r1 - r0) * downsample, width * downsample, 3), dtype=np.uint8))
+            out[r0 - y0:r1 - y0] = cv2.resize(band, (width, r1 - r0), interpolation=cv2.INTER_AREA)
+        return out
+
+    def read_into(self, x: int, y: int, out: np.ndarray) -> np.ndarray:
+        """
+        Copy the region of `out`'s size whose top-left corner is (x, y) into `out`.
+        Pixels outside of the image are set to 0, like `PIL.Image.crop`.
+        """
+        height, width = out.shape[:2]
+        T = self.chunk_size
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + width, self.width), min(y + height, self.height)
+        if x0 != x or y0 != y or x1 != x + width or y1 != y + height:
+            out[...] = 0
+        if x0 >= x1 or y0 >= y1:
+            return out
+
+        for row in range(y0 // T, (y1 - 1) // T + 1):
+            cy0, cy1 = max(y0, row * T), min(y1, (row + 1) * T)
+            for col in range(x0 // T, (x1 - 1) // T + 1):
+                cx0, cx1 = max(x0, col * T), min(x1, (col + 1) * T)
+                out[cy0 - y:cy1 - y, cx0 - x:cx1 - x] = self.chunks[row, col, cy0 - row * T:cy1 - row * T, cx0 - col * T:cx1 - col * T]
+        return out
+
+    def resize_area(self, size: Tuple[int, int], max_band_pixels: int = 2**24) -> np.ndarray:
+        """
+        Downsample the whole image to `size` (width, height) with area resampling (as `cv2.INTER_AREA`),
+        one band of source rows at a time so that the full-resolution image is never materialized.
+        """
+        width, height = size
+        scale_y = self.height / height
+        band_rows = max(1, max_band_pixels // (self.width * 3))
+
+        # Resize each band horizontally, then spread its rows over the output rows they overlap,
+        # weighted by the overlap (exact for fractional factors, unlike resizing bands independently).
+        acc = np.zeros((height, width, 3), dtype=np.float32)
+        for s0 in range(0, self.height, band_rows):
+            s1 = min(s0 + band_rows, self.height)
+            band = self.read_into(0, s0, np.empty((s1 - s0, self.width, 3), dtype=np.uint8)).astype(np.float32)
+            band = cv2.resize(band, (width, s1 - s0), interpolation=cv2.INTER_AREA)
+            r0, r1 = int(s0 / scale_y), min(int(np.ceil(s1 / scale_y)), height)
+            edges = np.arange(r0, r1 + 1) * scale_y
+            rows = np.arange(s0, s1)
+            weights = np.minimum(edges[1:, None], rows[None, :] + 1) - np.maximum(edges[:-1, None], rows[None, :])
+            acc[r0:r1] += np.tensordot(np.clip(weights, 0, None) / scale_y, band, axes=(1, 0))
+        return np.clip(np.rint(acc), 0, 255).astype(np.uint8)
@@ -2,14 +2,20 @@ from __future__ import annotations
 import numpy as np
 from PIL import Image
 import os 
+import hashlib
 import warnings
 import torch 
-from typing import List, Tuple, Optional, Literal
-from torch.utils.data import DataLoader
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, List, Tuple, Optional, Literal
 from tqdm import tqdm
 
 from trident.wsi_objects.WSIPatcher import *
-from trident.wsi_objects.WSIPatcherDataset import WSIPatcherDataset
+from trident.wsi_objects.WSIPatcherDataset import WSIPatcherDataset, collate_regions
+from trident.wsi_objects.PrefetchLoader import make_patch_dataloader
+from trident.patch_encoder_models.utils.transform_utils import BatchedTransform
+from trident.wsi_objects.TileCache import SharedTileCache
+from trident.wsi_objects.MetadataIndex import SlideMetadataIndex
 from trident.IO import (
     save_h5, read_coords, read_coords_legacy,
     mask_to_gdf, overlay_gdf_on_thumbnail, get_num_workers
@@ -17,6 +23,41 @@ from trident.IO import (
 
 ReadMode = Literal['pil', 'numpy']
 
+# Backend handles opened by unpickled (or forked) WSI objects, one per slide and process.
+# Kept alive across DataLoader epochs and datasets of the same slide.
+_WORKER_HANDLES: Dict[Tuple[str, str], Any] = OrderedDict()
+_WORKER_HANDLES_PID: Optional[int] = None
+_MAX_WORKER_HANDLES = 8
+
+
+def _get_worker_handle(wsi: 'WSI') -> Any:
+    """
+    Return the backend handle of `wsi` for the current process, opening it on first use.
+    """
+    global _WORKER_HANDLES_PID
+    if _WORKER_HANDLES_PID != os.getpid():
+        # Fresh process (or forked child): never reuse handles opened by the parent.
+        _WORKER_HANDLES.clear()
+        _WORKER_HANDLES_PID = os.getpid()
+
+    key = (wsi.__class__.__name__, wsi.slide_path)
+    if key in _WORKER_HANDLES:
+        _WORKER_HANDLES.move_to_end(key)
+    else:
+        _WORKER_HANDLES[key] = wsi._open_handle()
+        if len(_WORKER_HANDLES) > _MAX_WORKER_HANDLES:
+            _WORKER_HANDLES.popitem(last=False)
+    return _WORKER_HANDLES[key]
+
+
+def _drop_worker_handle(wsi: 'WSI') -> None:
+    """
+    Remove the pooled handle of `wsi` (if any), e.g., before the slide is closed.
+    """
+    if _WORKER_HANDLES_PID == os.getpid():
+        _WORKER_HANDLES.pop((wsi.__class__.__name__, wsi.slide_path), None)
+
+
 
 class WSI:
     """
@@ -59,8 +100,24 @@ class WSI:
         Backend-specific image object used for reading regions (set during lazy initialization).
     gdf_contours : geopandas.GeoDataFrame
         Tissue segmentation mask as a GeoDataFrame, if available (set during lazy initialization).
+    tile_cache : SharedTileCache
+        Optional cache of decoded tiles shared across DataLoader workers.
+    metadata_index : SlideMetadataIndex
+        Optional persistent index used to restore the metadata without opening the slide.
+    thumbnail_cache_dir : str
+        Optional directory where thumbnails and low-resolution level images are persisted.
+
+    Notes
+    -----
+    WSI objects pickle as their path and metadata only. The backend handle is reopened lazily
+    in each process that unpickles (or forks) the object, and cached once per process, so that
+    `WSIPatcherDataset` works with the `spawn`/`forkserver` start methods and `persistent_workers`.
     """
 
+    _img = None
+    _img_pid = None
+    _reopen_handle = False
+
     def __init__(
         self,
         slide_path: str,
@@ -70,6 +127,9 @@ class WSI:
         lazy_init: bool = True,
         mpp: Optional[float] = None,
         max_workers: Optional[int] = None,
+        tile_cache: Optional[SharedTileCache] = None,
+        metadata_index: Optional[SlideMetadataIndex] = None,
+        thumbnail_cache_dir: Optional[str] = None,
     ):
         """
         Initialize the `WSI` object for working with a Whole Slide Image (WSI).
@@ -89,6 +149,15 @@ class WSI:
         mpp: float, optional
             If not None, will be the reference micron per pixel (mpp). Handy when mpp is not provided in the WSI.
         max_workers (Optional[int]): Maximum number of workers for data loading
+        tile_cache : SharedTileCache, optional
+            Shared cache of decoded tiles used by `read_region`. Defaults to None (no caching).
+        metadata_index : SlideMetadataIndex, optional
+            Persistent metadata index. If the slide is indexed (same path, size and modification time), 
+            its metadata is restored from the index and the slide is only opened on the first pixel read.
+            Otherwise, the metadata read from the slide is added to the index. Defaults to None.
+        thumbnail_cache_dir : str, optional
+            Directory where thumbnails and low-resolution level images are persisted, so that they are
+            generated once across pipeline stages and runs. They are always cached in memory. Defaults to None.
 
         """
         self.slide_path = slide_path
@@ -101,15 +170,60 @@ class WSI:
 
         self.width, self.height = None, None  # Placeholder dimensions
         self.mpp = mpp  # Placeholder microns per pixel. Defaults will be None unless specified in constructor. 
+        self._mpp_override = mpp
         self.mag = None  # Placeholder magnification
         self.lazy_init = lazy_init  # Initialize immediately if lazy_init is False
         self.max_workers = max_workers
+        self.tile_cache = tile_cache
+        self.metadata_index = metadata_index
+        self.thumbnail_cache_dir = thumbnail_cache_dir
+        self._thumbnails: Dict[Tuple[int, int], Image.Image] = {}
+        self._level_images: Dict[int, np.ndarray] = {}
 
         if not self.lazy_init:
             self._lazy_initialize()
         else: 
             self.lazy_init = not self.lazy_init
 
+    @property
+    def img(self) -> Any:
+        img = self._img
+        if img is not None and self._img_pid != os.getpid():
+            # Handle inherited through fork: not safe to share with the parent.
+            img = self._img = None
+            self._reopen_handle = True
+        if img is None and self._reopen_handle:
+            img = self._img = _get_worker_handle(self)
+            self._img_pid = os.getpid()
+        return img
+
+    @img.setter
+    def img(self, value: Any) -> None:
+        self._img = value
+        self._img_pid = os.getpid()
+        self._reopen_handle = False
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state['_img'] = None
+        state['_img_pid'] = None
+        state['_thumbnails'], state['_level_images'] = {}, {}  # not needed by DataLoader workers
+        # Only reopen if the slide was initialized, otherwise `_lazy_initialize` takes care of it.
+        state['_reopen_handle'] = (bool(self.lazy_init) and self._img is not None) or self._reopen_handle
+        if isinstance(state.get('properties'), Mapping) and not isinstance(state['properties'], dict):
+            state['properties'] = dict(state['properties'])  # e.g., OpenSlide property maps hold C pointers
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+
+    def _open_handle(self) -> Any:
+        """
+        Open a new backend handle on `slide_path`. Used to reopen the slide in DataLoader workers.
+        Must be implemented by subclasses.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} cannot reopen its slide handle.")
+
     def __repr__(self) -> str:
         if self.lazy_init:
             return f"<width={self.width}, height={self.height}, backend={self.__class__.__name__}, mpp={self.mpp}, mag={self.mag}>"
@@ -136,6 +250,9 @@ class WSI:
         - `level_count`, `level_downsamples`, `level_dimensions`: multiresolution placeholders (None).
         - `properties`, `mag`: metadata and magnification (None).
         - `gdf_contours`: loaded from `tissue_seg_path` if available.
+
+        If the slide is found in `metadata_index`, all metadata attributes are restored from it and
+        `lazy_init` is set, so that subclasses skip opening the slide.
         """
 
         if not self.lazy_init:
@@ -152,6 +269,144 @@ class WSI:
                     self.gdf_contours = gpd.read_file(self.tissue_seg_path)
                 except FileNotFoundError:
                     raise FileNotFoundError(f"Tissue segmentation file not found: {self.tissue_seg_path}")
+            if self.metadata_index is not None:
+                self._restore_metadata()
+
+    def _metadata_options(self) -> Dict[str, Any]:
+        """ Constructor options changing the metadata of the slide, part of the metadata index key. """
+        return {'mpp': self._mpp_override, 'custom_mpp_keys': self.custom_mpp_keys}
+
+    def _restore_metadata(self) -> bool:
+        """
+        Restore the metadata attributes from `metadata_index`. The backend handle is opened
+        lazily, on first access to `img`. Returns False if the slide is not indexed.
+        """
+        metadata = self.metadata_index.get(self.slide_path, self.__class__.__name__, self._metadata_options())
+        if metadata is None:
+            return False
+        self.dimensions = tuple(metadata['dimensions'])
+        self.width, self.height = self.dimensions
+        self.level_count = metadata['level_count']
+        self.level_downsamples = tuple(metadata['level_downsamples'])
+        self.level_dimensions = tuple(tuple(dims) for dims in metadata['level_dimensions'])
+        self.properties = metadata['properties']
+        self.mpp = metadata['mpp']
+        self.mag = metadata['mag']
+        self._reopen_handle = True
+        self.lazy_init = True
+        return True
+
+    def _record_metadata(self) -> None:
+        """
+        Add the metadata of the freshly opened slide to `metadata_index`. Called by subclasses
+        at the end of `_lazy_initialize`.
+        """
+        if self.metadata_index is None:
+            return
+        properties = self.properties
+        if isinstance(properties, Mapping) and not isinstance(properties, dict):
+            properties = dict(properties)
+        self.metadata_index.put(
+            self.slide_path,
+            self.__class__.__name__,
+            self._metadata_options(),
+            {
+                'dimensions': list(self.dimensions),
+                'level_count': self.level_count,
+                'level_downsamples': [float(ds) if not float(ds).is_integer() else int(ds) for ds in self.level_downsamples],
+                'level_dimensions': [list(dims) for dims in self.level_dimensions],
+                'properties': properties,
+                'mpp': self.mpp,
+                'mag': self.mag,
+            },
+        )
+
+    def get_cached_thumbnail(self, size: Tuple[int, int]) -> Image.Image:
+        """
+        The `get_cached_thumbnail` function of the class `WSI` returns a thumbnail of the WSI like
+        `get_thumbnail`, but generates it only once per slide: thumbnails are cached in memory (and
+        in `thumbnail_cache_dir` if set), and smaller sizes are area-resampled from a cached larger one.
+        Segmentation, patch visualization and contour overlays all go through this cache.
+
+        Args:
+        -----
+        size : Tuple[int, int]
+            Desired (width, height) of the thumbnail.
+
+        Returns:
+        --------
+        Image.Image:
+            The RGB thumbnail. Must not be modified in place.
+
+        Example:
+        --------
+        >>> thumb = wsi.get_cached_thumbnail((1000, 800))  # slow
+        >>> thumb = wsi.get_cached_thumbnail((500, 400))  # instantaneous
+        """
+        size = (int(size[0]), int(size[1]))
+        if size in self._thumbnails:
+            return self._thumbnails[size]
+
+        cache_path = self._thumbnail_cache_path(f'thumb_{size[0]}x{size[1]}.png')
+        larger = [s for s in self._thumbnails if s[0] >= size[0] and s[1] >= size[1]]
+        if cache_path is not None and os.path.exists(cache_path):
+            thumbnail = Image.open(cache_path).convert('RGB')
+        elif larger:
+            source = np.asarray(self._thumbnails[min(larger)])
+            thumbnail = Image.fromarray(cv2.resize(source, size, interpolation=cv2.INTER_AREA))
+        else:
+            self._lazy_initialize()
+            thumbnail = self.get_thumbnail(size)
+            if cache_path is not None:
+                thumbnail.save(cache_path)
+
+        self._thumbnails[size] = thumbnail
+        return thumbnail
+
+    def get_level_image(self, level: int) -> np.ndarray:
+        """
+        The `get_level_image` function of the class `WSI` reads a whole (low-resolution) pyramid level
+        as an RGB array. The last level read is cached in memory, and all levels in `thumbnail_cache_dir`
+        if set, so that e.g. several heatmaps of the same slide read the level once.
+
+        Args:
+        -----
+        level : int
+            Pyramid level to read.
+
+        Returns:
+        --------
+        np.ndarray:
+            Array of shape (height, width, 3) of the level. Must not be modified in place.
+
+        Example:
+        --------
+        >>> img = wsi.get_level_image(wsi.level_count - 1)
+        """
+        if level not in self._level_images:
+            self._lazy_initialize()
+            cache_path = self._thumbnail_cache_path(f'level{level}.npy')
+            if cache_path is not None and os.path.exists(cache_path):
+                image = np.load(cache_path, mmap_mode='r')
+            else:
+                image = self.read_region((0, 0), level, self.level_dimensions[level], read_as='numpy')
+                if cache_path is not None:
+                    np.save(cache_path, image)
+            self._level_images = {level: image}  # keep a single (possibly large) level in memory
+        return self._level_images[level]
+
+    def _thumbnail_cache_path(self, suffix: str) -> Optional[str]:
+        """ Path of a file of `thumbnail_cache_dir`, keyed on the slide path, size and modification time. """
+        if self.thumbnail_cache_dir is None:
+            return None
+        try:
+            stat = os.stat(self.slide_path)
+        except OSError:  # e.g., remote slide
+            return None
+        key = f'{os.path.abspath(self.slide_path)}|{stat.st_size}|{stat.st_mtime_ns}|{self.__class__.__name__}'
+        digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+        os.makedirs(self.thumbnail_cache_dir, exist_ok=True)
+        return os.path.join(self.thumbnail_cache_dir, f'{self.name}_{digest}_{suffix}')
 
     def create_patcher(
         self, 
@@ -166,6 +421,11 @@ class WSI:
         custom_coords:  Optional[np.ndarray] = None,
         threshold: float = 0.15,
         pil: bool = False,
+        mask_mode: str = 'geometry',
+        stream: bool = False,
+        order: str = 'column',
+        region_size: Optional[int] = None,
+        rescale: bool = True,
     ) -> WSIPatcher:
         """
         The `create_patcher` function from the class `WSI` Create a patcher object for extracting patches from the WSI.
@@ -179,6 +439,16 @@ class WSI:
         dst_pixel_size : float, optional
             Destination pixel size. Defaults to None.
         ...
+        mask_mode : str, optional
+            'geometry' (exact polygon intersection) or 'raster' (rasterized mask, faster). Defaults to 'geometry'.
+        stream : bool, optional
+            Only generate the valid coordinates chunk by chunk with `iter_valid_coords`. Defaults to False.
+        order : str, optional
+            Order of the patches: 'column' (column by column), 'row' (row by row) or 'hilbert' (along a Hilbert curve). Defaults to 'column'.
+        region_size : int, optional
+            Group the patches into regions of this size at the read level, each read at once (see `WSIPatcher.get_region_tiles`). Defaults to None.
+        rescale : bool, optional
+            Rescale the tiles to `patch_size`. If False, tiles are returned at the read level, for the consumer to resample them once. Defaults to True.
 
         Returns:
         --------
@@ -193,9 +463,122 @@ class WSI:
         """
         return WSIPatcher(
             self, patch_size, src_pixel_size, dst_pixel_size, src_mag, dst_mag,
-            overlap, mask, coords_only, custom_coords, threshold, pil
+            overlap, mask, coords_only, custom_coords, threshold, pil,
+            mask_mode=mask_mode, stream=stream, order=order, region_size=region_size, rescale=rescale,
         )
-    
+
+    def read_regions(
+        self,
+        coords: np.ndarray,
+        level: int,
+        size: Tuple[int, int],
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        The `read_regions` function of the class `WSI` reads several regions of the same size
+        and level into a single preallocated `(N, H, W, 3)` uint8 array. This generic implementation
+        reads one region at a time through `read_region`; backends override it with faster paths.
+
+        Args:
+        -----
+        coords : np.ndarray
+            (N, 2) array of (x, y) top-left coordinates in the level 0 reference frame.
+        level : int
+            Pyramid level to read from.
+        size : Tuple[int, int]
+            (width, height) of each region at the requested level.
+        out : np.ndarray, optional
+            Preallocated uint8 array of shape (N, height, width, 3) to write into. Defaults to None (allocated).
+
+        Returns:
+        --------
+        np.ndarray:
+            Array of shape (N, height, width, 3) holding the RGB regions.
+
+        Example:
+        --------
+        >>> regions = wsi.read_regions([(0, 0), (512, 0)], level=0, size=(256, 256))
+        >>> print(regions.shape)
+        (2, 256, 256, 3)
+        """
+        coords = np.asarray(coords)
+        out = self._prepare_regions_buffer(len(coords), size, out)
+        for i, (x, y) in enumerate(coords):
+            self.read_region_into((int(x), int(y)), level, size, out[i])
+        return out
+
+    def read_region_into(
+        self,
+        location: Tuple[int, int],
+        level: int,
+        size: Tuple[int, int],
+        out: np.ndarray,
+    ) -> np.ndarray:
+        """
+        The `read_region_into` function of the class `WSI` reads an RGB region straight into a
+        caller-owned `(H, W, 3)` uint8 buffer (e.g., a slice of a pinned or shared-memory batch),
+        avoiding the intermediate PIL images and arrays of `read_region`.
+
+        Args:
+        -----
+        location : Tuple[int, int]
+            (x, y) top-left coordinates in the level 0 reference frame.
+        level : int
+            Pyramid level to read from.
+        size : Tuple[int, int]
+            (width, height) of the region at the requested level.
+        out : np.ndarray
+            uint8 array of shape (height, width, 3) to write into. Can be a non-contiguous view.
+
+        Returns:
+        --------
+        np.ndarray:
+            `out`, filled with the RGB region.
+
+        Example:
+        --------
+        >>> batch = np.empty((16, 256, 256, 3), dtype=np.uint8)
+        >>> wsi.read_region_into((1024, 2048), level=0, size=(256, 256), out=batch[0])
+        """
+        width, height = size
+        if out.shape != (height, width, 3) or out.dtype != np.uint8:
+            raise ValueError(
+                f"`out` must be a uint8 array of shape {(height, width, 3)}, "
+                f"got {out.dtype} array of shape {out.shape}."
+            )
+        if self.tile_cache is not None:
+            self.tile_cache.read_region(self, location, level, size, out=out)
+        else:
+            self._read_region_raw_into(location, level, size, out)
+        return out
+
+    def _read_region_numpy(self, location: Tuple[int, int], level: int, size: Tuple[int, int]) -> np.ndarray:
+        """ Read an RGB region as a (H, W, 3) uint8 array, through the tile cache if one is attached. """
+        if self.tile_cache is not None:
+            return self.tile_cache.read_region(self, location, level, size)
+        return self._read_region_raw(location, level, size)
+
+    def _read_region_raw(self, location: Tuple[int, int], level: int, size: Tuple[int, int]) -> np.ndarray:
+        """ Decode an RGB region as a (H, W, 3) uint8 array with the backend, bypassing any cache. Implemented by subclasses. """
+        raise NotImplementedError
+
+    def _read_region_raw_into(self, location: Tuple[int, int], level: int, size: Tuple[int, int], out: np.ndarray) -> None:
+        """ Decode an RGB region into `out`, bypassing any cache. Backends override it to skip the intermediate array. """
+        out[...] = self._read_region_raw(location, level, size)
+
+    @staticmethod
+    def _prepare_regions_buffer(n: int, size: Tuple[int, int], out: Optional[np.ndarray]) -> np.ndarray:
+        """ Allocate (or validate) the (N, H, W, 3) uint8 output buffer of `read_regions`. """
+        width, height = size
+        if out is None:
+            return np.empty((n, height, width, 3), dtype=np.uint8)
+        if out.shape != (n, height, width, 3) or out.dtype != np.uint8:
+            raise ValueError(
+                f"`out` must be a uint8 array of shape {(n, height, width, 3)}, "
+                f"got {out.dtype} array of shape {out.shape}."
+            )
+        return out
+
     def _fetch_magnification(self, custom_mpp_keys: Optional[List[str]] = None) -> int:
         """
         The `_fetch_magnification` function of the class `WSI` calculates the magnification level 
@@ -293,16 +676,21 @@ class WSI:
 
         self._lazy_initialize()
         segmentation_model.to(device)
-        max_dimension = 1000
-        if self.width > self.height:
-            thumbnail_width = max_dimension
-            thumbnail_height = int(thumbnail_width * self.height / self.width)
-        else:
-            thumbnail_height = max_dimension
-            thumbnail_width = int(thumbnail_height * self.width / self.height)
-        thumbnail = self.get_thumbnail((thumbnail_width, thumbnail_height))
+        dataset, predicted_mask, mpp_reduction_factor = self._prepare_segmentation(segmentation_model, target_mag)
+        # Without worker processes, batches are prefetched by threads instead (see `ThreadedPrefetchLoader`)
+        dataloader = make_patch_dataloader(dataset, batch_size=batch_size, num_workers=get_num_workers(batch_size, max_workers=self.max_workers), pin_memory=True)
+        dataloader = tqdm(dataloader) if verbose else dataloader
+
+        for imgs, (xcoords, ycoords) in dataloader:
+            self._segment_batch(segmentation_model, imgs, xcoords, ycoords, predicted_mask, mpp_reduction_factor, device)
+
+        return self._save_segmentation(predicted_mask, mpp_reduction_factor, holes_are_tissue, job_dir)
 
-        # Get patch iterator
+    def _prepare_segmentation(self, segmentation_model: torch.nn.Module, target_mag: int) -> Tuple[WSIPatcherDataset, np.ndarray, float]:
+        """
+        Patch dataset of `segment_tissue` at `target_mag`, with the empty mask its predictions are accumulated into
+        and the mpp reduction factor from level 0 to the mask.
+        """
         destination_mpp = 10 / target_mag
         patcher = self.create_patcher(
             patch_size = segmentation_model.input_size,
@@ -310,38 +698,56 @@ class WSI:
             dst_pixel_size = destination_mpp,
             mask=self.gdf_contours if hasattr(self, "gdf_contours") else None
         )
-        precision = segmentation_model.precision
-        eval_transforms = segmentation_model.eval_transforms
-        dataset = WSIPatcherDataset(patcher, eval_transforms)
-        dataloader = DataLoader(dataset, batch_size=batch_size, num_workers=get_num_workers(batch_size, max_workers=self.max_workers), pin_memory=True)
-        # dataloader = DataLoader(dataset, batch_size=batch_size, num_workers=0, pin_memory=True)
+        dataset = WSIPatcherDataset(patcher, segmentation_model.eval_transforms)
 
         mpp_reduction_factor = self.mpp / destination_mpp
         width, height = self.get_dimensions()
         width, height = int(round(width * mpp_reduction_factor)), int(round(height * mpp_reduction_factor))
         predicted_mask = np.zeros((height, width), dtype=np.uint8)
+        return dataset, predicted_mask, mpp_reduction_factor
 
-        dataloader = tqdm(dataloader) if verbose else dataloader
-
-        for imgs, (xcoords, ycoords) in dataloader:
-
-            imgs = imgs.to(device, dtype=precision)  # Move to device and match dtype
-            with torch.autocast(device_type=device.split(":")[0], dtype=precision, enabled=(precision != torch.float32)):
-                preds = segmentation_model(imgs).cpu().numpy()
-
-            x_starts = np.clip(np.round(xcoords.numpy() * mpp_reduction_factor).astype(int), 0, width - 1) # clip for starts
-            y_starts = np.clip(np.round(ycoords.numpy() * mpp_reduction_factor).astype(int), 0, height - 1)
-            x_ends = np.clip(x_starts + segmentation_model.input_size, 0, width)
-            y_ends = np.clip(y_starts + segmentation_model.input_size, 0, height)
-            
-            for i in range(len(preds)):
-                x_start, x_end = x_starts[i], x_ends[i]
-                y_start, y_end = y_starts[i], y_ends[i]
-                if x_start >= x_end or y_start >= y_end: # invalid patch
-                    continue
-                patch_pred = preds[i][:y_end - y_start, :x_end - x_start]
-                predicted_mask[y_start:y_end, x_start:x_end] += patch_pred
+    @torch.inference_mode()
+    def _segment_batch(
+        self,
+        segmentation_model: torch.nn.Module,
+        imgs: torch.Tensor,
+        xcoords: torch.Tensor,
+        ycoords: torch.Tensor,
+        predicted_mask: np.ndarray,
+        mpp_reduction_factor: float,
+        device: str,
+    ) -> None:
+        """ Segment a batch of patches of `segment_tissue` and add the predictions to `predicted_mask` """
+        precision = segmentation_model.precision
+        height, width = predicted_mask.shape
+        imgs = imgs.to(device, dtype=precision)  # Move to device and match dtype
+        with torch.autocast(device_type=device.split(":")[0], dtype=precision, enabled=(precision != torch.float32)):
+            preds = segmentation_model(imgs).cpu().numpy()
+
+        x_starts = np.clip(np.round(xcoords.numpy() * mpp_reduction_factor).astype(int), 0, width - 1) # clip for starts
+        y_starts = np.clip(np.round(ycoords.numpy() * mpp_reduction_factor).astype(int), 0, height - 1)
+        x_ends = np.clip(x_starts + segmentation_model.input_size, 0, width)
+        y_ends = np.clip(y_starts + segmentation_model.input_size, 0, height)
         
+        for i in range(len(preds)):
+            x_start, x_end = x_starts[i], x_ends[i]
+            y_start, y_end = y_starts[i], y_ends[i]
+            if x_start >= x_end or y_start >= y_end: # invalid patch
+                continue
+            patch_pred = preds[i][:y_end - y_start, :x_end - x_start]
+            predicted_mask[y_start:y_end, x_start:x_end] += patch_pred
+
+    def _save_segmentation(self, predicted_mask: np.ndarray, mpp_reduction_factor: float, holes_are_tissue: bool, job_dir: str) -> str:
+        """ Post-process the mask accumulated by `segment_tissue`, save the thumbnail and contours, and return the GeoJSON path """
+        max_dimension = 1000
+        if self.width > self.height:
+            thumbnail_width = max_dimension
+            thumbnail_height = int(thumbnail_width * self.height / self.width)
+        else:
+            thumbnail_height = max_dimension
+            thumbnail_width = int(thumbnail_height * self.width / self.height)
+        thumbnail = self.get_cached_thumbnail((thumbnail_width, thumbnail_height))
+
         # Post-process the mask
         predicted_mask = (predicted_mask > 0).astype(np.uint8) * 255
 
@@ -448,11 +854,16 @@ class WSI:
         save_coords: str,
         overlap: int = 0,
         min_tissue_proportion: float  = 0.,
+        mask_mode: str = 'geometry',
+        chunk_size: int = 2**18,
+        tissue_mask: Optional[PreparedTissueMask] = None,
+        order: str = 'column',
     ) -> str:
         """
         The `extract_tissue_coords` function of the class `WSI` extracts patch coordinates 
         from tissue regions in the WSI. It generates coordinates of patches at the specified 
-        magnification and saves the results in an HDF5 file.
+        magnification and saves the results in an HDF5 file. The grid is generated, masked and
+        written chunk by chunk, so that memory stays bounded whatever the slide size or overlap.
 
         Args:
         -----
@@ -466,6 +877,19 @@ class WSI:
             Overlap between patches in pixels. Defaults to 0.
         min_tissue_proportion: float, optional 
             Minimum proportion of the patch under tissue to be kept. Defaults to 0. 
+        mask_mode: str, optional
+            How patches are intersected with the tissue contours: 'geometry' (exact polygon intersection)
+            or 'raster' (tissue proportion read from a rasterized mask, faster on large slides). Defaults to 'geometry'.
+        chunk_size: int, optional
+            Maximum number of grid patches generated and masked at once. Defaults to 2**18.
+        tissue_mask: PreparedTissueMask, optional
+            Prepared `gdf_contours`, shared between calls at several settings so that the contours are 
+            simplified, indexed or rasterized only once. Defaults to None (prepared for this call only).
+        order: str, optional
+            Order of the saved patches: 'column' (column by column), 'row' (row by row, like the tiles of pyramidal 
+            TIFF files) or 'hilbert' (along a Hilbert curve). Reading patches in 'row' or 'hilbert' order keeps consecutive 
+            batches close on the slide. Unless 'column', the position of each patch in the column by column order is 
+            saved in the `grid_index` dataset: `coords[np.argsort(grid_index)]` restores that order. Defaults to 'column'.
 
         Returns:
         --------
@@ -485,16 +909,16 @@ class WSI:
             patch_size=patch_size,
             src_mag=self.mag,
             dst_mag=target_mag,
-            mask=self.gdf_contours,
+            mask=tissue_mask if tissue_mask is not None else self.gdf_contours,
             coords_only=True,
             overlap=overlap,
             threshold=min_tissue_proportion,
+            mask_mode=mask_mode,
+            stream=True,
+            order=order,
         )
 
-        coords_to_keep = [(x, y) for x, y in patcher]
-
-        # Prepare assets for saving
-        assets = {'coords' : np.array(coords_to_keep)}
+        # Prepare attributes for saving
         attributes = {
             'patch_size': patch_size, # Reference frame: patch_level
             'patch_size_level0': patch_size * self.mag // target_mag, # Reference frame: level0
@@ -502,16 +926,34 @@ class WSI:
             'target_magnification': target_mag,
             'overlap': overlap,
             'name': self.name,
-            'savetodir': save_coords
+            'savetodir': save_coords,
+            'patch_order': order,
         }
 
-        # Save the assets and attributes to an hdf5 file
+        # Save the coords chunk by chunk and the attributes to an hdf5 file, 
+        # renamed once complete so that an interrupted job does not leave a truncated file behind
         os.makedirs(os.path.join(save_coords, 'patches'), exist_ok=True)
         out_fname = os.path.join(save_coords, 'patches', str(self.name) + '_patches.h5')
-        save_h5(out_fname,
-                assets = assets,
-                attributes = {'coords': attributes},
-                mode='w')
+        tmp_fname = out_fname + '.partial'
+        mode = 'w'
+        for coords, grid_index in patcher.iter_valid_coords(chunk_size, return_index=True):
+            assets = {'coords': coords} if order == 'column' else {'coords': coords, 'grid_index': grid_index}
+            save_h5(tmp_fname,
+                    assets = assets,
+                    attributes = {'coords': attributes},
+                    mode=mode,
+                    chunk_rows=4096)
+            mode = 'a'
+        if mode == 'w':  # no patch on tissue
+            assets = {'coords': np.zeros((0, 2), dtype=np.int64)}
+            if order != 'column':
+                assets['grid_index'] = np.zeros((0,), dtype=np.int64)
+            save_h5(tmp_fname,
+                    assets = assets,
+                    attributes = {'coords': attributes},
+                    mode=mode,
+                    chunk_rows=4096)
+        os.replace(tmp_fname, out_fname)
         
         return out_fname
 
@@ -581,7 +1023,9 @@ class WSI:
         save_features: str,
         device: str = 'cuda:0',
         saveas: str = 'h5',
-        batch_limit: int = 512
+        batch_limit: int = 512,
+        region_size: Optional[int] = None,
+        batch_transforms: bool = False,
     ) -> str:
         """
         The `extract_patch_features` function of the class `WSI` extracts feature embeddings 
@@ -602,6 +1046,16 @@ class WSI:
             Format to save the features ('h5' or 'pt'). Defaults to 'h5'.
         batch_limit : int, optional
             Maximum batch size for feature extraction. Defaults to 512.
+        region_size : int, optional
+            Read the slide by regions of this size in pixels at the read level (e.g., 2048 or 4096) instead of patch 
+            by patch: each region is read with a single call and cut into all the patches it contains, which is much 
+            faster on high-latency storage. Batches then hold whole regions (at least one). Defaults to None.
+        batch_transforms : bool, optional
+            Load the patches as raw uint8 tiles, and apply the encoder's `eval_transforms` (resize, crop, normalize) 
+            once per batch on `device` (see `BatchedTransform`), instead of tile by tile in the loading workers. 
+            Loading workers then send 4x fewer bytes. Tiles are sent as read from the slide, and the rescale to `patch_size`
+            is folded into the encoder's resize: a single resampling from the read level to the encoder input size, none
+            if they coincide. Raises a ValueError if the transforms cannot be batched. Defaults to False.
 
         Returns:
         --------
@@ -618,7 +1072,33 @@ class WSI:
         self._lazy_initialize()
         patch_encoder.to(device)
         patch_encoder.eval()
-        precision = getattr(patch_encoder, 'precision', torch.float32)
+        dataset, batch_size, collate_fn, batch_transform, coords, coords_attrs = self._prepare_patch_features(
+            patch_encoder, coords_path, batch_limit, region_size, batch_transforms
+        )
+        # Without worker processes, batches are prefetched by threads instead (see `ThreadedPrefetchLoader`)
+        dataloader = make_patch_dataloader(
+            dataset, batch_size=batch_size, num_workers=get_num_workers(batch_limit, max_workers=self.max_workers), pin_memory=True, collate_fn=collate_fn
+        )
+
+        features = []
+        for imgs, _ in dataloader:
+            features.append(self._encode_patch_batch(patch_encoder, imgs, batch_transform, device))
+
+        return self._save_patch_features(features, dataset.patcher, coords, coords_attrs, save_features, saveas)
+
+    def _prepare_patch_features(
+        self,
+        patch_encoder: torch.nn.Module,
+        coords_path: str,
+        batch_limit: int,
+        region_size: Optional[int],
+        batch_transforms: bool,
+    ) -> Tuple[WSIPatcherDataset, int, Optional[Callable], Optional[BatchedTransform], np.ndarray, Dict[str, Any]]:
+        """
+        Patch dataset of `extract_patch_features` for the coords of `coords_path`, with its batch size and collate function,
+        the batched transform to apply to its batches (None if the dataset applies the encoder transforms), the coords and
+        their attributes.
+        """
         patch_transforms = patch_encoder.eval_transforms
 
         try:
@@ -634,27 +1114,66 @@ class WSI:
             level0_magnification = self.mag
             target_magnification = int(self.mag / (self.level_downsamples[patch_level] * custom_downsample))
 
+        # Batched transforms run on uint8 tiles in the consumer, per-tile transforms on PIL images in the workers.
+        # Batched transforms also take over the rescale of the tiles, merged with the encoder's resize.
+        if batch_transforms and not BatchedTransform.supports(patch_transforms):
+            warnings.warn(
+                f"The transforms of {type(patch_encoder).__name__} cannot be batched (see `BatchedTransform`). "
+                "Falling back to per-tile transforms."
+            )
+            batch_transforms = False
+        batch_transform = BatchedTransform(patch_transforms, input_size=(patch_size, patch_size)) if batch_transforms else None
         patcher = self.create_patcher(
             patch_size=patch_size,
             src_mag=level0_magnification,
             dst_mag=target_magnification,
             custom_coords=coords,
             coords_only=False,
-            pil=True,
+            pil=not batch_transforms,
+            region_size=region_size,
+            rescale=not batch_transforms,
         )
-        dataset = WSIPatcherDataset(patcher, patch_transforms)
-        dataloader = DataLoader(dataset, batch_size=batch_limit, num_workers=get_num_workers(batch_limit, max_workers=self.max_workers), pin_memory=True)
-        # dataloader = DataLoader(dataset, batch_size=batch_limit, num_workers=0, pin_memory=True)
-
-        features = []
-        for imgs, _ in dataloader:
-            imgs = imgs.to(device)
-            with torch.autocast(device_type='cuda', dtype=precision, enabled=(precision != torch.float32)):
-                batch_features = patch_encoder(imgs)  
-            features.append(batch_features.cpu().numpy())
+        dataset = WSIPatcherDataset(patcher, None if batch_transforms else patch_transforms)
+        if region_size is None:
+            batch_size, collate_fn = batch_limit, None
+        else:
+            # As many whole regions as fit in batch_limit patches
+            max_region_patches = max((len(members) for _, _, members, _ in patcher.regions), default=1)
+            batch_size, collate_fn = max(1, batch_limit // max_region_patches), collate_regions
+        return dataset, batch_size, collate_fn, batch_transform, coords, coords_attrs
 
+    @torch.inference_mode()
+    def _encode_patch_batch(
+        self,
+        patch_encoder: torch.nn.Module,
+        imgs: torch.Tensor,
+        batch_transform: Optional[BatchedTransform],
+        device: str,
+    ) -> np.ndarray:
+        """ Features of a batch of patches of `extract_patch_features` """
+        precision = getattr(patch_encoder, 'precision', torch.float32)
+        imgs = imgs.to(device)
+        if batch_transform is not None:
+            imgs = batch_transform(imgs)
+        with torch.autocast(device_type='cuda', dtype=precision, enabled=(precision != torch.float32)):
+            batch_features = patch_encoder(imgs)  
+        return batch_features.cpu().numpy()
+
+    def _save_patch_features(
+        self,
+        features: List[np.ndarray],
+        patcher: WSIPatcher,
+        coords: np.ndarray,
+        coords_attrs: Dict[str, Any],
+        save_features: str,
+        saveas: str,
+    ) -> str:
+        """ Save the batches of features of `extract_patch_features`, in the order of the coords, and return the file path """
         # Concatenate features
         features = np.concatenate(features, axis=0)
+        if patcher.region_size is not None:
+            # Patches were read region by region: back to the order of the coords
+            features = features[np.argsort(patcher.region_order)]
 
         # Save the features to disk
         os.makedirs(save_features, exist_ok=True)
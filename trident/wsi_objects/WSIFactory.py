@@ -1,40 +1,48 @@
 
 import os
 from typing import Optional, Literal, Union
+from urllib.parse import urlsplit
 
 from trident.wsi_objects.OpenSlideWSI import OpenSlideWSI
 from trident.wsi_objects.ImageWSI import ImageWSI
 from trident.wsi_objects.CuCIMWSI import CuCIMWSI
+from trident.wsi_objects.TiffFileWSI import TiffFileWSI
+from trident.wsi_objects.RangeReader import is_remote_path
 
-WSIReaderType = Literal['openslide', 'image', 'cucim']
+WSIReaderType = Literal['openslide', 'image', 'cucim', 'tifffile']
 OPENSLIDE_EXTENSIONS = {'.svs', '.tif', '.tiff', '.ndpi', '.vms', '.vmu', '.scn', '.mrxs'}
 CUCIM_EXTENSIONS = {'.svs', '.tif', '.tiff'}
+TIFFFILE_EXTENSIONS = {'.svs', '.tif', '.tiff'}
 
 def load_wsi(
     slide_path: str,
     reader_type: Optional[WSIReaderType] = None,
+    image_cache_dir: Optional[str] = None,
     **kwargs
-) -> Union[OpenSlideWSI, ImageWSI, CuCIMWSI]:
+) -> Union[OpenSlideWSI, ImageWSI, CuCIMWSI, TiffFileWSI]:
     """
     Load a whole-slide image (WSI) using the appropriate backend.
 
     By default, uses OpenSlideWSI for OpenSlide-supported file extensions,
-    and ImageWSI for others. Users may override this behavior by explicitly
+    TiffFileWSI for http(s) URLs (read with range requests), and ImageWSI for others. Users may override this behavior by explicitly
     specifying a reader using the `reader_type` argument.
 
     Parameters
     ----------
     slide_path : str
-        Path to the whole-slide image.
-    reader_type : {'openslide', 'image', 'cucim'}, optional
+        Path (or http(s) URL) of the whole-slide image.
+    reader_type : {'openslide', 'image', 'cucim', 'tifffile'}, optional
         Manually specify the WSI reader to use. If None (default), selection
         is automatic based on file extension.
+    image_cache_dir : str, optional
+        Directory of the memory-mapped copies of the images read by ImageWSI (its `cache_dir`).
+        Ignored by the other readers. Defaults to None (ImageWSI's default).
     **kwargs : dict
         Additional keyword arguments passed to the WSI reader constructor.
 
     Returns
     -------
-    Union[OpenSlideWSI, ImageWSI, CuCIMWSI]
+    Union[OpenSlideWSI, ImageWSI, CuCIMWSI, TiffFileWSI]
         An instance of the appropriate WSI reader.
 
     Raises
@@ -43,13 +51,18 @@ def load_wsi(
         If `reader_type` is 'cucim' but the cucim package is not installed.
         Or if an unknown reader type is specified.
     """
-    ext = os.path.splitext(slide_path)[1].lower()
+    remote = is_remote_path(slide_path)
+    ext = os.path.splitext(urlsplit(slide_path).path if remote else slide_path)[1].lower()
+    if remote and reader_type not in (None, 'tifffile'):
+        raise ValueError(f"Slides given by URL are only supported by the 'tifffile' reader, got reader_type='{reader_type}'.")
+
+    image_kwargs = kwargs if image_cache_dir is None else {**kwargs, 'cache_dir': image_cache_dir}
 
     if reader_type == 'openslide':
         return OpenSlideWSI(slide_path=slide_path, **kwargs)
 
     elif reader_type == 'image':
-        return ImageWSI(slide_path=slide_path, **kwargs)
+        return ImageWSI(slide_path=slide_path, **image_kwargs)
 
     elif reader_type == 'cucim':
         if ext in CUCIM_EXTENSIONS:
@@ -60,11 +73,22 @@ def load_wsi(
                 f"Supported whole-slide image formats are: {', '.join(CUCIM_EXTENSIONS)}."
             )
 
+    elif reader_type == 'tifffile':
+        if ext in TIFFFILE_EXTENSIONS:
+            return TiffFileWSI(slide_path=slide_path, **kwargs)
+        else:
+            raise ValueError(
+                f"Unsupported file format '{ext}' for tifffile. "
+                f"Supported whole-slide image formats are: {', '.join(TIFFFILE_EXTENSIONS)}."
+            )
+
     elif reader_type is None:
-        if ext in OPENSLIDE_EXTENSIONS:
+        if remote:
+            return TiffFileWSI(slide_path=slide_path, **kwargs)
+        elif ext in OPENSLIDE_EXTENSIONS:
             return OpenSlideWSI(slide_path=slide_path, **kwargs)
         else:
-            return ImageWSI(slide_path=slide_path, **kwargs)
+            return ImageWSI(slide_path=slide_path, **image_kwargs)
 
     else:
-        raise ValueError(f"Unknown reader_type: {reader_type}. Choose from 'openslide', 'image', or 'cucim'.")
+        raise ValueError(f"Unknown reader_type: {reader_type}. Choose from 'openslide', 'image', 'cucim', or 'tifffile'.")
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
-from typing import Tuple
+from typing import Callable, Iterator, List, Optional, Tuple, Union
 import warnings
 import cv2
 import numpy as np
 import geopandas as gpd
-from shapely import Polygon
+import shapely
+from shapely import STRtree
 from PIL import Image
 
+from trident.wsi_objects.RegionCoalescing import plan_coalesced_reads
+
 class WSIPatcher:
     """ Iterator class to handle patching, patch scaling and tissue mask intersection """
     
@@ -20,11 +23,17 @@ class WSIPatcher:
         src_mag: int = None,
         dst_mag: int = None,
         overlap: int = 0,
-        mask: gpd.GeoDataFrame = None,
+        mask: Union[gpd.GeoDataFrame, PreparedTissueMask] = None,
         coords_only = False,
         custom_coords = None,
         threshold = 0.,
         pil=False,
+        mask_mode: str = 'geometry',
+        raster_oversample: int = 4,
+        stream: bool = False,
+        order: str = 'column',
+        region_size: Optional[int] = None,
+        rescale: bool = True,
     ):
         """ Initialize patcher, compute number of (masked) rows, columns.
 
@@ -36,22 +45,53 @@ class WSIPatcher:
 	    src_mag (int, optional): level0 magnification of the slide before rescaling. Defaults to None.
             dst_mag (int, optional): target magnification of the slide after rescaling. Defaults to None.
             overlap (int, optional): Overlap between patches in pixels. Defaults to 0. 
-            mask (gpd.GeoDataFrame, optional): geopandas dataframe of Polygons. Defaults to None.
+            mask (gpd.GeoDataFrame or PreparedTissueMask, optional): geopandas dataframe of Polygons, or a `PreparedTissueMask`
+                shared by several patchers of the same slide. Defaults to None.
             coords_only (bool, optional): whenever to extract only the coordinates insteaf of coordinates + tile. Default to False.
             threshold (float, optional): minimum proportion of the patch under tissue to be kept.
                 This argument is ignored if mask=None, passing threshold=0 will be faster. Defaults to 0.15
             pil (bool, optional): whenever to get patches as `PIL.Image` (numpy array by default). Defaults to False
+            mask_mode (str, optional): how patches are intersected with the mask. 'geometry' intersects each patch
+                with the (simplified) polygons exactly; 'raster' rasterizes the polygons once and reads the tissue
+                proportion of each patch from an integral image, which is much faster on large slides. Defaults to 'geometry'.
+            raster_oversample (int, optional): number of raster cells along a patch side in 'raster' mode.
+                Higher values are more accurate. Defaults to 4.
+            stream (bool, optional): do not generate the grid in the constructor. Valid coordinates are then only
+                available chunk by chunk with `iter_valid_coords`, with bounded memory. Defaults to False.
+            order (str, optional): order of the valid coordinates. 'column' walks the grid column by column (or keeps
+                the order of `custom_coords`); 'row' walks it row by row, like the tiles of pyramidal TIFF files are
+                stored; 'hilbert' follows a Hilbert curve, so that consecutive patches (and batches) are close on the
+                slide in both directions. `grid_index` maps each patch back to the 'column' order. Defaults to 'column'.
+            region_size (int, optional): edge, in pixels at the read level, of the regions grouping the valid patches
+                (e.g., 2048 or 4096). Each region is read with a single `read_region` call by `get_region_tiles`, 
+                the unit of work of `WSIPatcherDataset` in region mode. Defaults to None (patch by patch).
+            rescale (bool, optional): rescale the tiles to `patch_size`. If False, tiles are returned as read, `read_size`
+                pixels wide (`patch_size_level`, or less with reduced-resolution decoding, see `read_scale`), so that the consumer folds the rescale into its own resize (e.g., `BatchedTransform(input_size=...)`)
+                and tiles are resampled only once. Defaults to True.
         """
+        if mask_mode not in ('geometry', 'raster'):
+            raise ValueError(f"mask_mode must be 'geometry' or 'raster', got '{mask_mode}'.")
+        if order not in ('column', 'row', 'hilbert'):
+            raise ValueError(f"order must be 'column', 'row' or 'hilbert', got '{order}'.")
         self.wsi = wsi
         self.overlap = overlap
         self.width, self.height = self.wsi.get_dimensions()
         self.patch_size_target = patch_size
-        self.mask = mask
+        self.prepared_mask = mask if isinstance(mask, PreparedTissueMask) or mask is None else PreparedTissueMask(mask)
+        self.mask = self.prepared_mask.mask if self.prepared_mask is not None else None
         self.i = 0
         self.coords_only = coords_only
         self.custom_coords = custom_coords
         self.pil = pil
         self.dst_mag = dst_mag
+        self.mask_mode = mask_mode
+        self.raster_oversample = raster_oversample
+        self.threshold = threshold
+        self.stream = stream
+        self.order = order
+        self.region_size = region_size
+        if region_size is not None and stream:
+            raise ValueError("region_size requires the valid coordinates: it cannot be used with stream=True.")
         
         # set src magnification and pixel size. 
         if src_pixel_size is not None:
@@ -69,30 +109,66 @@ class WSIPatcher:
         self.overlap_src = round(overlap * self.downsample)
         
         self.level, self.patch_size_level, self.overlap_level = self._prepare()  
+        self.rescale = rescale
+        self.read_scale = self._read_scale()
+        self.read_size = self.patch_size_level // self.read_scale
+        self.tile_size = patch_size if rescale else self.read_size
         
         if custom_coords is None: 
             self.cols, self.rows = self._compute_cols_rows()
-            
-            col_rows = np.array([
-                [col, row] 
-                for col in range(self.cols) 
-                for row in range(self.rows)
-            ])
-            coords = np.array([self._colrow_to_xy(xy[0], xy[1]) for xy in col_rows])
+            coords = None if stream else self._grid_coords(0, self.cols)
+            curve_extent = max(self.cols, self.rows)
         else:
             if round(custom_coords[0][0]) != custom_coords[0][0]:
                 raise ValueError("custom_coords must be a (N, 2) array of int")
             coords = custom_coords
+            curve_extent = int(np.max(self._xy_to_colrow_array(np.asarray(custom_coords)), initial=0)) + 1
+        # Hilbert curve covering the whole grid (or all custom coordinates), so that chunks and full grid agree
+        self.curve_order = max(1, int(np.ceil(np.log2(max(curve_extent, 1)))))
+        if stream:
+            self.valid_patches_nb, self.valid_coords, self.grid_index = None, None, None
+            return
         if self.mask is not None:
             self.valid_patches_nb, self.valid_coords = self._compute_masked(coords, threshold)
+            self.grid_index = np.flatnonzero(self.valid_mask)
         else:
             self.valid_patches_nb, self.valid_coords = len(coords), coords
+            self.grid_index = np.arange(len(coords))
+        if order != 'column':
+            permutation = self._order_permutation(self.valid_coords)
+            self.valid_coords, self.grid_index = self.valid_coords[permutation], self.grid_index[permutation]
+        if region_size is not None:
+            self.regions = self._plan_regions()
+            self.region_order = np.concatenate([members for _, _, members, _ in self.regions] or [np.zeros(0, dtype=np.int64)])
             
     def _colrow_to_xy(self, col, row):
         """ Convert col row of a tile to its top-left coordinates before rescaling (x, y) """
         x = col * (self.patch_size_src) - self.overlap_src * np.clip(col - 1, 0, None)
         y = row * (self.patch_size_src) - self.overlap_src * np.clip(row - 1, 0, None)
         return (x, y)   
+
+    def _grid_positions(self, n: int) -> np.ndarray:
+        """ Top-left coordinates (before rescaling) of the first `n` columns (or rows), as `_colrow_to_xy` """
+        index = np.arange(n, dtype=np.int64)
+        return index * self.patch_size_src - self.overlap_src * np.clip(index - 1, 0, None)
+
+    def _grid_coords(self, col_start: int, col_stop: int, row_start: int = 0, row_stop: Optional[int] = None) -> np.ndarray:
+        """ Top-left coordinates (before rescaling) of the patches of columns [col_start, col_stop) 
+        and rows [row_start, row_stop) (all rows by default), column-major """
+        row_stop = self.rows if row_stop is None else row_stop
+        xs, ys = self._grid_positions(col_stop)[col_start:], self._grid_positions(row_stop)[row_start:]
+        return np.stack(np.meshgrid(xs, ys, indexing='ij'), axis=-1).reshape(-1, 2)
+
+    def _count_positions(self, extent: int) -> int:
+        """ Number of columns (or rows) whose top-left coordinate lies within `extent` pixels """
+        if extent <= 0:
+            return 0
+        if extent <= self.patch_size_src:
+            return 1
+        stride = self.patch_size_src - self.overlap_src  # between consecutive patches, after the first one
+        if stride <= 0:
+            raise ValueError(f"Overlap ({self.overlap_src}px) must be smaller than the patch size ({self.patch_size_src}px).")
+        return 1 + -(-(extent - self.patch_size_src) // stride)
             
     def _xy_to_colrow(self, x, y):
         """Convert x, y coordinates to col, row indices."""
@@ -108,55 +184,203 @@ class WSIPatcher:
         
         return col, row
 
-    def _compute_masked(self, coords, threshold, simplify_shape=True) -> None:
-        """ Compute tiles which overlap with > threshold with the tissue """
-        
-		# Filter coordinates by bounding boxes of mask polygons
-        if simplify_shape:
-            mask = self.mask.simplify(tolerance=self.patch_size_target / 4, preserve_topology=True)
-        else:
-            mask = self.mask
-        bounding_boxes = mask.geometry.bounds
-        bbox_masks = []
-        for _, bbox in bounding_boxes.iterrows():
-            bbox_mask = (
-                (coords[:, 0] >= bbox['minx'] - self.patch_size_src) & (coords[:, 0] <= bbox['maxx'] + self.patch_size_src) & 
-                (coords[:, 1] >= bbox['miny'] - self.patch_size_src) & (coords[:, 1] <= bbox['maxy'] + self.patch_size_src)
-            )
-            bbox_masks.append(bbox_mask)
+    def _xy_to_colrow_array(self, coords: np.ndarray) -> np.ndarray:
+        """ Vectorized `_xy_to_colrow` of (N, 2) coordinates, as (N, 2) (col, row) indices. Coordinates off the grid 
+        (e.g., custom coordinates) get the index of the grid cell containing them, clipped at 0. """
+        stride = max(1, self.patch_size_src - self.overlap_src)
+        coords = np.asarray(coords, dtype=np.int64)
+        return np.where(coords < self.patch_size_src, 0, (coords - self.patch_size_src) // stride + 1)
+
+    def _order_permutation(self, coords: np.ndarray) -> np.ndarray:
+        """ Permutation sorting (N, 2) coordinates in `order` """
+        colrow = self._xy_to_colrow_array(coords)
+        if self.order == 'hilbert':
+            return np.argsort(hilbert_index(colrow[:, 0], colrow[:, 1], self.curve_order), kind='stable')
+        if self.order == 'row':
+            return np.lexsort((colrow[:, 0], colrow[:, 1]))
+        return np.arange(len(coords))
 
-        if len(bbox_masks) > 0:
-            bbox_mask = np.vstack(bbox_masks).any(axis=0)
+    def _grid_blocks(self, chunk_size: int) -> Iterator[Tuple[int, int, int, int]]:
+        """ (col_start, col_stop, row_start, row_stop) blocks of at most `chunk_size` grid patches, in `order`.
+        The patches of each block, sorted in `order`, directly follow the patches of the previous block. """
+        if self.order == 'column':
+            cols_per_chunk = max(1, chunk_size // max(1, self.rows))
+            for col in range(0, self.cols, cols_per_chunk):
+                yield col, min(col + cols_per_chunk, self.cols), 0, self.rows
+        elif self.order == 'row':
+            rows_per_chunk = max(1, chunk_size // max(1, self.cols))
+            for row in range(0, self.rows, rows_per_chunk):
+                yield 0, self.cols, row, min(row + rows_per_chunk, self.rows)
         else:
-            bbox_mask = np.zeros(len(coords), dtype=bool)
-            
-        
-        union_mask = mask.union_all()
-
-        squares = [
-            Polygon([
-                (xy[0], xy[1]), 
-                (xy[0] + self.patch_size_src, xy[1]), 
-                (xy[0] + self.patch_size_src, xy[1] + self.patch_size_src), 
-                (xy[0], xy[1] + self.patch_size_src)]) 
-            for xy in coords[bbox_mask]
+            # The Hilbert curve visits aligned square blocks of 2^k x 2^k cells one after the other,
+            # in the order of the Hilbert curve of the blocks
+            k = min(max(0, int(np.log2(max(chunk_size, 1))) // 2), self.curve_order)
+            side = 1 << k
+            block_cols, block_rows = np.meshgrid(np.arange(-(-self.cols // side)), np.arange(-(-self.rows // side)), indexing='ij')
+            block_cols, block_rows = block_cols.ravel(), block_rows.ravel()
+            for i in np.argsort(hilbert_index(block_cols, block_rows, self.curve_order - k), kind='stable'):
+                col, row = int(block_cols[i]) * side, int(block_rows[i]) * side
+                yield col, min(col + side, self.cols), row, min(row + side, self.rows)
+
+    def _plan_regions(self) -> List[Tuple[Tuple[int, int], Tuple[int, int], np.ndarray, np.ndarray]]:
+        """ Group the valid patches into regions of about `region_size` pixels at the read level.
+
+        Returns:
+            List[Tuple[Tuple[int, int], Tuple[int, int], np.ndarray, np.ndarray]]: regions as (level 0 top-left, 
+                (width, height) at the read level, indices of the patches in `valid_coords`, (N, 2) offsets of the 
+                patches in the region at the read level), in the order of their first patch.
+        """
+        coords = np.asarray(self.valid_coords, dtype=np.int64).reshape(-1, 2)
+        downsample = self.wsi.level_downsamples[self.level]
+        size = (self.patch_size_level, self.patch_size_level)
+        # Patches whose top-left corner falls in the same block of `region_size` pixels share a read. Patches not 
+        # aligned with the pixels of the level (or alone in their block) are read on their own.
+        grouped, single = plan_coalesced_reads(coords, downsample, size, (self.region_size, self.region_size), self.region_size)
+        ds = int(round(downsample))
+        regions = [
+            ((xy[0] * ds, xy[1] * ds), region_dims, members, coords[members] // ds - np.asarray(xy))
+            for xy, region_dims, members in grouped
         ]
-        if threshold == 0:
-            valid_mask = gpd.GeoSeries(squares).intersects(union_mask).values
-        else:
-            gdf = gpd.GeoSeries(squares)
-            areas = gdf.area
-            valid_mask = gdf.intersection(union_mask).area >= threshold * areas
-            
-        full_mask = bbox_mask
-        full_mask[bbox_mask] &= valid_mask 
+        regions += [((int(coords[i, 0]), int(coords[i, 1])), size, np.array([i]), np.zeros((1, 2), dtype=np.int64)) for i in single]
+        regions.sort(key=lambda region: region[2].min())
+        return regions
 
+    def _compute_masked(self, coords, threshold) -> None:
+        """ Compute tiles which overlap with > threshold with the tissue """
+        full_mask = self._mask_filter(threshold)(coords)
         valid_patches_nb = full_mask.sum()
         self.valid_mask = full_mask
         valid_coords = coords[full_mask]
         return valid_patches_nb, valid_coords
+
+    def _mask_filter(self, threshold) -> Callable[[np.ndarray], np.ndarray]:
+        """ Prepare the mask once, return a function telling which of (N, 2) coordinates overlap with > threshold with the tissue """
+        if self.mask_mode == 'raster':
+            return self._raster_filter(threshold)
+        return self._geometry_filter(threshold)
+
+    def _geometry_filter(self, threshold, simplify_shape=True) -> Callable[[np.ndarray], np.ndarray]:
+        """ Tissue overlap from the intersection of each patch with the (simplified) polygons """
+        # Polygons indexed with an STRtree, so that each patch is only tested against the polygons whose bounding box it touches
+        tolerance = self.patch_size_target / 4 if simplify_shape else None
+        polygons, tree = self.prepared_mask.geometry(tolerance)
+        overlapping = self.prepared_mask.overlapping(tolerance) if threshold != 0 else None
+        size = self.patch_size_src
+
+        # Coarse buckets of 8x8 patches touched by the bounding box of a polygon (a patch at x touches [min_x, max_x] 
+        # if x is in [min_x - size, max_x]). Bucket indices are clipped to the slide, which keeps intervals intersecting.
+        bucket_size = 8 * size
+        n_buckets_x, n_buckets_y = self.width // bucket_size + 1, self.height // bucket_size + 1
+        def bucket_of(values, n_buckets):
+            return np.clip(np.floor_divide(values, bucket_size), 0, n_buckets - 1).astype(np.int64)
+        near_buckets = np.zeros((n_buckets_y, n_buckets_x), dtype=bool)
+        for min_x, min_y, max_x, max_y in shapely.bounds(polygons):
+            if np.isnan(min_x):  # empty geometry
+                continue
+            x0, x1 = bucket_of(np.array([min_x - size, max_x]), n_buckets_x)
+            y0, y1 = bucket_of(np.array([min_y - size, max_y]), n_buckets_y)
+            near_buckets[y0:y1 + 1, x0:x1 + 1] = True
+
+        def keep(coords: np.ndarray) -> np.ndarray:
+            coords = np.asarray(coords)
+            full_mask = np.zeros(len(coords), dtype=bool)
+            # Only build the squares of the patches in buckets near the tissue
+            near = np.flatnonzero(near_buckets[bucket_of(coords[:, 1], n_buckets_y), bucket_of(coords[:, 0], n_buckets_x)])
+            squares = shapely.box(coords[near, 0], coords[near, 1], coords[near, 0] + size, coords[near, 1] + size)
+            if threshold == 0:
+                square_idx, _ = tree.query(squares, predicate='intersects')
+                full_mask[near[square_idx]] = True
+                return full_mask
+
+            square_idx, polygon_idx = tree.query(squares)
+            pieces = shapely.intersection(squares[square_idx], polygons[polygon_idx])
+            areas = np.bincount(square_idx, weights=shapely.area(pieces), minlength=len(near))
+            # Tissue under overlapping polygons is counted once per polygon: merge the pieces of these patches
+            recount = np.isin(square_idx, square_idx[overlapping[polygon_idx]])
+            if recount.any():
+                order = np.argsort(square_idx[recount], kind='stable')
+                squares_recount, starts = np.unique(square_idx[recount][order], return_index=True)
+                for square, group in zip(squares_recount, np.split(pieces[recount][order], starts[1:])):
+                    areas[square] = shapely.union_all(group).area
+            # Summed pieces may differ from the patch area by rounding errors: keep fully covered patches with threshold=1
+            full_mask[near] = areas >= threshold * size ** 2 * (1 - 1e-9)
+            return full_mask
+
+        return keep
+
+    def _raster_filter(self, threshold) -> Callable[[np.ndarray], np.ndarray]:
+        """ Tissue overlap read from an integral image of the rasterized polygons """
+        cell = self.patch_size_src / self.raster_oversample
+        raster_width, raster_height = int(np.ceil(self.width / cell)), int(np.ceil(self.height / cell))
+        # Any overlap is enough to keep a patch with threshold=0: rasterize every cell touched by the tissue
+        integral = self.prepared_mask.integral((raster_width, raster_height), scale=1 / cell, all_touched=threshold == 0)
+
+        def keep(coords: np.ndarray) -> np.ndarray:
+            coords = np.asarray(coords)
+            # Raster cells covered by each patch, clipped to the slide (the rest of the patch has no tissue)
+            x0, x1 = np.rint(coords[:, 0] / cell).astype(np.int64), np.rint((coords[:, 0] + self.patch_size_src) / cell).astype(np.int64)
+            y0, y1 = np.rint(coords[:, 1] / cell).astype(np.int64), np.rint((coords[:, 1] + self.patch_size_src) / cell).astype(np.int64)
+            cells = np.maximum((x1 - x0) * (y1 - y0), 1)
+            x0, x1 = np.clip(x0, 0, raster_width), np.clip(x1, 0, raster_width)
+            y0, y1 = np.clip(y0, 0, raster_height), np.clip(y1, 0, raster_height)
+            tissue = integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
+            if threshold == 0:
+                return tissue > 0
+            return tissue >= threshold * cells
+
+        return keep
+
+    def iter_valid_coords(
+        self, chunk_size: int = 2**18, return_index: bool = False
+    ) -> Iterator[Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]]:
+        """ Generate and mask the grid by blocks (bands of columns or rows, or squares along the Hilbert curve), 
+        yielding the valid coordinates chunk by chunk.
+
+        Chunks are yielded in the order of `valid_coords`, and empty chunks are skipped.
+        Peak memory is bounded by `chunk_size` patches, whatever the size of the slide or the overlap.
+
+        Args:
+            chunk_size (int, optional): maximum number of grid patches generated and masked at once. Defaults to 2**18.
+            return_index (bool, optional): also yield the `grid_index` of the coordinates. Defaults to False.
+
+        Returns:
+            Iterator[np.ndarray]: (N, 2) arrays of top-left coordinates (before rescaling), or (coords, grid_index) tuples
+        """
+        if not self.stream:
+            for start in range(0, len(self.valid_coords), chunk_size):
+                coords, index = self.valid_coords[start:start + chunk_size], self.grid_index[start:start + chunk_size]
+                yield (coords, index) if return_index else coords
+            return
+
+        keep = self._mask_filter(self.threshold) if self.mask is not None else None
+        if self.custom_coords is None:
+            def chunks():
+                for col_start, col_stop, row_start, row_stop in self._grid_blocks(chunk_size):
+                    coords = self._grid_coords(col_start, col_stop, row_start, row_stop)
+                    colrow = self._xy_to_colrow_array(coords)
+                    yield coords, colrow[:, 0] * self.rows + colrow[:, 1]
+        else:
+            custom_coords = np.asarray(self.custom_coords)
+            # Custom coordinates are already in memory: sort them all at once
+            permutation = self._order_permutation(custom_coords)
+            def chunks():
+                for start in range(0, len(custom_coords), chunk_size):
+                    index = permutation[start:start + chunk_size]
+                    yield custom_coords[index], index
+        for coords, index in chunks():
+            if keep is not None:
+                valid = keep(coords)
+                coords, index = coords[valid], index[valid]
+            if len(coords) == 0:
+                continue
+            if self.custom_coords is None and self.order != 'column':
+                permutation = self._order_permutation(coords)
+                coords, index = coords[permutation], index[permutation]
+            yield (coords, index) if return_index else coords
         
     def __len__(self):
+        if self.stream:
+            raise TypeError("A streaming patcher has no length, iterate over `iter_valid_coords` instead.")
         return self.valid_patches_nb
     
     def __iter__(self):
@@ -187,6 +411,26 @@ class WSIPatcher:
         patch_size_level = round(self.patch_size_src / level_downsample)
         overlap_level = round(self.overlap_src / level_downsample)
         return level, patch_size_level, overlap_level
+
+    def _read_scale(self) -> int:
+        """ Factor by which tiles are decoded below the resolution of the read level, when the slide supports
+        reduced-resolution decoding (e.g., DCT-domain scaling of JPEG tiles by `TiffFileWSI.read_region_scaled`)
+        and the level is at least twice as fine as the target. Only the remaining fraction is then resized.
+        """
+        custom_downsample = self.patch_size_level / self.patch_size_target
+        if custom_downsample < 2 or not hasattr(self.wsi, 'read_region_scaled'):
+            return 1
+        scale = self.wsi.get_dct_scale(self.level, custom_downsample)
+        return scale if self.patch_size_level % scale == 0 else 1
+
+    def _read_tile(self, x: int, y: int, out: np.ndarray) -> None:
+        """ Read the `read_size` tile at (x, y) into `out` """
+        if self.read_scale > 1:
+            out[...] = self.wsi.read_region_scaled(
+                (x, y), self.level, (self.read_size, self.read_size), self.read_scale, read_as='numpy'
+            )
+        else:
+            self.wsi.read_region_into(location=(x, y), level=self.level, size=(self.read_size, self.read_size), out=out)
     
     def get_cols_rows(self) -> Tuple[int, int]:
         """ Get the number of columns and rows in the associated WSI
@@ -198,21 +442,96 @@ class WSIPatcher:
       
     def get_tile_xy(self, x: int, y: int) -> Tuple[np.ndarray, int, int]:
 
-        tile = self.wsi.read_region(
-            location=(x, y),
-            level=self.level,
-            size=(self.patch_size_level, self.patch_size_level),
-            read_as='pil' if self.pil else 'numpy'
-        )
+        tile = np.empty((self.read_size, self.read_size, 3), dtype=np.uint8)
+        self._read_tile(x, y, tile)
 
-        if self.patch_size_target is not None:
+        if self.pil:
+            tile = Image.fromarray(tile)
+        if self.tile_size != self.read_size:
             if self.pil:
-                tile = tile.resize((self.patch_size_target, self.patch_size_target))
+                tile = tile.resize((self.tile_size, self.tile_size))
             else:
-                tile = cv2.resize(tile, (self.patch_size_target, self.patch_size_target))[:, :, :3]
+                tile = cv2.resize(tile, (self.tile_size, self.tile_size))[:, :, :3]
 
         assert x < self.width and y < self.height
         return tile, x, y
+
+    def get_tiles_xy(
+        self, coords: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> Tuple[Union[np.ndarray, List[Image.Image]], np.ndarray]:
+        """ Read a batch of tiles with a single `read_regions` call and rescale them to `patch_size_target` (if `rescale`)
+
+        Args:
+            coords (np.ndarray): (N, 2) array of top-left coordinates (before rescaling)
+            out (np.ndarray, optional): (N, tile_size, tile_size, 3) uint8 buffer (e.g., pinned or shared memory)
+                receiving the tiles. Ignored if pil=True. Defaults to None (allocated).
+
+        Returns:
+            Tuple[Union[np.ndarray, List[Image.Image]], np.ndarray]: (tiles as a (N, H, W, 3) array or a list of `PIL.Image` if pil=True, coords)
+        """
+        coords = np.asarray(coords)
+        assert (coords[:, 0] < self.width).all() and (coords[:, 1] < self.height).all()
+
+        needs_resize = self.tile_size != self.read_size
+        if self.read_scale > 1:
+            tiles = self.wsi._prepare_regions_buffer(len(coords), (self.read_size, self.read_size), None if (self.pil or needs_resize) else out)
+            for i, (x, y) in enumerate(coords):
+                self._read_tile(x, y, tiles[i])
+        else:
+            tiles = self.wsi.read_regions(
+                coords,
+                level=self.level,
+                size=(self.read_size, self.read_size),
+                out=None if (self.pil or needs_resize) else out,
+            )
+
+        if self.pil:
+            tiles = [Image.fromarray(tile) for tile in tiles]
+            if needs_resize:
+                tiles = [tile.resize((self.tile_size, self.tile_size)) for tile in tiles]
+        elif needs_resize:
+            resized = self.wsi._prepare_regions_buffer(len(tiles), (self.tile_size, self.tile_size), out)
+            for i, tile in enumerate(tiles):
+                cv2.resize(tile, (self.tile_size, self.tile_size), dst=resized[i])
+            tiles = resized
+
+        return tiles, coords
+
+    def get_region_tiles(self, index: int) -> Tuple[Union[np.ndarray, List[Image.Image]], np.ndarray]:
+        """ Read the region `index` of `regions` with a single `read_region` call and cut it into its valid patches,
+        rescaled to `patch_size_target` (if `rescale`)
+
+        Args:
+            index (int): index of the region in `regions`
+
+        Returns:
+            Tuple[Union[np.ndarray, List[Image.Image]], np.ndarray]: (tiles as a (N, H, W, 3) array or a list of `PIL.Image` if pil=True, 
+                coords of the tiles, i.e. `valid_coords[regions[index][2]]`)
+        """
+        if self.region_size is None:
+            raise ValueError("Can't use get_region_tiles as 'region_size' was not passed to the constructor")
+        location, size, members, offsets = self.regions[index]
+        if self.read_scale > 1:
+            size = (-(-size[0] // self.read_scale), -(-size[1] // self.read_scale))
+            offsets = offsets // self.read_scale
+            region = self.wsi.read_region_scaled(location, self.level, size, self.read_scale, read_as='numpy')
+        else:
+            region = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            self.wsi.read_region_into(location=location, level=self.level, size=size, out=region)
+
+        patch_size = self.read_size
+        target_size = self.tile_size
+        tiles = [] if self.pil else np.empty((len(members), target_size, target_size, 3), dtype=np.uint8)
+        for i, (ox, oy) in enumerate(offsets):
+            tile = region[oy:oy + patch_size, ox:ox + patch_size]
+            if self.pil:
+                tile = Image.fromarray(tile)
+                tiles.append(tile.resize((target_size, target_size)) if target_size != patch_size else tile)
+            elif target_size != patch_size:
+                cv2.resize(tile, (target_size, target_size), dst=tiles[i])
+            else:
+                tiles[i] = tile
+        return tiles, self.valid_coords[members]
     
     def get_tile(self, col: int, row: int) -> Tuple[np.ndarray, int, int]:
         """ get tile at position (column, row)
@@ -231,18 +550,7 @@ class WSIPatcher:
         return self.get_tile_xy(x, y)
     
     def _compute_cols_rows(self) -> Tuple[int, int]:
-        col = 0
-        row = 0
-        x, y = self._colrow_to_xy(col, row)
-        while x < self.width:
-            col += 1
-            x, _ = self._colrow_to_xy(col, row)
-        cols = col
-        while y < self.height:
-            row += 1
-            _, y = self._colrow_to_xy(col, row)
-        rows = row
-        return cols, rows 
+        return self._count_positions(self.width), self._count_positions(self.height)
     
 
     def visualize(self) -> Image.Image:
@@ -274,7 +582,7 @@ class WSIPatcher:
         thumbnail_patch_size = max(1, int(self.patch_size_src / downsample_factor))
 
         # Get thumbnail in right format
-        canvas = np.array(self.wsi.get_thumbnail((thumbnail_width, thumbnail_height))).astype(np.uint8)
+        canvas = np.array(self.wsi.get_cached_thumbnail((thumbnail_width, thumbnail_height))).astype(np.uint8)
 
         tmp_coords = self.coords_only
         self.coords_only = True
@@ -309,6 +617,50 @@ class WSIPatcher:
 
         return Image.fromarray(canvas)
     
+class PreparedTissueMask:
+    """ Tissue mask caching what the masking engines of `WSIPatcher` derive from it: simplified polygons and their
+    STRtree (geometry engine), integral images of the rasterized polygons (raster engine). Share it between the
+    patchers of a slide at several settings (e.g., magnifications, patch sizes) to prepare the mask only once. """
+
+    def __init__(self, mask: gpd.GeoDataFrame):
+        """
+        Args:
+            mask (gpd.GeoDataFrame): geopandas dataframe of Polygons, in level 0 coordinates.
+        """
+        self.mask = mask
+        self._cache = {}
+
+    def geometry(self, tolerance: Optional[float] = None) -> Tuple[np.ndarray, STRtree]:
+        """ Polygons simplified with `tolerance` (not simplified if None) and their STRtree """
+        key = ('geometry', tolerance)
+        if key not in self._cache:
+            mask = self.mask.simplify(tolerance=tolerance, preserve_topology=True) if tolerance is not None else self.mask
+            polygons = mask.geometry.to_numpy()
+            self._cache[key] = (polygons, STRtree(polygons))
+        return self._cache[key]
+
+    def overlapping(self, tolerance: Optional[float] = None) -> np.ndarray:
+        """ Whether each polygon (simplified with `tolerance`) shares some area with another one """
+        key = ('overlapping', tolerance)
+        if key not in self._cache:
+            polygons, tree = self.geometry(tolerance)
+            left, right = tree.query(polygons, predicate='intersects')
+            pairs = left < right
+            left, right = left[pairs], right[pairs]
+            shared = shapely.area(shapely.intersection(polygons[left], polygons[right])) > 0
+            overlapping = np.zeros(len(polygons), dtype=bool)
+            overlapping[left[shared]] = overlapping[right[shared]] = True
+            self._cache[key] = overlapping
+        return self._cache[key]
+
+    def integral(self, size: Tuple[int, int], scale: float, all_touched: bool = False) -> np.ndarray:
+        """ Integral image of `rasterize_polygons(mask, size, scale, all_touched)`: integral[j, i] = raster[:j, :i].sum() """
+        key = ('integral', size, scale, all_touched)
+        if key not in self._cache:
+            self._cache[key] = cv2.integral(rasterize_polygons(self.mask, size, scale=scale, all_touched=all_touched))
+        return self._cache[key]
+
+
 class OpenSlideWSIPatcher(WSIPatcher):
     def __init__(self, *args, **kwargs):
         warnings.warn(
@@ -317,4 +669,65 @@ class OpenSlideWSIPatcher(WSIPatcher):
             category=DeprecationWarning,
             stacklevel=2
         )
-        super().__init__(*args, **kwargs)
\ No newline at end of file
+        super().__init__(*args, **kwargs)
+
+
+def hilbert_index(x: np.ndarray, y: np.ndarray, order: int) -> np.ndarray:
+    """ Distance along the Hilbert curve of order `order` (covering a 2^order x 2^order grid) of the cells (x, y).
+
+    Args:
+        x (np.ndarray): column indices, in [0, 2^order).
+        y (np.ndarray): row indices, in [0, 2^order).
+        order (int): order of the curve.
+
+    Returns:
+        np.ndarray: int64 distances, in [0, 4^order).
+    """
+    x, y = np.asarray(x, dtype=np.int64).copy(), np.asarray(y, dtype=np.int64).copy()
+    n = np.int64(1) << order
+    d = np.zeros(np.broadcast(x, y).shape, dtype=np.int64)
+    s = n >> 1
+    while s > 0:
+        rx, ry = (x & s) > 0, (y & s) > 0
+        d += s * s * ((3 * rx) ^ ry)
+        # Rotate the quadrant, so that the curve inside it starts and ends next to its neighbours
+        flip = ~ry & rx
+        x, y = np.where(flip, n - 1 - x, x), np.where(flip, n - 1 - y, y)
+        x, y = np.where(ry, x, y), np.where(ry, y, x)
+        s >>= 1
+    return d
+
+
+def rasterize_polygons(gdf: gpd.GeoDataFrame, size: Tuple[int, int], scale: float = 1., all_touched: bool = False) -> np.ndarray:
+    """ Rasterize the union of the polygons of a GeoDataFrame, holes excluded.
+
+    Args:
+        gdf (gpd.GeoDataFrame): (Multi)Polygons, in the coordinates of the slide (e.g., level 0).
+        size (Tuple[int, int]): (width, height) of the raster.
+        scale (float, optional): size of a raster cell is 1 / scale in the coordinates of the polygons. Defaults to 1.
+        all_touched (bool, optional): fill every cell touched by a polygon, rather than the cells whose center
+            is inside a polygon. Defaults to False.
+
+    Returns:
+        np.ndarray: (height, width) uint8 raster of 0 and 1.
+    """
+    raster = np.zeros((size[1], size[0]), dtype=np.uint8)
+    shift = 4  # sub-cell precision of the vertices, in bits
+    # Along each axis, OpenCV fills the pixels [round(a), round(b)] of a polygon spanning [a, b], pixel centers
+    # being at integer coordinates. Offset by half a cell, these are the cells touching the polygon.
+    offset = -0.5 if all_touched else 0.
+    for geometry in gdf.geometry:
+        if geometry is None or geometry.is_empty:
+            continue
+        for polygon in getattr(geometry, 'geoms', [geometry]):
+            rings = [
+                np.rint((np.asarray(ring.coords)[:, :2] * scale + offset) * (1 << shift)).astype(np.int32)
+                for ring in [polygon.exterior, *polygon.interiors]
+            ]
+            # Rings of a polygon are filled together (even-odd), polygons one by one: overlaps are unioned
+            cv2.fillPoly(raster, rings, 1, lineType=cv2.LINE_8, shift=shift)
+    if all_touched:
+        return raster
+    # Without offset, [round(a), round(b)] has one cell too many after the right and bottom edges: keep the cells
+    # whose right and bottom neighbours are filled, i.e. [round(a), round(b) - 1], the cells centered in [a, b].
+    return cv2.erode(raster, np.ones((2, 2), dtype=np.uint8), anchor=(0, 0))
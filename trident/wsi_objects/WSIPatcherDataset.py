@@ -1,20 +1,66 @@
+import numpy as np
+import torch
 from torch.utils.data import Dataset
+from torch.utils.data._utils.collate import default_collate
 
 
 class WSIPatcherDataset(Dataset):
-    """ Dataset from a WSI patcher to directly read tiles on a slide  """
-    
+    """ Dataset from a WSI patcher to directly read tiles on a slide.
+
+    If the patcher has a `region_size`, the dataset is in region mode: each item is a region of the slide,
+    read with a single `read_region` call, and holds all the valid patches inside it as a batch. Combine
+    regions into batches with `collate_regions`; patches then come in the order of `patcher.region_order`.
+    """
+
     def __init__(self, patcher, transform):
         self.patcher = patcher
         self.transform = transform
-                              
+        self.region_mode = getattr(patcher, 'region_size', None) is not None
+
     def __len__(self):
+        if self.region_mode:
+            return len(self.patcher.regions)
         return len(self.patcher)
-    
+
     def __getitem__(self, index):
+        if self.region_mode:
+            return self._get_region(index)
+
         tile, x, y = self.patcher[index]
 
         if self.transform:
             tile = self.transform(tile)
 
         return tile, (x, y)
+
+    def __getitems__(self, indices):
+        """ Fetch a whole batch with a single batched read (used by the DataLoader when batching is enabled) """
+        if self.region_mode:
+            return [self._get_region(index) for index in indices]
+
+        tiles, coords = self.patcher.get_tiles_xy(self.patcher.valid_coords[indices])
+
+        samples = []
+        for tile, (x, y) in zip(tiles, coords):
+            if self.transform:
+                tile = self.transform(tile)
+            samples.append((tile, (x, y)))
+        return samples
+
+    def _get_region(self, index):
+        """ All the patches of a region: (tiles stacked along the first dimension, (xs, ys)) """
+        tiles, coords = self.patcher.get_region_tiles(index)
+        tiles = default_collate([self.transform(tile) if self.transform else np.asarray(tile) for tile in tiles])
+        coords = torch.from_numpy(np.asarray(coords, dtype=np.int64))
+        return tiles, (coords[:, 0], coords[:, 1])
+
+
+def collate_regions(samples):
+    """ Merge regions of a `WSIPatcherDataset` in region mode into a single batch of patches """
+    if len(samples) == 1:
+        return samples[0]
+    tiles = torch.cat([tiles for tiles, _ in samples])
+    xs = torch.cat([xs for _, (xs, _) in samples])
+    ys = torch.cat([ys for _, (_, ys) in samples])
+    return tiles, (xs, ys)
+